@@ -0,0 +1,145 @@
+"""
+Compares the throughput and accuracy of the array versions of the weighted
+mean functions of the mean module with those of the current functions
+called on the same data, both for lists of ValueUncertainty instances and
+for a ValueUncertaintyArray.
+
+Accuracy is measured against reference statistics computed with
+math.fsum, which are correctly rounded, from the raw values and from the
+rounded values of the measurements. The current functions always use the
+rounded values, so they are compared with the raw=False array path against
+the rounded reference, and the raw=True array path shows what is gained by
+skipping the rounding. Run from the root of the repository with the package
+installed or on the Python path:
+
+    python benchmarks/weighted_mean.py [--count N] [--list-count N]
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+from measurement_stats import mean
+from measurement_stats import value
+
+
+def reference(x, u):
+    """
+    Returns the weighted mean, the uncertainty of the weighted mean and the
+    weighted deviation computed with correctly rounded sums.
+    """
+
+    w = 1.0 / (u * u)
+    weight_sum = math.fsum(w)
+    ave = math.fsum(w * x) / weight_sum
+    n = x.size
+    dev = math.fsum(w * (x - ave) ** 2)
+    return (
+        ave,
+        1.0 / math.sqrt(weight_sum),
+        math.sqrt(dev / (weight_sum * (n - 1.0) / n))
+    )
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def relative(result, expected):
+    return abs(result - expected) / abs(expected)
+
+
+def compare(raw_values, raw_uncertainties, include_lists):
+    """
+    Prints the throughput of each of the functions for the specified
+    measurements and the relative errors of its mean and uncertainty with
+    respect to the raw and the rounded reference statistics.
+    """
+
+    n = raw_values.size
+    rounded = value.round_measurements_many(raw_values, raw_uncertainties)
+    expected = {
+        'raw': reference(raw_values, raw_uncertainties),
+        'rounded': reference(*rounded)
+    }
+
+    array = value.ValueUncertaintyArray(raw_values, raw_uncertainties)
+    sources = [('array', array)]
+    if include_lists:
+        sources.insert(0, ('list', array.to_list()))
+
+    print('{} measurements'.format(n))
+    print('{:<44} {:>10} {:>10} {:>10} {:>10} {:>10}'.format(
+        'function', 'values/s', 'mean raw', 'unc raw',
+        'mean round', 'unc round'
+    ))
+
+    for name, function, many, index in (
+            ('weighted', mean.weighted, mean.weighted_many, 1),
+            (
+                'weighted_mean_and_deviation',
+                mean.weighted_mean_and_deviation,
+                mean.weighted_mean_and_deviation_many,
+                2
+            )
+    ):
+        runs = [
+            (
+                '{} ({})'.format(name, label),
+                timed(function, source)
+            )
+            for label, source in sources
+        ]
+        runs += [
+            (
+                '{}_many(raw={})'.format(name, raw),
+                timed(many, raw_values, raw_uncertainties, raw=raw)
+            )
+            for raw in (True, False)
+        ]
+
+        for label, (result, elapsed) in runs:
+            errors = []
+            for key in ('raw', 'rounded'):
+                errors.append(relative(result.raw, expected[key][0]))
+                errors.append(
+                    relative(result.raw_uncertainty, expected[key][index])
+                )
+            print(
+                '{:<44} {:>10.3g} {:>10.2e} {:>10.2e} {:>10.2e} {:>10.2e}'
+                .format(label, n / elapsed, *errors)
+            )
+
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=10 ** 7)
+    parser.add_argument('--list-count', type=int, default=10 ** 5)
+    parser.add_argument('--offset', type=float, default=1e6)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    raw_values = args.offset + rng.normal(0.0, 1.0, args.count)
+    raw_uncertainties = rng.uniform(0.5, 2.0, args.count)
+
+    # The list functions create a ValueUncertainty for every measurement,
+    # so they are only compared on a smaller subset
+    n = min(args.count, args.list_count)
+    compare(raw_values[:n], raw_uncertainties[:n], True)
+    compare(raw_values, raw_uncertainties, False)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,15 +2,18 @@ import typing as _typing
 import numpy as _np
 
 from measurement_stats import angle
+from measurement_stats import consistency
 from measurement_stats import mean
 from measurement_stats import ops
 from measurement_stats import value
 from measurement_stats.value import ValueUncertainty
+from measurement_stats.value import ValueUncertaintyArray
 from measurement_stats import value2D
 from measurement_stats import values
 from measurement_stats import distributions
 from measurement_stats.distributions import Distribution
 from measurement_stats.distributions import create_distribution
+from measurement_stats import storage
 
 ArrayType = _typing.Union[
     _np.array,
@@ -0,0 +1,144 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import numpy as np
+from scipy import stats
+
+from measurement_stats import value
+
+
+def _residuals(expected, measurements):
+    """
+    Returns the signed differences between the measurements and the
+    expectation and the uncertainties of those differences as arrays.
+
+    If the expectation has an uncertainty, the raw values are compared and
+    the raw uncertainties of the measurements and expectation are added in
+    quadrature. Otherwise the rounded values are compared relative to the
+    rounded uncertainties of the measurements.
+
+    :param expected:
+    :param measurements:
+    :return:
+    """
+
+    array = value.ValueUncertaintyArray.from_list(measurements)
+
+    if hasattr(expected, 'raw_uncertainty'):
+        expected_raw = np.asarray(expected.raw, dtype=np.float64)
+        expected_unc = np.asarray(expected.raw_uncertainty, dtype=np.float64)
+        return (
+            array.raw - expected_raw,
+            np.sqrt(array.raw_uncertainty ** 2 + expected_unc ** 2)
+        )
+
+    values, uncertainties = value.round_measurements_many(
+        array.raw,
+        array.raw_uncertainty
+    )
+    return values - np.asarray(expected, dtype=np.float64), uncertainties
+
+
+def deviations(expected, measurements):
+    """
+    Returns the number of standard deviations, or sigmas, by which each of
+    the measurements differs from the expectation.
+
+    :param expected:
+        A ValueUncertainty or ValueUncertaintyArray, a number or an array of
+        numbers with the same shape as the measurements.
+    :param measurements:
+        A ValueUncertaintyArray or an iterable of ValueUncertainty instances
+    :return: An array of the absolute sigma deviations
+    """
+
+    difference, uncertainty = _residuals(expected, measurements)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.abs(difference) / uncertainty
+
+
+def chi_square(expected, measurements):
+    """
+    Returns the chi-square statistic of the measurements relative to the
+    expectation, which is the sum of the squared sigma deviations.
+
+    :param expected:
+    :param measurements:
+    :return:
+    :rtype: float
+    """
+
+    return float(np.sum(deviations(expected, measurements) ** 2))
+
+
+def degrees_of_freedom(measurements, parameters=0):
+    """
+    Returns the number of degrees of freedom of a chi-square test of the
+    measurements against an expectation with the specified number of
+    parameters that were fitted to those measurements.
+
+    :param measurements:
+    :param parameters:
+    :return:
+    :rtype: int
+    """
+
+    return len(measurements) - int(parameters)
+
+
+def reduced_chi_square(expected, measurements, parameters=0):
+    """
+    Returns the chi-square statistic divided by the number of degrees of
+    freedom, which is close to one for measurements that are consistent with
+    the expectation and whose uncertainties are estimated correctly.
+
+    :param expected:
+    :param measurements:
+    :param parameters:
+        The number of parameters of the expectation that were fitted to the
+        measurements.
+    :return:
+    :rtype: float
+    """
+
+    dof = degrees_of_freedom(measurements, parameters)
+    if dof < 1:
+        return float('nan')
+    return chi_square(expected, measurements) / dof
+
+
+def p_value(expected, measurements, parameters=0):
+    """
+    Returns the probability of a chi-square statistic at least as large as
+    that of the measurements if the measurements were consistent with the
+    expectation.
+
+    :param expected:
+    :param measurements:
+    :param parameters:
+        The number of parameters of the expectation that were fitted to the
+        measurements.
+    :return:
+    :rtype: float
+    """
+
+    dof = degrees_of_freedom(measurements, parameters)
+    if dof < 1:
+        return float('nan')
+    return float(stats.chi2.sf(chi_square(expected, measurements), dof))
+
+
+def p_values(expected, measurements):
+    """
+    Returns the two-sided probability of a deviation at least as large as
+    that of each measurement if the measurement were consistent with the
+    expectation.
+
+    :param expected:
+    :param measurements:
+    :return: An array of probabilities
+    """
+
+    return 2.0 * stats.norm.sf(deviations(expected, measurements))
@@ -3,6 +3,8 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+from measurement_stats.distributions import binned
+from measurement_stats.distributions import gauss_transform
 from measurement_stats.distributions import kernels
 from measurement_stats.distributions.distributions_ops import * # has __all__
 from measurement_stats.distributions.distributions_type \
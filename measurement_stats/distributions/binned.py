@@ -0,0 +1,199 @@
+import math
+import typing
+
+import numpy as np
+from scipy import fft
+
+import measurement_stats as mstats
+from measurement_stats import errors
+from measurement_stats.distributions import kernels
+
+DEFAULT_MAX_CLASSES = 64
+
+
+def uniform_spacing(x_values: np.ndarray) -> float:
+    """
+    Returns the spacing between the positions of a uniform grid such as
+    the ones created by distributions.uniform_range.
+
+    :param x_values:
+        A one dimensional array of increasing and evenly spaced positions
+    :return:
+        The spacing between neighboring positions
+    """
+
+    if len(x_values) < 2:
+        raise ValueError(errors.message(
+            """
+            A uniform grid must contain at least two positions
+            """
+        ))
+
+    delta = (x_values[-1] - x_values[0]) / (len(x_values) - 1)
+    expected = x_values[0] + delta * np.arange(len(x_values))
+    if not delta > 0 or np.max(np.abs(x_values - expected)) > 1e-6 * delta:
+        raise ValueError(errors.message(
+            """
+            Binned densities can only be evaluated on increasing, evenly
+            spaced positions like those created by uniform_range
+            """
+        ))
+
+    return float(delta)
+
+
+def width_classes(
+        widths: np.ndarray,
+        max_classes: int = DEFAULT_MAX_CLASSES
+) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """
+    Groups the kernel widths into classes that share a single kernel. Each
+    unique width is its own class unless there are more than max_classes of
+    them, in which case the widths are grouped into max_classes evenly
+    spaced logarithmic intervals that use the geometric mean width of their
+    members.
+
+    :param widths:
+    :param max_classes:
+    :return:
+        A tuple containing the widths of the classes and the index of the
+        class of each of the specified widths
+    """
+
+    unique, inverse = np.unique(widths, return_inverse=True)
+    if len(unique) <= max_classes:
+        return unique, inverse
+
+    logs = np.log(widths)
+    edges = np.linspace(logs.min(), logs.max(), max_classes + 1)
+    bins = np.searchsorted(edges, logs, 'right') - 1
+    bins = np.clip(bins, 0, max_classes - 1)
+
+    inverse = np.unique(bins, return_inverse=True)[1]
+    means = np.bincount(inverse, weights=logs) / np.bincount(inverse)
+    return np.exp(means), inverse
+
+
+def densities(
+        distribution: 'mstats.Distribution',
+        x_values: 'mstats.ArrayType',
+        measurement_heights: 'mstats.ArrayType' = None,
+        max_classes: int = DEFAULT_MAX_CLASSES
+) -> typing.Tuple[np.ndarray, float]:
+    """
+    Computes the densities of the distribution on a uniform grid of
+    positions as a convolution of the binned measurements with the kernel,
+    which takes O(G log G) time for G positions once the measurements have
+    been binned.
+
+    Each measurement is split between its two neighboring grid positions by
+    linear binning and the measurements of each width class are convolved
+    with a kernel of that width using the FFT. The grid is padded by
+    max_sigma of the widest kernel on either side so that the kernels of
+    measurements outside of the grid are included, and kernel values
+    beyond max_sigma widths are zero as they are for the truncated method.
+
+    The returned error is an upper bound on the absolute error of every
+    density when the kernel is Gaussian. It is the sum over the
+    measurements of the linear binning error, delta^2 / 8 times the
+    largest second derivative of the kernel, the kernel value at the
+    cutoff, the change in the kernel when the width of a measurement is
+    replaced by the width of its class and the floating point error of the
+    transforms. The bound shrinks with the square of the grid spacing
+    relative to the narrowest kernel, so the grid should be finer than the
+    narrowest uncertainty. For other kernels the error is not known and is
+    returned as NaN.
+
+    :param distribution:
+        The distribution for which the densities should be computed
+    :param x_values:
+        Increasing, evenly spaced positions such as those created by
+        distributions.uniform_range
+    :param measurement_heights:
+        (optional) Weights of the measurements like those of the heighted
+        densities of the distribution
+    :param max_classes:
+        The largest number of width classes, each of which requires a
+        separate transform
+    :return:
+        A tuple containing an array of the densities at each of the
+        positions and the bound on their absolute error
+    """
+
+    x_values = np.asarray(x_values, dtype=np.float64)
+    positions = x_values.reshape(-1)
+    delta = uniform_spacing(positions)
+
+    weights = (
+        np.ones(len(distribution.values))
+        if measurement_heights is None else
+        np.asarray(measurement_heights, dtype=np.float64)
+    )
+
+    widths = np.maximum(distribution.uncertainties, 1e-6)
+    class_widths, classes = width_classes(widths, max_classes)
+    max_sigma = distribution.max_sigma
+
+    pad = int(math.ceil(max_sigma * class_widths.max() / delta))
+    extended = len(positions) + 2 * pad
+    size = fft.next_fast_len(extended + 2 * pad, real=True)
+
+    # Linear binning onto the padded grid. Measurements beyond the padding
+    # are farther than max_sigma widths from every position and so have no
+    # effect on the densities.
+    t = (distribution.values - positions[0]) / delta + pad
+    inside = (t >= 0) & (t <= extended - 1)
+    lows = np.minimum(np.floor(t[inside]).astype(np.int64), extended - 2)
+    fractions = t[inside] - lows
+    inside_weights = weights[inside]
+    inside_classes = classes[inside]
+
+    offsets = delta * np.arange(-pad, pad + 1)
+    spectrum = np.zeros(size // 2 + 1, dtype=np.complex128)
+
+    for index, width in enumerate(class_widths):
+        members = inside_classes == index
+        if not np.any(members):
+            continue
+
+        member_lows = lows[members]
+        member_fractions = fractions[members]
+        member_weights = inside_weights[members]
+        binned_weights = (
+            np.bincount(
+                member_lows,
+                weights=member_weights * (1.0 - member_fractions),
+                minlength=extended
+            )
+            + np.bincount(
+                member_lows + 1,
+                weights=member_weights * member_fractions,
+                minlength=extended
+            )
+        )
+
+        kernel_values = distribution.kernel.many(offsets, 0.0, width)
+        kernel_values[np.abs(offsets) >= max_sigma * width] = 0.0
+
+        spectrum += (
+            fft.rfft(binned_weights, size)
+            * fft.rfft(kernel_values, size)
+        )
+
+    convolved = fft.irfft(spectrum, size)
+    out = convolved[2 * pad:2 * pad + len(positions)]
+
+    if distribution.kernel is not kernels.GAUSSIAN_KERNEL:
+        return out.reshape(x_values.shape), float('nan')
+
+    scale = np.abs(weights) / math.sqrt(2.0 * math.pi)
+    shared = class_widths[classes]
+    smallest = np.minimum(widths, shared)
+    error = np.sum(scale * (
+        delta ** 2 / (8.0 * shared ** 3)
+        + math.exp(-0.5 * max_sigma ** 2) / shared
+        + np.abs(widths - shared) / smallest ** 2
+        + np.finfo(np.float64).eps * math.log2(size) / shared
+    ))
+
+    return out.reshape(x_values.shape), float(error)
@@ -31,6 +31,6 @@ def to_unweighted_population(distribution_or_values):
     """
 
     if hasattr(distribution_or_values, 'measurements'):
-        return [x.value for x in distribution_or_values.measurements]
+        return distribution_or_values.values.tolist()
 
     return distribution_or_values
@@ -156,7 +156,7 @@ def adaptive_range(distribution, max_sigma, max_delta=None):
     return out
 
 
-def population(distribution, count=2048):
+def population(distribution, count=2048, rng=None):
     """
     Creates a list of numerical values (no uncertainty) of the specified
     length that are representative of the distribution for use in less robust
@@ -169,23 +169,29 @@ def population(distribution, count=2048):
         population list.
     :type: int
 
+    :param rng: (optional) A random.Random instance used to place the
+        values, which makes the population reproducible. If not specified
+        the global random module functions are used.
+
     :return: A list of numerical values that approximate the the measurement
         probability distributions distribution
     :rtype: list
     """
 
+    uniform = random.uniform if rng is None else rng.uniform
+
     out = []
     x_min = distribution.minimum_boundary(10)
     x_max = distribution.maximum_boundary(10)
 
     x = x_min
     delta = (x_max - x_min) / 512.0
-    total = float(len(distribution.measurements))
+    total = float(len(distribution.values))
 
     while x <= x_max:
         n = int(round(count * delta * distribution.probability_at(x)))
         for i in range(n):
-            out.append(random.uniform(
+            out.append(uniform(
                 x - 0.5 * delta,
                 x + 0.5 * delta
             ))
@@ -260,7 +266,7 @@ def overlap(distribution, comparison):
         my_area = dx * (
             min(my_value, my_next_value) +
             0.5 * abs(my_next_value - my_value)
-        ) / float(len(distribution.measurements))
+        ) / float(len(distribution.values))
 
         compare_area = dx * (
             min(compare_value, compare_next_value) +
@@ -5,9 +5,18 @@ import numpy as np
 import measurement_stats as mstats
 from measurement_stats import errors
 from measurement_stats import value
-from measurement_stats.value import ValueUncertainty
+from measurement_stats.value import ValueUncertaintyArray
+from measurement_stats.distributions import binned
+from measurement_stats.distributions import gauss_transform
 from measurement_stats.distributions import kernels
 
+DEFAULT_MEMORY_BUDGET = 16 * 1024 * 1024
+DEFAULT_MAX_SIGMA = 10.0
+
+METHODS = ('exact', 'truncated', 'fft', 'approximate')
+
+_DENSE_COUNT = 1024
+
 
 def create(
         measurements: 'mstats.ArrayType',
@@ -21,9 +30,10 @@ def create(
     instances, they are used directly to create the distribution and any
     value for the uncertainties argument is ignored.
 
-    If the measurements argument is an iterable of numeric types then
-    they are converted into ValueUncertainties using the uncertainties
-    argument.
+    If the measurements argument is an iterable of numeric types or a
+    ValueUncertaintyArray then the distribution is created from arrays of
+    the values and the uncertainties argument without creating a
+    ValueUncertainty for each measurement.
 
     :param kernel: (optional) A function with the signature
         kernel(x, measurement) that returns the probability for the given
@@ -46,50 +56,44 @@ def create(
     :rtype: Distribution
     """
 
-    if measurements is None or len(measurements) == 0:
+    if measurements is None:
         return None
 
-    measurements = list(measurements) + []
+    if isinstance(measurements, ValueUncertaintyArray):
+        if not len(measurements):
+            return None
+        return Distribution.from_arrays(measurements, kernel=kernel)
+
+    if not hasattr(measurements, '__len__'):
+        measurements = list(measurements)
+
+    if len(measurements) == 0:
+        return None
 
     if hasattr(measurements[0], 'raw'):
         # Already an iterable of ValueUncertainty instances
-        return Distribution(kernel=kernel, measurements=measurements)
+        return Distribution(kernel=kernel, measurements=list(measurements))
+
+    values = np.asarray(measurements, dtype=np.float64)
 
     if uncertainties is None:
         # If there is no uncertainty estimate one based on the spacing of the
         # points within the distribution and apply that to all of the
         # measurements
-        unc = kernels.uncertainty_estimate(measurements)
-        return Distribution(
-            kernel=kernel,
-            measurements=[ValueUncertainty(v, unc) for v in measurements]
-        )
-
-    try:
-        if len(measurements) != len(uncertainties):
-            raise ValueError(errors.message(
-                """
-                The measurements (length {}) and uncertainties
-                (length {}) arguments be equal length iterables
-                """,
-                len(measurements),
-                len(uncertainties)
-            ))
-
-        zipper = zip(measurements, uncertainties)
-        return Distribution(
-            kernel=kernel,
-            measurements=[ValueUncertainty(v, u) for v, u in zipper]
-        )
-    except TypeError:
-        # If the uncertainties are not a list then this will be raise and
-        # we assume that uncertainties is just a number
-        pass
+        unc = kernels.uncertainty_estimate(values)
+        return Distribution.from_arrays(values, unc, kernel)
+
+    if np.ndim(uncertainties) and len(values) != len(uncertainties):
+        raise ValueError(errors.message(
+            """
+            The measurements (length {}) and uncertainties
+            (length {}) arguments be equal length iterables
+            """,
+            len(values),
+            len(uncertainties)
+        ))
 
-    return Distribution(
-        kernel=kernel,
-        measurements=[ValueUncertainty(v, uncertainties) for v in measurements]
-    )
+    return Distribution.from_arrays(values, uncertainties, kernel)
 
 
 class Distribution(object):
@@ -106,24 +110,188 @@ class Distribution(object):
     A measurement is a ValueUncertainty instance, which resolves using the
     kernel function, to its own probability distribution along the
     measurement axis (i.e. the x axis).
+
+    Densities at many positions are evaluated as blocks of kernel values
+    with one row per position and one column per measurement. The memory
+    budget is the approximate number of bytes of each block, which limits
+    the number of positions evaluated at once.
+
+    The truncated method only evaluates the kernels whose centers lie
+    within max_sigma widths of each position, which are found with a
+    sorted index of the kernel centers that is created the first time it
+    is needed. The kernels are assumed to vanish outside of that range, as
+    the Gaussian kernel does. The fft method convolves the binned
+    measurements with the kernels on evenly spaced positions, see
+    binned.densities for its error bound. The approximate method evaluates
+    Gaussian kernels at arbitrary positions to within a tolerance with a
+    fast Gauss transform, see gauss_transform.densities.
+
+    The prepared kernel state and the sorted index are computed from the
+    values and uncertainties the first time they are needed and then kept
+    until the values, uncertainties or kernel are replaced. Changing the
+    elements of those arrays in place is not detected.
     """
 
     def __init__(
             self,
-            measurements: typing.List['mstats.ValueUncertainty'] = None,
-            kernel: kernels.Kernel = None
+            measurements: typing.Union[
+                typing.List['mstats.ValueUncertainty'],
+                'mstats.ValueUncertaintyArray'
+            ] = None,
+            kernel: kernels.Kernel = None,
+            memory_budget: int = None
     ):
+        self._sorted_index = None
+        self._kernel_state = None
         self.kernel = kernel if kernel else kernels.GAUSSIAN_KERNEL
+        self.memory_budget = (
+            memory_budget
+            if memory_budget is not None else
+            DEFAULT_MEMORY_BUDGET
+        )
+        self.max_sigma = DEFAULT_MAX_SIGMA
         self.measurements = measurements if measurements is not None else []
 
-        values, uncertainties = zip(*[
-            (m.value, m.uncertainty)
-            for m in self.measurements
-        ])
-        self.values = np.array(values)
-        self.uncertainties = np.array(uncertainties)
+    @classmethod
+    def from_arrays(
+            cls,
+            values: 'mstats.ArrayType',
+            uncertainties: 'mstats.ArrayType' = None,
+            kernel: kernels.Kernel = None,
+            memory_budget: int = None
+    ) -> 'Distribution':
+        """
+        Creates a distribution from one dimensional arrays of raw values and
+        uncertainties without creating a ValueUncertainty for each of the
+        measurements. The rounded values and uncertainties are computed
+        from the arrays directly and the measurements are only created if
+        they are accessed.
+
+        :param values:
+            An array of raw measurement values, such as a memory mapped
+            buffer, or a ValueUncertaintyArray in which case the
+            uncertainties argument is ignored.
+        :param uncertainties:
+            An array of raw uncertainties with the same length as the values
+            or a single uncertainty for all of the measurements.
+        :param kernel:
+        :param memory_budget:
+        :return:
+        """
+
+        if not isinstance(values, ValueUncertaintyArray):
+            if uncertainties is None:
+                raise ValueError(errors.message(
+                    """
+                    Uncertainties are required to create a distribution
+                    from an array of values
+                    """
+                ))
+            values = ValueUncertaintyArray(values, uncertainties)
+
+        return cls(
+            measurements=values,
+            kernel=kernel,
+            memory_budget=memory_budget
+        )
+
+    @property
+    def values(self) -> np.ndarray:
+        """
+        The rounded values of the measurements, which are the centers of
+        their kernels. Replacing them discards the prepared kernel state and
+        the sorted index.
+        """
+
+        return self._values
 
-    def density_at(self, x: float) -> float:
+    @values.setter
+    def values(self, values: np.ndarray):
+        self._values = values
+        self._kernel_state = None
+        self._sorted_index = None
+
+    @property
+    def uncertainties(self) -> np.ndarray:
+        """
+        The rounded uncertainties of the measurements, which are the widths
+        of their kernels. Replacing them discards the prepared kernel state
+        and the sorted index.
+        """
+
+        return self._uncertainties
+
+    @uncertainties.setter
+    def uncertainties(self, uncertainties: np.ndarray):
+        self._uncertainties = uncertainties
+        self._kernel_state = None
+        self._sorted_index = None
+
+    @property
+    def kernel(self) -> kernels.Kernel:
+        """
+        The kernel that distributes the probability of each measurement
+        along the measurement axis. Replacing it discards the prepared
+        kernel state.
+        """
+
+        return self._kernel
+
+    @kernel.setter
+    def kernel(self, kernel: kernels.Kernel):
+        self._kernel = kernel
+        self._kernel_state = None
+
+    @property
+    def measurements(self) -> typing.List['mstats.ValueUncertainty']:
+        """
+        The measurements of the distribution as ValueUncertainty instances.
+        For distributions created from arrays they are created the first
+        time they are accessed. Replacing them replaces the values and
+        uncertainties of the distribution.
+        """
+
+        if self._measurements is None:
+            self._measurements = self._array.to_list()
+        return self._measurements
+
+    @measurements.setter
+    def measurements(
+            self,
+            measurements: typing.Union[
+                typing.List['mstats.ValueUncertainty'],
+                'mstats.ValueUncertaintyArray'
+            ]
+    ):
+        if isinstance(measurements, ValueUncertaintyArray):
+            self._array = measurements
+            self._measurements = None
+            self.values, self.uncertainties = value.round_measurements_many(
+                measurements.raw,
+                measurements.raw_uncertainty
+            )
+            return
+
+        self._array = None
+        self._measurements = measurements
+        self.values = np.array([m.value for m in measurements], dtype=float)
+        self.uncertainties = np.array(
+            [m.uncertainty for m in measurements],
+            dtype=float
+        )
+
+    @property
+    def measurement_array(self) -> 'mstats.ValueUncertaintyArray':
+        """
+        The raw values and uncertainties of the measurements of the
+        distribution as a ValueUncertaintyArray
+        """
+
+        if self._array is None:
+            self._array = ValueUncertaintyArray.from_list(self._measurements)
+        return self._array
+
+    def density_at(self, x: float, method: str = 'exact') -> float:
         """
         Returns the density of the distribution at the given position
         on the measurement axis (x).
@@ -131,20 +299,276 @@ class Distribution(object):
         :param x:
             The position along the measurement axis where the density
             will be calculated.
+        :param method:
+            The density method, see densities_at. The fft method requires
+            at least two evenly spaced positions, so a single position is
+            evaluated with the truncated method instead.
 
         :return:
             The density at the specified position on the measurement axis.
         """
-        return float(np.sum(self.kernel.many(
-            x,
-            self.values,
-            self.uncertainties
-        )))
+        if method == 'fft':
+            method = 'truncated'
+        if method != 'exact':
+            return float(self.densities_at([x], method)[0])
+
+        return float(np.sum(self.kernel_values(x)))
+
+    def kernel_state(self) -> typing.Any:
+        """
+        Returns the state of the kernels created by the prepare function of
+        the kernel, which is computed the first time it is needed and kept
+        for later evaluations. Returns None if the kernel does not declare
+        a prepare function.
+
+        :return:
+        """
+
+        if self._kernel_state is None and self.kernel.prepare is not None:
+            self._kernel_state = self.kernel.prepare(
+                self.values,
+                self.uncertainties
+            )
+        return self._kernel_state
+
+    def kernel_values(self, x: typing.Union[float, np.ndarray]) -> np.ndarray:
+        """
+        Evaluates the kernels of all of the measurements at the position x,
+        which is broadcast against the measurements, using the prepared
+        kernel state when the kernel supports it.
+
+        :param x:
+        :return:
+        """
+
+        state = self.kernel_state()
+        if state is not None:
+            return self.kernel.prepared_many(x, state)
+        return self.kernel.many(x, self.values, self.uncertainties)
+
+    def sorted_index(self) -> typing.List[typing.Tuple[np.ndarray, ...]]:
+        """
+        Returns the index of the kernels used by the truncated method. The
+        kernels are grouped into classes of widths that differ by less than
+        a factor of two and each class is sorted by the kernel centers, so
+        that the kernels near a position can be found with a binary search.
+
+        :return:
+            A list with a tuple for each width class containing the sorted
+            centers, the corresponding widths, the indices of the
+            corresponding measurements and the largest width in the class
+        """
+
+        if self._sorted_index is not None:
+            return self._sorted_index
+
+        widths = np.maximum(self.uncertainties, 1e-6)
+        classes = np.floor(np.log2(widths)).astype(np.int64)
+        order = np.lexsort((self.values, classes))
+        bounds = np.flatnonzero(np.diff(classes[order])) + 1
+
+        self._sorted_index = [
+            (
+                self.values[indices],
+                widths[indices],
+                indices,
+                float(widths[indices].max())
+            )
+            for indices in np.split(order, bounds)
+            if len(indices)
+        ]
+        return self._sorted_index
+
+    def _truncated_values(
+            self,
+            x: np.ndarray,
+            centers: np.ndarray,
+            widths: np.ndarray
+    ) -> np.ndarray:
+        """
+        Returns the kernel values at the positions with the values of the
+        kernels that are at least max_sigma widths away set to zero.
+
+        :param x:
+        :param centers:
+        :param widths:
+        :return:
+        """
+
+        kernel_values = self.kernel.many(x, centers, widths)
+        kernel_values[np.abs(x - centers) >= self.max_sigma * widths] = 0.0
+        return kernel_values
+
+    def _truncated_sums(
+            self,
+            positions: np.ndarray,
+            measurement_heights: np.ndarray = None
+    ) -> np.ndarray:
+        """
+        Returns the sums of the kernel values at each position using only
+        the kernels within max_sigma widths of it.
+
+        Positions with many nearby kernels evaluate the contiguous range of
+        sorted kernels directly. The remaining pairs of positions and
+        kernels are gathered and evaluated together in blocks limited by
+        the memory budget, which avoids a separate evaluation for each of
+        many positions that only have a few nearby kernels.
+
+        :param positions:
+        :param measurement_heights:
+        :return:
+        """
+
+        out = np.zeros(len(positions))
+        limit = max(1, int(self.memory_budget // 8))
+
+        for centers, widths, indices, largest in self.sorted_index():
+            heights = (
+                None
+                if measurement_heights is None else
+                measurement_heights[indices]
+            )
+
+            reach = self.max_sigma * largest
+            lows = np.searchsorted(centers, positions - reach, 'left')
+            highs = np.searchsorted(centers, positions + reach, 'right')
+            counts = highs - lows
+
+            dense = counts >= _DENSE_COUNT
+            for i in np.flatnonzero(dense):
+                window = slice(lows[i], highs[i])
+                kernel_values = self._truncated_values(
+                    positions[i],
+                    centers[window],
+                    widths[window]
+                )
+                out[i] += (
+                    kernel_values.sum()
+                    if heights is None else
+                    kernel_values.dot(heights[window])
+                )
+
+            sparse = np.flatnonzero(~dense & (counts > 0))
+            if not len(sparse):
+                continue
+
+            # Splits the positions into groups with at most limit pairs
+            # unless a single position exceeds it on its own
+            ends = np.cumsum(counts[sparse])
+            splits = np.searchsorted(
+                ends,
+                np.arange(limit, ends[-1], limit),
+                'right'
+            )
+
+            for group in np.split(sparse, splits):
+                if not len(group):
+                    continue
+
+                group_counts = counts[group]
+                total = int(group_counts.sum())
+                queries = np.repeat(group, group_counts)
+                starts = np.cumsum(group_counts) - group_counts
+                pairs = (
+                    np.arange(total)
+                    + np.repeat(lows[group] - starts, group_counts)
+                )
+
+                kernel_values = self._truncated_values(
+                    positions[queries],
+                    centers[pairs],
+                    widths[pairs]
+                )
+                if heights is not None:
+                    kernel_values *= heights[pairs]
+
+                out += np.bincount(
+                    queries,
+                    weights=kernel_values,
+                    minlength=len(positions)
+                )
+
+        return out
+
+    def _grid_sums(
+            self,
+            x_values: 'mstats.ArrayType',
+            measurement_heights: 'mstats.ArrayType' = None,
+            method: str = 'exact',
+            tolerance: float = None
+    ) -> np.ndarray:
+        """
+        Returns the sums of the kernel values of all measurements at each of
+        the positions, optionally weighted by the measurement heights. The
+        kernels are evaluated for blocks of positions at once, where each
+        block is limited in size by the memory budget of the distribution.
+
+        :param x_values:
+        :param measurement_heights:
+        :param method:
+        :param tolerance:
+        :return:
+            An array of sums with the same shape as the x values
+        """
+
+        if method not in METHODS:
+            raise ValueError(errors.message(
+                """
+                Unknown density method "{}". The method must be one of: {}
+                """,
+                method,
+                ', '.join(METHODS)
+            ))
+
+        x_values = np.asarray(x_values, dtype=np.float64)
+        positions = x_values.reshape(-1)
+
+        if measurement_heights is not None:
+            measurement_heights = np.asarray(
+                measurement_heights,
+                dtype=np.float64
+            )
+
+        if method == 'truncated':
+            out = self._truncated_sums(positions, measurement_heights)
+            return out.reshape(x_values.shape)
+
+        if method == 'fft':
+            out = binned.densities(self, positions, measurement_heights)[0]
+            return out.reshape(x_values.shape)
+
+        if method == 'approximate':
+            out = gauss_transform.densities(
+                self,
+                positions,
+                measurement_heights,
+                gauss_transform.DEFAULT_TOLERANCE
+                if tolerance is None else
+                tolerance
+            )[0]
+            return out.reshape(x_values.shape)
+
+        out = np.zeros(positions.shape)
+        row_size = 8 * max(1, len(self.values))
+        rows = max(1, int(self.memory_budget // row_size))
+
+        for start in range(0, len(positions), rows):
+            block = self.kernel_values(
+                positions[start:start + rows, np.newaxis]
+            )
+            if measurement_heights is None:
+                out[start:start + rows] = block.sum(axis=1)
+            else:
+                out[start:start + rows] = block.dot(measurement_heights)
+
+        return out.reshape(x_values.shape)
 
     def densities_at(
             self,
-            x_values: 'mstats.ArrayType'
-    ) -> typing.List[float]:
+            x_values: 'mstats.ArrayType',
+            method: str = 'exact',
+            tolerance: float = None
+    ) -> np.ndarray:
         """
         The densities for the distribution at the given locations on
         the measurement (x) axis.
@@ -152,12 +576,21 @@ class Distribution(object):
         :param x_values:
             An iterable containing the values where the
             probability of the distribution should be calculated
+        :param method:
+            Either 'exact' to evaluate every kernel, 'truncated' to only
+            evaluate the kernels within max_sigma widths of each position,
+            'fft' to convolve the binned measurements with the kernels
+            when the positions are evenly spaced or 'approximate' to use a
+            fast Gauss transform.
+        :param tolerance:
+            (optional) The error allowed by the approximate method relative
+            to the sum of the kernel peaks. Ignored by the other methods.
 
         :return:
-            A list containing the normalized probabilities at each of the
-            specified position values (floats)
+            An array containing the densities at each of the specified
+            position values
         """
-        return [self.density_at(x) for x in x_values]
+        return self._grid_sums(x_values, None, method, tolerance)
 
     def heighted_density_at(
             self,
@@ -166,21 +599,40 @@ class Distribution(object):
     ) -> float:
         """..."""
         return float(np.sum(
-            self.kernel.many(x, self.values, self.uncertainties)
-            * np.array(measurement_heights)
+            self.kernel_values(x) * np.array(measurement_heights)
         ))
 
     def heighted_densities_at(
             self,
             x_values: typing.List[float],
-            measurement_heights: 'mstats.ArrayType'
-    ) -> typing.List[float]:
-        return [
-            self.heighted_density_at(x, measurement_heights)
-            for x in x_values
-        ]
+            measurement_heights: 'mstats.ArrayType',
+            method: str = 'exact',
+            tolerance: float = None
+    ) -> np.ndarray:
+        """
+        The densities for the distribution at the given locations on the
+        measurement (x) axis, where the kernel of each measurement is
+        weighted by its height.
+
+        :param x_values:
+        :param measurement_heights:
+        :param method:
+            The density method, see densities_at
+        :param tolerance:
+            (optional) The tolerance of the approximate method
+
+        :return:
+            An array containing the heighted densities at each of the
+            specified position values
+        """
+        return self._grid_sums(
+            x_values,
+            measurement_heights,
+            method,
+            tolerance
+        )
 
-    def probability_at(self, x: float) -> float:
+    def probability_at(self, x: float, method: str = 'exact') -> float:
         """
         Returns the probability of the distribution at the given position
         on the measurement axis (x)
@@ -188,17 +640,21 @@ class Distribution(object):
         :param x:
             The position along the measurement axis where the probability
             will be calculated.
+        :param method:
+            The density method, see densities_at
 
         :return:
             The probability (normalized to a maximum of 1.0) at the
             specified position on the measurement axis
         """
-        return self.density_at(x) / len(self.measurements)
+        return self.density_at(x, method) / len(self.values)
 
     def probabilities_at(
             self,
-            x_values: 'mstats.ArrayType'
-    ) -> typing.List[float]:
+            x_values: 'mstats.ArrayType',
+            method: str = 'exact',
+            tolerance: float = None
+    ) -> np.ndarray:
         """
         The probabilities for the distribution at the given locations on
         the measurement (x) axis.
@@ -206,14 +662,18 @@ class Distribution(object):
         :param x_values:
             An iterable containing the values where the
             probability of the distribution should be calculated
+        :param method:
+            The density method, see densities_at
+        :param tolerance:
+            (optional) The tolerance of the approximate method
 
         :return:
-            A list containing the normalized probabilities at each of the
-            specified position values (floats)
+            An array containing the normalized probabilities at each of the
+            specified position values
         """
-        return list(
-            np.array(self.densities_at(x_values))
-            / len(self.measurements)
+        return (
+            self.densities_at(x_values, method, tolerance)
+            / len(self.values)
         )
 
     def heighted_probability_at(
@@ -230,13 +690,40 @@ class Distribution(object):
     def heighted_probabilities_at(
             self,
             x_values: 'mstats.ArrayType',
-            measurement_heights: 'mstats.ArrayType'
-    ) -> typing.List[float]:
-        return list(
-            np.array(self.heighted_densities_at(x_values, measurement_heights))
+            measurement_heights: 'mstats.ArrayType',
+            method: str = 'exact',
+            tolerance: float = None
+    ) -> np.ndarray:
+        """
+        The heighted densities for the distribution at the given locations
+        on the measurement (x) axis, normalized by the sum of the heights.
+
+        :param x_values:
+        :param measurement_heights:
+        :param method:
+            The density method, see densities_at
+        :param tolerance:
+            (optional) The tolerance of the approximate method
+
+        :return:
+            An array containing the normalized probabilities at each of the
+            specified position values
+        """
+        return (
+            self.heighted_densities_at(
+                x_values,
+                measurement_heights,
+                method,
+                tolerance
+            )
             / np.sum(np.array(measurement_heights))
         )
 
+    def _measurement(self, index: int) -> 'mstats.ValueUncertainty':
+        if self._measurements is None:
+            return self._array[int(index)]
+        return self._measurements[int(index)]
+
     def minimum_value(self):
         """
         The lowest measurement value in the distribution
@@ -245,17 +732,14 @@ class Distribution(object):
         :rtype: value.ValueUncertainty
         """
 
-        if not len(self.measurements):
+        if not len(self.values):
             return None
 
-        item = self.measurements[0]
-        for v in self.measurements[1:]:
-            if v.value == item.value and v.uncertainty > item.uncertainty:
-                item = v
-            elif v.value < item.value:
-                item = v
-
-        return item
+        # The first of the lowest values with the largest uncertainty
+        candidates = np.flatnonzero(self.values == self.values.min())
+        return self._measurement(
+            candidates[np.argmax(self.uncertainties[candidates])]
+        )
 
     def maximum_value(self):
         """
@@ -265,17 +749,14 @@ class Distribution(object):
         :rtype: value.ValueUncertainty
         """
 
-        if not len(self.measurements):
+        if not len(self.values):
             return None
 
-        point = self.measurements[0]
-        for m in self.measurements[1:]:
-            if m.value == point.value and m.uncertainty > point.uncertainty:
-                point = m
-            elif m.value > point.value:
-                point = m
-
-        return point
+        # The first of the highest values with the largest uncertainty
+        candidates = np.flatnonzero(self.values == self.values.max())
+        return self._measurement(
+            candidates[np.argmax(self.uncertainties[candidates])]
+        )
 
     def naked_measurement_values(self, raw=False):
         """
@@ -290,7 +771,9 @@ class Distribution(object):
         :rtype: list
         """
 
-        return [(m.raw if raw else m.value) for m in self.measurements]
+        if raw:
+            return self.measurement_array.raw.tolist()
+        return self.values.tolist()
 
     def minimum_boundary(self, sigma_threshold):
         """
@@ -316,12 +799,11 @@ class Distribution(object):
         :rtype: float
         """
 
-        if not len(self.measurements):
+        if not len(self.values):
             return 0.0
-        return min([
-            (m.value - float(sigma_threshold) * m.uncertainty)
-            for m in self.measurements
-        ])
+        return float(np.min(
+            self.values - float(sigma_threshold) * self.uncertainties
+        ))
 
     def maximum_boundary(self, sigma_threshold):
         """
@@ -347,10 +829,9 @@ class Distribution(object):
         :rtype: float
         """
 
-        if not len(self.measurements):
+        if not len(self.values):
             return 0.0
-        return max([
-            (m.value + float(sigma_threshold) * m.uncertainty)
-            for m in self.measurements
-        ])
+        return float(np.max(
+            self.values + float(sigma_threshold) * self.uncertainties
+        ))
 
@@ -0,0 +1,335 @@
+import math
+import typing
+
+import numpy as np
+
+import measurement_stats as mstats
+from measurement_stats import errors
+from measurement_stats.distributions import kernels
+
+DEFAULT_TOLERANCE = 1e-6
+
+# Half the length of the interval covered by each cluster of sources in
+# units of the scaled kernel width
+CLUSTER_RADIUS = 0.5
+
+MAX_ORDER = 100
+
+
+def parameters(tolerance: float) -> typing.Tuple[float, int, float]:
+    """
+    Chooses the cutoff radius and truncation order of the expansions so
+    that the error of each kernel value is at most the tolerance relative
+    to the peak of the kernel.
+
+    With scaled distances a = |x - c| / s and b = |y - c| / s between the
+    target x, source y and cluster center c, where s is the kernel width
+    times the square root of two, the remainder of an expansion with p
+    terms is at most (2ab)^p / p! exp(-(a - b)^2). Its largest value for
+    b <= r is at b = r and a = (r + sqrt(r^2 + 2p)) / 2, unless the cutoff
+    is closer. Sources in clusters farther than the cutoff radius are
+    skipped, which is at most exp(-(cutoff - r)^2).
+
+    :param tolerance:
+    :return:
+        A tuple containing the cutoff radius in units of the scaled kernel
+        width, the number of terms of the expansions and the error bound
+        relative to the kernel peak
+    """
+
+    if not 0 < tolerance < 1:
+        raise ValueError(errors.message(
+            """
+            The tolerance must be between 0 and 1, not {}
+            """,
+            tolerance
+        ))
+
+    radius = CLUSTER_RADIUS
+    cutoff = radius + math.sqrt(math.log(2.0 / tolerance))
+    skipped = math.exp(-(cutoff - radius) ** 2)
+
+    for order in range(1, MAX_ORDER + 1):
+        a = min(cutoff, 0.5 * (radius + math.sqrt(radius ** 2 + 2 * order)))
+        remainder = math.exp(
+            order * math.log(2.0 * a * radius)
+            - math.lgamma(order + 1)
+            - (a - radius) ** 2
+        )
+        if remainder + skipped <= tolerance:
+            return cutoff, order, remainder + skipped
+
+    return cutoff, MAX_ORDER, remainder + skipped
+
+
+def _pair_sums(
+        positions: np.ndarray,
+        centers: np.ndarray,
+        reach: float,
+        evaluate: typing.Callable[[np.ndarray, np.ndarray], np.ndarray],
+        memory_budget: int
+) -> np.ndarray:
+    """
+    Sums the values of the pairs of positions and sorted centers that are
+    within reach of each other. The pairs are gathered in blocks limited by
+    the memory budget and evaluated by calling evaluate with the indices of
+    the positions and centers of each pair.
+
+    :param positions:
+    :param centers:
+    :param reach:
+    :param evaluate:
+    :param memory_budget:
+    :return:
+    """
+
+    out = np.zeros(len(positions))
+    lows = np.searchsorted(centers, positions - reach, 'left')
+    highs = np.searchsorted(centers, positions + reach, 'right')
+    counts = highs - lows
+
+    occupied = np.flatnonzero(counts)
+    if not len(occupied):
+        return out
+
+    limit = max(1, int(memory_budget // 8))
+    ends = np.cumsum(counts[occupied])
+    splits = np.searchsorted(ends, np.arange(limit, ends[-1], limit), 'right')
+
+    for group in np.split(occupied, splits):
+        if not len(group):
+            continue
+
+        group_counts = counts[group]
+        queries = np.repeat(group, group_counts)
+        starts = np.cumsum(group_counts) - group_counts
+        pairs = (
+            np.arange(int(group_counts.sum()))
+            + np.repeat(lows[group] - starts, group_counts)
+        )
+
+        out += np.bincount(
+            queries,
+            weights=evaluate(queries, pairs),
+            minlength=len(positions)
+        )
+
+    return out
+
+
+def _expansion_sums(
+        positions: np.ndarray,
+        sources: np.ndarray,
+        weights: np.ndarray,
+        scale: float,
+        cutoff: float,
+        order: int,
+        memory_budget: int
+) -> np.ndarray:
+    """
+    Sums the Gaussian kernels exp(-((x - y) / scale)^2) of the weighted
+    sources at each position with truncated Taylor expansions about the
+    centers of clusters of the sources.
+
+    :param positions:
+    :param sources:
+    :param weights:
+    :param scale:
+    :param cutoff:
+    :param order:
+    :param memory_budget:
+    :return:
+    """
+
+    size = 2.0 * CLUSTER_RADIUS * scale
+    cells = np.floor((sources - sources.min()) / size)
+    cells, clusters = np.unique(cells, return_inverse=True)
+    centers = sources.min() + (cells + 0.5) * size
+
+    # The coefficient of term n of cluster k is the sum over its sources
+    # of w exp(-d^2) (2d)^n / n! for the scaled distance d to the center
+    distances = (sources - centers[clusters]) / scale
+    term = weights * np.exp(-distances ** 2)
+    coefficients = np.empty((order, len(centers)))
+    for n in range(order):
+        if n:
+            term = term * (2.0 * distances / n)
+        coefficients[n] = np.bincount(
+            clusters,
+            weights=term,
+            minlength=len(centers)
+        )
+
+    def evaluate(queries, pairs):
+        a = (positions[queries] - centers[pairs]) / scale
+        result = coefficients[order - 1][pairs]
+        for n in range(order - 2, -1, -1):
+            result = result * a + coefficients[n][pairs]
+        return result * np.exp(-a ** 2)
+
+    return _pair_sums(
+        positions,
+        centers,
+        cutoff * scale,
+        evaluate,
+        memory_budget
+    )
+
+
+def _direct_sums(
+        positions: np.ndarray,
+        sources: np.ndarray,
+        weights: np.ndarray,
+        scales: np.ndarray,
+        cutoff: float,
+        memory_budget: int
+) -> np.ndarray:
+    """
+    Sums the Gaussian kernels exp(-((x - y) / scale)^2) of the weighted
+    sources that are within the cutoff of each position directly. The
+    sources are grouped into classes of scales that differ by less than a
+    factor of two so that each class can be searched with one reach.
+
+    :param positions:
+    :param sources:
+    :param weights:
+    :param scales:
+    :param cutoff:
+    :param memory_budget:
+    :return:
+    """
+
+    out = np.zeros(len(positions))
+    classes = np.floor(np.log2(scales)).astype(np.int64)
+    order = np.lexsort((sources, classes))
+    bounds = np.flatnonzero(np.diff(classes[order])) + 1
+
+    for indices in np.split(order, bounds):
+        centers = sources[indices]
+        class_scales = scales[indices]
+        class_weights = weights[indices]
+
+        def evaluate(queries, pairs):
+            d = (positions[queries] - centers[pairs]) / class_scales[pairs]
+            result = class_weights[pairs] * np.exp(-d ** 2)
+            result[np.abs(d) >= cutoff] = 0.0
+            return result
+
+        out += _pair_sums(
+            positions,
+            centers,
+            cutoff * class_scales.max(),
+            evaluate,
+            memory_budget
+        )
+
+    return out
+
+
+def densities(
+        distribution: 'mstats.Distribution',
+        x_values: 'mstats.ArrayType',
+        measurement_heights: 'mstats.ArrayType' = None,
+        tolerance: float = DEFAULT_TOLERANCE
+) -> typing.Tuple[np.ndarray, float]:
+    """
+    Approximates the densities of a distribution with Gaussian kernels at
+    arbitrary positions with an improved fast Gauss transform, which takes
+    O(N + M) time for N measurements and M positions instead of O(N M).
+
+    The measurements are grouped by width and the measurements of each
+    width are gathered into clusters that are small relative to that
+    width. The kernels of each cluster are replaced by a truncated Taylor
+    expansion about its center, which is evaluated at the positions within
+    a cutoff radius of the cluster. Widths with too few measurements for
+    the expansions to be worthwhile are evaluated directly instead.
+
+    The error of each density is at most the tolerance times the sum of
+    the peaks of the kernels, i.e. the sum of the absolute heights divided
+    by sqrt(2 pi) times the width of each measurement. The bound that is
+    actually achieved is returned with the densities.
+
+    :param distribution:
+        A distribution with the default Gaussian kernel
+    :param x_values:
+        The positions where the densities should be computed
+    :param measurement_heights:
+        (optional) Weights of the measurements like those of the heighted
+        densities of the distribution
+    :param tolerance:
+        The largest error allowed relative to the sum of the kernel peaks
+    :return:
+        A tuple containing an array of the densities at each of the
+        positions and the bound on their absolute error
+    """
+
+    if distribution.kernel is not kernels.GAUSSIAN_KERNEL:
+        raise ValueError(errors.message(
+            """
+            Approximate densities can only be computed for distributions
+            with the Gaussian kernel
+            """
+        ))
+
+    cutoff, order, relative_error = parameters(tolerance)
+
+    x_values = np.asarray(x_values, dtype=np.float64)
+    positions = x_values.reshape(-1)
+    sources = np.asarray(distribution.values, dtype=np.float64)
+
+    widths = np.maximum(distribution.uncertainties, 1e-6)
+    weights = (
+        np.ones(len(sources))
+        if measurement_heights is None else
+        np.asarray(measurement_heights, dtype=np.float64)
+    )
+    weights = weights / (math.sqrt(2.0 * math.pi) * widths)
+
+    out = np.zeros(len(positions))
+    direct = np.zeros(len(sources), dtype=bool)
+    budget = distribution.memory_budget
+
+    unique, inverse = np.unique(widths, return_inverse=True)
+    order_by_width = np.argsort(inverse, kind='stable')
+    bounds = np.flatnonzero(np.diff(inverse[order_by_width])) + 1
+
+    for members in np.split(order_by_width, bounds):
+        if not len(members):
+            continue
+
+        scale = math.sqrt(2.0) * widths[members[0]]
+        member_sources = sources[members]
+        extent = member_sources.max() - member_sources.min()
+        clusters = min(
+            len(members),
+            1 + int(extent / (2.0 * CLUSTER_RADIUS * scale))
+        )
+
+        # An expansion costs as much as order sources, so measurements
+        # that are too sparse are cheaper to evaluate directly
+        if len(members) < order * clusters:
+            direct[members] = True
+            continue
+
+        out += _expansion_sums(
+            positions,
+            member_sources,
+            weights[members],
+            scale,
+            cutoff,
+            order,
+            budget
+        )
+
+    if np.any(direct):
+        out += _direct_sums(
+            positions,
+            sources[direct],
+            weights[direct],
+            math.sqrt(2.0) * widths[direct],
+            cutoff,
+            budget
+        )
+
+    error = relative_error * np.sum(np.abs(weights))
+    return out.reshape(x_values.shape), float(error)
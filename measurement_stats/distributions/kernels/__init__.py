@@ -7,15 +7,31 @@ from measurement_stats.distributions.kernels import gaussians
 
 
 class Kernel(typing.NamedTuple):
-    """Data structure for Kernel objects."""
+    """
+    Data structure for Kernel objects.
+
+    Kernels can optionally declare a prepare function that computes the
+    state of the kernels, such as normalization coefficients, from the
+    values and uncertainties of a distribution. The distribution keeps
+    that state and passes it to prepared_many in place of the values and
+    uncertainties, so that it is only computed once per distribution.
+    """
 
     single: typing.Callable[[float, 'mstats.ValueUncertainty', float], float]
     many: typing.Callable[[float, np.array, np.array], np.array]
+    prepare: typing.Optional[
+        typing.Callable[[np.array, np.array], typing.Any]
+    ] = None
+    prepared_many: typing.Optional[
+        typing.Callable[[float, typing.Any], np.array]
+    ] = None
 
 
 GAUSSIAN_KERNEL = Kernel(
     single=gaussians.gaussian,
-    many=gaussians.gaussian_many
+    many=gaussians.gaussian_many,
+    prepare=gaussians.prepare_gaussians,
+    prepared_many=gaussians.gaussian_prepared
 )
 
 
@@ -36,11 +52,10 @@ def uncertainty_estimate(values):
     :rtype: float
     """
 
-    test = list(values) + []
-    test.sort()
+    if not hasattr(values, '__len__'):
+        values = list(values)
 
-    deltas = []
-    for i in range(len(test) - 1):
-        deltas.append(abs(test[i] - test[i + 1]))
+    test = np.sort(np.asarray(values, dtype=np.float64))
+    deltas = np.abs(np.diff(test))
 
     return max(0.00001, 0.5 * float(np.median(deltas)))
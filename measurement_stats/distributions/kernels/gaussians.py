@@ -1,4 +1,6 @@
 import math
+import typing
+
 import numpy as np
 
 import measurement_stats as mstats
@@ -42,7 +44,7 @@ def gaussian(
 
 
 def gaussian_many(
-        x: float,
+        x: typing.Union[float, np.ndarray],
         values: np.array,
         uncertainties: np.array
 ) -> np.array:
@@ -52,12 +54,77 @@ def gaussian_many(
     and width (standard deviation)
 
     :param x:
+        A position or an array of positions that is broadcast against the
+        values and uncertainties. For example, a column of shape (n, 1)
+        evaluates every kernel at n positions and returns an array with one
+        row per position.
     :param values:
     :param uncertainties:
     :return:
     """
-    center = np.array(values)
-    width = np.maximum(np.array(uncertainties), 1e-6)
+    center = np.asarray(values, dtype=np.float64)
+    width = np.maximum(np.asarray(uncertainties, dtype=np.float64), 1e-6)
     coefficient = 1 / np.sqrt(2.0 * math.pi * width * width)
-    exponent = -0.5 * ((float(x) - center) ** 2) / (width * width)
-    return coefficient * np.exp(exponent)
+
+    # The operations are applied in place where possible because the
+    # broadcast result can be much larger than the measurements
+    exponent = np.asarray(x, dtype=np.float64) - center
+    exponent /= width
+    exponent *= exponent
+    exponent *= -0.5
+    result = np.exp(exponent)
+    result *= coefficient
+    return result
+
+
+class GaussianState(typing.NamedTuple):
+    """Precomputed state of many Gaussian kernels."""
+
+    centers: np.ndarray
+    widths: np.ndarray
+    coefficients: np.ndarray
+    exponent_factors: np.ndarray
+
+
+def prepare_gaussians(
+        values: np.array,
+        uncertainties: np.array
+) -> GaussianState:
+    """
+    Computes the state used by gaussian_prepared for Gaussian kernels
+    defined by the values and uncertainties, which contains the clamped
+    widths, the normalization coefficients and the inverse variances
+    multiplied by -0.5.
+
+    :param values:
+    :param uncertainties:
+    :return:
+    """
+    centers = np.asarray(values, dtype=np.float64)
+    widths = np.maximum(np.asarray(uncertainties, dtype=np.float64), 1e-6)
+    return GaussianState(
+        centers=centers,
+        widths=widths,
+        coefficients=1 / np.sqrt(2.0 * math.pi * widths * widths),
+        exponent_factors=-0.5 / (widths * widths)
+    )
+
+
+def gaussian_prepared(
+        x: typing.Union[float, np.ndarray],
+        state: GaussianState
+) -> np.array:
+    """
+    Evaluates the Gaussian kernels of the prepared state at the given x
+    position or positions in the same way as gaussian_many.
+
+    :param x:
+    :param state:
+    :return:
+    """
+    exponent = np.asarray(x, dtype=np.float64) - state.centers
+    exponent *= exponent
+    exponent *= state.exponent_factors
+    result = np.exp(exponent)
+    result *= state.coefficients
+    return result
@@ -6,8 +6,45 @@ from __future__ import unicode_literals
 import math
 import numpy as np
 
+from measurement_stats import errors
 from measurement_stats import value
 
+# Uncertainties are floored at the smallest kernel width of the
+# distributions, so that measurements without uncertainty have a large but
+# finite weight
+MIN_UNCERTAINTY = 1e-6
+
+
+def _weights(uncertainties):
+    """
+    Returns the weights of measurements with the specified array of
+    uncertainties, which are floored at MIN_UNCERTAINTY.
+
+    :param uncertainties:
+    :return:
+    """
+
+    u = np.maximum(uncertainties, MIN_UNCERTAINTY)
+    return 1.0 / (u * u)
+
+
+def _collection(values):
+    """
+    Unwraps the arguments of the mean functions, which are either the
+    measurements themselves or a single list, tuple or ValueUncertaintyArray
+    containing them.
+
+    :param values:
+    :return:
+    """
+
+    if values and isinstance(
+            values[0],
+            (list, tuple, value.ValueUncertaintyArray)
+    ):
+        return values[0]
+    return values
+
 
 def unweighted(*values):
     """
@@ -16,15 +53,15 @@ def unweighted(*values):
     :return:
     """
 
-    if not values:
+    values = _collection(values)
+    if not len(values):
         return value.ValueUncertainty()
 
-    if isinstance(values[0], (list, tuple)):
-        values = values[0]
-        if not values:
-            return value.ValueUncertainty()
+    if isinstance(values, value.ValueUncertaintyArray):
+        values = values.value
+    else:
+        values = [v.value for v in values]
 
-    values = [v.value for v in values]
     return value.ValueUncertainty(
             value=float(np.mean(values)),
             uncertainty=float(np.std(values))
@@ -42,18 +79,24 @@ def weighted(*values):
     :return:
     """
 
-    if not values:
+    values = _collection(values)
+    if not len(values):
         return value.ValueUncertainty()
 
-    if isinstance(values[0], (list, tuple)):
-        values = values[0]
-        if not values:
-            return value.ValueUncertainty()
+    if isinstance(values, value.ValueUncertaintyArray):
+        w = _weights(values.uncertainty)
+        ws = float(np.sum(w))
+        ave = float(np.sum(w * values.value)) / ws
+        return value.ValueUncertainty(
+            value=ave,
+            uncertainty=1.0 / math.sqrt(ws)
+        )
 
     wxs = 0.0
     ws = 0.0
     for v in values:
-        w = 1.0/(v.uncertainty*v.uncertainty)
+        u = max(v.uncertainty, MIN_UNCERTAINTY)
+        w = 1.0/(u*u)
         wxs += w*v.value
         ws += w
 
@@ -74,23 +117,30 @@ def weighted_mean_and_deviation(*values):
     :return:
     """
 
-    if not values:
+    values = _collection(values)
+    if not len(values):
         return value.ValueUncertainty()
 
-    if isinstance(values[0], (list, tuple)):
-        values = values[0]
-        if not values:
-            return value.ValueUncertainty()
-
     if len(values) == 1:
         return values[0].clone()
 
+    if isinstance(values, value.ValueUncertaintyArray):
+        x = values.value
+        w = _weights(values.uncertainty)
+        ws = float(np.sum(w))
+        ave = float(np.sum(w * x)) / ws
+        N = len(values)
+        denom = ws * (N - 1.0) / N
+        dev = math.sqrt(float(np.sum(w * (x - ave) ** 2)) / denom)
+        return value.ValueUncertainty(value=ave, uncertainty=dev)
+
     wxs = 0.0
     ws  = 0.0
     weights = []
 
     for v in values:
-        w = 1.0/(v.uncertainty*v.uncertainty)
+        u = max(v.uncertainty, MIN_UNCERTAINTY)
+        w = 1.0/(u*u)
         weights.append(w)
         wxs += w*v.value
         ws += w
@@ -105,3 +155,562 @@ def weighted_mean_and_deviation(*values):
     dev = math.sqrt(dev/denom)
 
     return value.ValueUncertainty(value=ave, uncertainty=dev)
+
+
+def _grouped_sums(keys, values, uncertainties, raw):
+    """
+    Sorts the measurements by key and reduces each group of measurements
+    with the same key to its count, weight sum and weighted mean in a
+    single segmented pass.
+
+    :return:
+        A tuple containing the unique keys, the group start indices within
+        the sorted measurements, the group counts, weight sums and weighted
+        means, and the sorted values, weights, raw values and raw
+        uncertainties
+    """
+
+    if isinstance(values, value.ValueUncertaintyArray):
+        array = values
+    else:
+        array = value.ValueUncertaintyArray(
+            values,
+            1.0 if uncertainties is None else uncertainties
+        )
+
+    raw_values = array.raw.ravel()
+    raw_uncertainties = array.raw_uncertainty.ravel()
+    keys = np.asarray(keys).ravel()
+
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    raw_values = raw_values[order]
+    raw_uncertainties = raw_uncertainties[order]
+
+    if raw:
+        x, u = raw_values, raw_uncertainties
+    else:
+        x, u = value.round_measurements_many(raw_values, raw_uncertainties)
+
+    n = keys.size
+    boundaries = np.empty(n, dtype=bool)
+    boundaries[:1] = True
+    np.not_equal(keys[1:], keys[:-1], out=boundaries[1:])
+    starts = np.flatnonzero(boundaries)
+    counts = np.diff(np.append(starts, n))
+
+    w = _weights(u)
+    weight_sums = np.add.reduceat(w, starts) if n else np.zeros(0)
+    means = np.add.reduceat(w * x, starts) / weight_sums if n else np.zeros(0)
+
+    return (
+        keys[starts], starts, counts, weight_sums, means,
+        x, w, raw_values, raw_uncertainties
+    )
+
+
+def weighted_grouped(keys, values, uncertainties=None, raw=False):
+    """
+    Grouped version of the weighted function, which calculates the
+    uncertainty weighted average of the measurements for each unique key in
+    a single vectorized pass.
+
+    :param keys:
+        An array of the group keys of the measurements, which can be of any
+        sortable type.
+    :param values:
+        A ValueUncertaintyArray, or an array of raw values whose raw
+        uncertainties are given by the uncertainties argument.
+    :param uncertainties:
+        An array of raw uncertainties, or a single raw uncertainty for all
+        values. Ignored if values is a ValueUncertaintyArray.
+    :param raw:
+        If True, the raw values and raw uncertainties are averaged instead
+        of the rounded values and uncertainties.
+    :return:
+        A tuple containing an array of the unique keys in sorted order and a
+        ValueUncertaintyArray of the weighted averages of each group
+    """
+
+    groups = _grouped_sums(keys, values, uncertainties, raw)
+    unique_keys, starts, counts, weight_sums, means = groups[:5]
+
+    return unique_keys, value.ValueUncertaintyArray(
+        means,
+        1.0 / np.sqrt(weight_sums)
+    )
+
+
+def weighted_mean_and_deviation_grouped(
+        keys,
+        values,
+        uncertainties=None,
+        raw=False
+):
+    """
+    Grouped version of the weighted_mean_and_deviation function, which
+    calculates the weighted mean and weighted standard deviation of the
+    measurements for each unique key in a single vectorized pass. Groups
+    with a single measurement have the raw value and raw uncertainty of that
+    measurement.
+
+    :param keys:
+        An array of the group keys of the measurements, which can be of any
+        sortable type.
+    :param values:
+        A ValueUncertaintyArray, or an array of raw values whose raw
+        uncertainties are given by the uncertainties argument.
+    :param uncertainties:
+        An array of raw uncertainties, or a single raw uncertainty for all
+        values. Ignored if values is a ValueUncertaintyArray.
+    :param raw:
+        If True, the raw values and raw uncertainties are averaged instead
+        of the rounded values and uncertainties.
+    :return:
+        A tuple containing an array of the unique keys in sorted order and a
+        ValueUncertaintyArray of the weighted means and deviations of each
+        group
+    """
+
+    (
+        unique_keys, starts, counts, weight_sums, means,
+        x, w, raw_values, raw_uncertainties
+    ) = _grouped_sums(keys, values, uncertainties, raw)
+
+    if not x.size:
+        return unique_keys, value.ValueUncertaintyArray([], [])
+
+    squares = w * (x - np.repeat(means, counts)) ** 2
+    deviations = np.add.reduceat(squares, starts)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        denominators = weight_sums * (counts - 1.0) / counts
+        deviations = np.sqrt(deviations / denominators)
+
+    single = counts == 1
+    means[single] = raw_values[starts[single]]
+    deviations[single] = raw_uncertainties[starts[single]]
+
+    return unique_keys, value.ValueUncertaintyArray(means, deviations)
+
+
+def _accumulate_many(values, uncertainties, raw, chunk_size):
+    """
+    Accumulates the raw value and uncertainty arrays in chunks, so that the
+    temporary arrays are never larger than the chunk size.
+
+    :return:
+    :rtype: WeightedAccumulator
+    """
+
+    if isinstance(values, value.ValueUncertaintyArray):
+        x, u = values.raw.ravel(), values.raw_uncertainty.ravel()
+    else:
+        x = np.asarray(values, dtype=np.float64).ravel()
+        u = np.broadcast_to(
+            np.asarray(
+                1.0 if uncertainties is None else uncertainties,
+                dtype=np.float64
+            ),
+            np.shape(values)
+        ).ravel()
+
+    accumulator = WeightedAccumulator(raw=raw)
+    chunk_size = max(1, int(chunk_size))
+    for start in range(0, x.size, chunk_size):
+        stop = start + chunk_size
+        accumulator.add(
+            value.ValueUncertaintyArray(x[start:stop], u[start:stop])
+        )
+    return accumulator
+
+
+def weighted_many(
+        values,
+        uncertainties=None,
+        raw=True,
+        chunk_size=1 << 20
+):
+    """
+    Array version of the weighted function for very large numbers of
+    measurements. The sums are computed by NumPy with pairwise summation
+    within chunks of the arrays, and the chunks are then combined with
+    pairwise updates, so the result does not drift as the number of
+    measurements grows.
+
+    :param values:
+        A ValueUncertaintyArray, or an array of raw values whose raw
+        uncertainties are given by the uncertainties argument.
+    :param uncertainties:
+        An array of raw uncertainties, or a single raw uncertainty for all
+        values. Ignored if values is a ValueUncertaintyArray.
+    :param raw:
+        If True, the raw values and raw uncertainties are averaged directly.
+        If False, they are rounded first, which gives the same result as the
+        weighted function.
+    :param chunk_size:
+        The number of measurements that are summed at once.
+    :return:
+    :rtype: value.ValueUncertainty
+    """
+
+    return _accumulate_many(values, uncertainties, raw, chunk_size).weighted()
+
+
+def weighted_mean_and_deviation_many(
+        values,
+        uncertainties=None,
+        raw=True,
+        chunk_size=1 << 20
+):
+    """
+    Array version of the weighted_mean_and_deviation function for very
+    large numbers of measurements. The weighted deviation is accumulated as
+    the sum of squared deviations from the running weighted mean, which
+    avoids the cancellation of subtracting large sums of squares.
+
+    :param values:
+        A ValueUncertaintyArray, or an array of raw values whose raw
+        uncertainties are given by the uncertainties argument.
+    :param uncertainties:
+        An array of raw uncertainties, or a single raw uncertainty for all
+        values. Ignored if values is a ValueUncertaintyArray.
+    :param raw:
+        If True, the raw values and raw uncertainties are used directly. If
+        False, they are rounded first, which gives the same result as the
+        weighted_mean_and_deviation function.
+    :param chunk_size:
+        The number of measurements that are summed at once.
+    :return:
+    :rtype: value.ValueUncertainty
+    """
+
+    accumulator = _accumulate_many(values, uncertainties, raw, chunk_size)
+    return accumulator.weighted_mean_and_deviation()
+
+
+def _block_sums(terms, window):
+    """
+    Computes the inclusive prefix and suffix sums of each of the terms
+    within consecutive blocks of the window length.
+
+    :param terms:
+    :param window:
+    :return: tuple containing lists of the prefix and suffix sums
+    """
+
+    n = terms[0].size
+    blocks = -(-n // window)
+    prefixes = []
+    suffixes = []
+
+    for t in terms:
+        padded = np.zeros(blocks * window)
+        padded[:n] = t
+        padded = padded.reshape(blocks, window)
+        prefixes.append(np.cumsum(padded, axis=1).ravel()[:n])
+        suffixes.append(
+            np.cumsum(padded[:, ::-1], axis=1)[:, ::-1].ravel()[:n]
+        )
+
+    return prefixes, suffixes
+
+
+def _rolling_sums(measurements, window, raw):
+    """
+    Computes the weight sum, weighted mean and weighted sum of squared
+    deviations from that mean of every window of consecutive measurements.
+
+    The series is divided into blocks of the window length, so that each
+    window is the end of one block followed by the start of the next. The
+    sums of each window are then the sum of one suffix sum and one prefix
+    sum within those blocks, which is O(1) per window. Unlike running sums
+    that add and subtract measurements as the window slides, the partial
+    sums never include measurements outside of the window, so rounding
+    errors do not accumulate along the series. Each block is summed relative
+    to its first value, which is shifted to the block of the window start
+    when the sums are combined, to avoid the cancellation of large sums in
+    the deviations.
+
+    :return:
+        A tuple containing the weight sums, weighted means and weighted sums
+        of squared deviations, and the raw values and raw uncertainties of
+        the measurements
+    """
+
+    array = value.ValueUncertaintyArray.from_list(_collection(measurements))
+    raw_values = array.raw.ravel()
+    raw_uncertainties = array.raw_uncertainty.ravel()
+
+    if raw:
+        x, u = raw_values, raw_uncertainties
+    else:
+        x, u = value.round_measurements_many(raw_values, raw_uncertainties)
+
+    window = int(window)
+    if window < 1:
+        raise ValueError(errors.message(
+            """
+            The rolling window must contain at least one measurement, not {}
+            """,
+            window
+        ))
+
+    n = x.size
+    count = n - window + 1
+    if count < 1:
+        empty = np.zeros(0)
+        return empty, empty, empty, raw_values, raw_uncertainties
+
+    references = x[::window]
+    w = _weights(u)
+    d = x - np.repeat(references, window)[:n]
+    prefixes, suffixes = _block_sums([w, w * d, w * d * d], window)
+
+    starts = np.arange(count)
+    ends = starts + window - 1
+    block = starts // window
+
+    # Windows that are aligned with a block are entirely within that block
+    # and the prefix sums of the next block are excluded
+    split = (starts % window) != 0
+    shift = np.zeros(count)
+    shift[split] = references[block[split] + 1] - references[block[split]]
+
+    p0, p1, p2 = (np.where(split, p[ends], 0.0) for p in prefixes)
+    s0, s1, s2 = (s[starts] for s in suffixes)
+
+    weight_sums = s0 + p0
+    first = s1 + p1 + shift * p0
+    second = s2 + p2 + 2.0 * shift * p1 + shift * shift * p0
+
+    means = references[block] + first / weight_sums
+    m2 = np.maximum(second - first * first / weight_sums, 0.0)
+    return weight_sums, means, m2, raw_values, raw_uncertainties
+
+
+def rolling_weighted(measurements, window, raw=False):
+    """
+    Rolling version of the weighted function, which calculates the
+    uncertainty weighted average of every window of consecutive
+    measurements, i.e. of measurements[i:i + window] for each i.
+
+    :param measurements:
+        A ValueUncertaintyArray or a list of ValueUncertainty instances
+        ordered along the series.
+    :param window:
+        The number of measurements in each window, which must be at least
+        one.
+    :param raw:
+        If True, the raw values and raw uncertainties are averaged instead
+        of the rounded values and uncertainties.
+    :return:
+        A ValueUncertaintyArray with one average for each of the
+        len(measurements) - window + 1 windows
+    """
+
+    weight_sums, means = _rolling_sums(measurements, window, raw)[:2]
+    return value.ValueUncertaintyArray(means, 1.0 / np.sqrt(weight_sums))
+
+
+def rolling_weighted_mean_and_deviation(measurements, window, raw=False):
+    """
+    Rolling version of the weighted_mean_and_deviation function, which
+    calculates the weighted mean and weighted standard deviation of every
+    window of consecutive measurements, i.e. of measurements[i:i + window]
+    for each i.
+
+    :param measurements:
+        A ValueUncertaintyArray or a list of ValueUncertainty instances
+        ordered along the series.
+    :param window:
+        The number of measurements in each window, which must be at least
+        one.
+    :param raw:
+        If True, the raw values and raw uncertainties are averaged instead
+        of the rounded values and uncertainties.
+    :return:
+        A ValueUncertaintyArray with one mean and deviation for each of the
+        len(measurements) - window + 1 windows
+    """
+
+    (
+        weight_sums, means, m2, raw_values, raw_uncertainties
+    ) = _rolling_sums(measurements, window, raw)
+
+    if int(window) == 1:
+        # Single measurement windows are copies of the measurements
+        return value.ValueUncertaintyArray(
+            raw_values.copy(),
+            raw_uncertainties.copy()
+        )
+
+    denominators = weight_sums * (window - 1.0) / window
+    return value.ValueUncertaintyArray(means, np.sqrt(m2 / denominators))
+
+
+class WeightedAccumulator(object):
+    """
+    Accumulates the uncertainty weighted mean and weighted deviation of
+    measurements that are added in chunks, without keeping the measurements
+    themselves. Accumulators that were updated separately, for example on
+    different processes, can be merged into one.
+
+    The sum of the weights, the weighted mean and the weighted sum of
+    squared deviations from that mean are updated for each chunk using the
+    pairwise combination of West and Chan et al., which is numerically
+    stable. The weighted and weighted_mean_and_deviation methods return the
+    same results as the functions of the same names for all of the
+    measurements that have been added.
+    """
+
+    def __init__(self, raw=False):
+        """
+        :param raw:
+            If True, the raw values and raw uncertainties of the measurements
+            are used instead of their rounded values and uncertainties.
+        """
+
+        self.raw = raw
+        self.count = 0
+        self.weight_sum = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._first = None
+
+    @property
+    def weighted_sum(self):
+        """
+        :return:
+            The sum of the weighted values of the measurements
+        """
+        return self.mean * self.weight_sum
+
+    def _update(self, count, weight_sum, mean, m2):
+        if not count:
+            return self
+
+        if not self.count:
+            self.count = count
+            self.weight_sum = weight_sum
+            self.mean = mean
+            self.m2 = m2
+            return self
+
+        total = self.weight_sum + weight_sum
+        delta = mean - self.mean
+        self.mean += delta * weight_sum / total
+        self.m2 += m2 + delta * delta * self.weight_sum * weight_sum / total
+        self.weight_sum = total
+        self.count += count
+        return self
+
+    def add(self, *values):
+        """
+        Adds measurements to the accumulator.
+
+        :param values:
+            ValueUncertainty instances, or a single list, tuple or
+            ValueUncertaintyArray containing them
+        :return: This accumulator
+        :rtype: WeightedAccumulator
+        """
+
+        array = value.ValueUncertaintyArray.from_list(_collection(values))
+        if not array.size:
+            return self
+
+        if not self.count:
+            self._first = (
+                float(array.raw.flat[0]),
+                float(array.raw_uncertainty.flat[0])
+            )
+
+        if self.raw:
+            x, u = array.raw.ravel(), array.raw_uncertainty.ravel()
+        else:
+            x, u = array.value.ravel(), array.uncertainty.ravel()
+
+        w = _weights(u)
+        weight_sum = float(np.sum(w))
+        mean = float(np.sum(w * x)) / weight_sum
+        m2 = float(np.sum(w * (x - mean) ** 2))
+        return self._update(x.size, weight_sum, mean, m2)
+
+    def merge(self, other):
+        """
+        Merges the measurements accumulated by another accumulator into this
+        one.
+
+        :param other:
+        :return: This accumulator
+        :rtype: WeightedAccumulator
+        """
+
+        if not self.count:
+            self._first = other._first
+        return self._update(
+            other.count,
+            other.weight_sum,
+            other.mean,
+            other.m2
+        )
+
+    def weighted(self):
+        """
+        :return:
+            The uncertainty weighted average of the accumulated
+            measurements, as returned by the weighted function
+        :rtype: value.ValueUncertainty
+        """
+
+        if not self.count:
+            return value.ValueUncertainty()
+
+        return value.ValueUncertainty(
+            value=self.mean,
+            uncertainty=1.0 / math.sqrt(self.weight_sum)
+        )
+
+    def weighted_mean_and_deviation(self):
+        """
+        :return:
+            The weighted mean and weighted standard deviation of the
+            accumulated measurements, as returned by the
+            weighted_mean_and_deviation function
+        :rtype: value.ValueUncertainty
+        """
+
+        if not self.count:
+            return value.ValueUncertainty()
+
+        if self.count == 1:
+            return value.ValueUncertainty(*self._first)
+
+        N = self.count
+        denom = self.weight_sum * (N - 1.0) / N
+        return value.ValueUncertainty(
+            value=self.mean,
+            uncertainty=math.sqrt(self.m2 / denom)
+        )
+
+    def to_dict(self):
+        return dict(
+            raw=self.raw,
+            count=self.count,
+            weight_sum=self.weight_sum,
+            mean=self.mean,
+            m2=self.m2,
+            first=self._first
+        )
+
+    def from_dict(self, source):
+        self.raw = source.get('raw', False)
+        self.count = source['count']
+        self.weight_sum = source['weight_sum']
+        self.mean = source['mean']
+        self.m2 = source['m2']
+        self._first = source.get('first')
+        if self._first is not None:
+            self._first = tuple(self._first)
+        return self
@@ -0,0 +1,180 @@
+"""
+Columnar binary storage for collections of measurements and distributions.
+
+A file starts with a header that is padded with zeros to a multiple of 64
+bytes and contains, in little-endian byte order:
+
+    * magic:   6 bytes, the ASCII characters MSTATS
+    * version: uint8, currently 1
+    * kind:    1 byte, A for a ValueUncertaintyArray or D for a Distribution
+    * ndim:    uint32, the number of dimensions of the collection
+    * shape:   ndim uint64 values, the length of each dimension
+
+The header is followed by two little-endian float64 buffers in C order: the
+raw values and then the raw uncertainties of the measurements. Because the
+buffers are stored without any per-measurement structure they can be memory
+mapped directly, so that opening a file does not create any Python objects
+for the individual measurements.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import struct
+
+import numpy as np
+
+from measurement_stats import errors
+from measurement_stats.distributions import Distribution
+from measurement_stats.value import ValueUncertaintyArray
+
+MAGIC = b'MSTATS'
+VERSION = 1
+
+KIND_ARRAY = b'A'
+KIND_DISTRIBUTION = b'D'
+
+_HEADER = struct.Struct('<6sBcI')
+_ALIGNMENT = 64
+
+
+def _header_size(ndim):
+    size = _HEADER.size + 8 * ndim
+    return _ALIGNMENT * ((size + _ALIGNMENT - 1) // _ALIGNMENT)
+
+
+def _columns(source):
+    """
+    Returns the kind, raw values and raw uncertainties of the source to
+    write.
+
+    :param source:
+    :return:
+    """
+
+    if isinstance(source, ValueUncertaintyArray):
+        return KIND_ARRAY, source.raw, source.raw_uncertainty
+
+    if isinstance(source, Distribution):
+        array = source.measurement_array
+        return KIND_DISTRIBUTION, array.raw, array.raw_uncertainty
+
+    array = ValueUncertaintyArray.from_list(source)
+    return KIND_ARRAY, array.raw, array.raw_uncertainty
+
+
+def save(path, source):
+    """
+    Writes the measurements to the specified path in the columnar binary
+    format described in the module documentation.
+
+    :param path:
+        The file path where the measurements will be written.
+    :param source:
+        A ValueUncertaintyArray, a Distribution or an iterable of
+        ValueUncertainty instances.
+    """
+
+    kind, raw, raw_uncertainty = _columns(source)
+    shape = raw.shape
+
+    header = bytearray(_header_size(len(shape)))
+    _HEADER.pack_into(header, 0, MAGIC, VERSION, kind, len(shape))
+    struct.pack_into(
+        '<{}Q'.format(len(shape)),
+        header,
+        _HEADER.size,
+        *shape
+    )
+
+    with open(path, 'wb') as f:
+        f.write(header)
+        np.ascontiguousarray(raw, dtype='<f8').tofile(f)
+        np.ascontiguousarray(raw_uncertainty, dtype='<f8').tofile(f)
+
+
+def read_header(path):
+    """
+    Reads the header of a file written by the save function.
+
+    :param path:
+    :return:
+        A tuple containing the kind, shape and the offset in bytes of the
+        raw values buffer
+    """
+
+    with open(path, 'rb') as f:
+        fixed = f.read(_HEADER.size)
+        if len(fixed) < _HEADER.size or fixed[:len(MAGIC)] != MAGIC:
+            raise ValueError(errors.message(
+                """
+                The file "{}" is not a measurement storage file
+                """,
+                path
+            ))
+
+        magic, version, kind, ndim = _HEADER.unpack(fixed)
+        if version != VERSION:
+            raise ValueError(errors.message(
+                """
+                Unsupported measurement storage version {} in file "{}"
+                """,
+                version,
+                path
+            ))
+
+        shape = struct.unpack('<{}Q'.format(ndim), f.read(8 * ndim))
+
+    return kind, tuple(shape), _header_size(ndim)
+
+
+def load(path, mmap=True, kernel=None):
+    """
+    Loads measurements from a file written by the save function.
+
+    :param path:
+        The file path from which to read the measurements.
+    :param mmap:
+        If True, the raw value and raw uncertainty buffers are memory
+        mapped read-only instead of being read into memory, so that they
+        are only loaded from disk as they are accessed.
+    :param kernel:
+        (optional) The kernel of a loaded Distribution. If no kernel is
+        specified the default Gaussian kernel is used.
+    :return:
+        A ValueUncertaintyArray or a Distribution depending on what was
+        saved
+    """
+
+    kind, shape, offset = read_header(path)
+    count = int(np.prod(shape, dtype=np.int64))
+
+    if mmap and count:
+        buffers = np.memmap(
+            path,
+            dtype='<f8',
+            mode='r',
+            offset=offset,
+            shape=(2,) + shape
+        )
+    else:
+        buffers = np.fromfile(
+            path,
+            dtype='<f8',
+            count=2 * count,
+            offset=offset
+        ).reshape((2,) + shape)
+
+    # The constructor is bypassed because it scans the uncertainties for
+    # negative values, which would read the whole mapping. Stored
+    # uncertainties were already non-negative when they were saved.
+    array = ValueUncertaintyArray.__new__(ValueUncertaintyArray)
+    array.raw = buffers[0]
+    array.raw_uncertainty = buffers[1]
+
+    if kind == KIND_DISTRIBUTION:
+        return Distribution.from_arrays(array, kernel=kernel)
+
+    return array
@@ -0,0 +1,67 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import math
+import unittest
+
+import numpy as np
+from scipy import stats
+
+from measurement_stats import consistency
+from measurement_stats import value
+
+
+class TestConsistency(unittest.TestCase):
+
+    def test_deviations(self):
+        """
+        Deviations should be relative to the measurement uncertainties for
+        exact expectations and to the combined uncertainties otherwise
+        """
+
+        measurements = value.ValueUncertaintyArray([1.0, 2.0, 4.0], 0.5)
+
+        result = consistency.deviations(2.0, measurements)
+        self.assertEqual(result.tolist(), [2.0, 0.0, 4.0])
+
+        result = consistency.deviations([1.0, 1.0, 1.0], measurements)
+        self.assertEqual(result.tolist(), [0.0, 2.0, 6.0])
+
+        expected = value.ValueUncertainty(2.0, 0.5)
+        result = consistency.deviations(expected, measurements.to_list())
+        np.testing.assert_allclose(
+            result,
+            np.array([1.0, 0.0, 2.0]) / math.sqrt(0.5)
+        )
+
+    def test_chiSquare(self):
+        """
+        The chi-square statistics should agree with their definitions
+        """
+
+        measurements = value.ValueUncertaintyArray([1.0, 2.0, 4.0], 0.5)
+
+        self.assertAlmostEqual(consistency.chi_square(2.0, measurements), 20.0)
+        self.assertAlmostEqual(
+            consistency.reduced_chi_square(2.0, measurements, parameters=1),
+            10.0
+        )
+        self.assertAlmostEqual(
+            consistency.p_value(2.0, measurements),
+            stats.chi2.sf(20.0, 3)
+        )
+        np.testing.assert_allclose(
+            consistency.p_values(2.0, measurements),
+            [2.0 * stats.norm.sf(2.0), 1.0, 2.0 * stats.norm.sf(4.0)]
+        )
+
+        self.assertTrue(math.isnan(
+            consistency.reduced_chi_square(2.0, measurements, parameters=3)
+        ))
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestConsistency)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -61,6 +61,245 @@ class TestDensity(unittest.TestCase):
         area = get_area_under_curve(x_values, dist.probabilities_at(x_values))
         self.assertAlmostEqual(area, 1.0, 3)
 
+    def test_densitiesOverGrid(self):
+        """ Densities over a grid should match the densities at each
+            position regardless of the memory budget
+        """
+
+        rng = np.random.RandomState(8)
+        measurements = [
+            value.ValueUncertainty(v, u)
+            for v, u in zip(rng.normal(0, 3, 50), rng.uniform(0.2, 2, 50))
+        ]
+        heights = rng.uniform(0.5, 2.0, 50)
+        x_values = np.linspace(-12.0, 12.0, 37)
+
+        dist = distributions.Distribution(
+            measurements=measurements,
+            memory_budget=1000
+        )
+        densities = dist.densities_at(x_values)
+        heighted = dist.heighted_probabilities_at(x_values, heights)
+        self.assertIsInstance(densities, np.ndarray)
+
+        for i, x in enumerate(x_values):
+            self.assertAlmostEqual(densities[i], dist.density_at(x))
+            self.assertAlmostEqual(
+                heighted[i],
+                dist.heighted_probability_at(x, heights)
+            )
+
+        dist.memory_budget = 1 << 24
+        self.assertTrue(np.allclose(
+            dist.probabilities_at(x_values),
+            densities / 50
+        ))
+
+    def test_truncatedDensities(self):
+        """ Truncated densities should match the sum of the single kernels,
+            which are cut off at ten sigma
+        """
+
+        rng = np.random.RandomState(21)
+        measurements = [
+            value.ValueUncertainty(v, u)
+            for v, u in zip(
+                rng.normal(0, 5, 3000),
+                np.exp(rng.uniform(-4, 0.5, 3000))
+            )
+        ]
+        heights = rng.uniform(0.5, 2.0, 3000)
+        x_values = np.append(np.linspace(-25.0, 25.0, 41), [0.0, 100.0])
+
+        dist = distributions.Distribution(
+            measurements=measurements,
+            memory_budget=4000
+        )
+        densities = dist.densities_at(x_values, 'truncated')
+        heighted = dist.heighted_densities_at(x_values, heights, 'truncated')
+
+        single = distributions.kernels.GAUSSIAN_KERNEL.single
+        for i, x in enumerate(x_values):
+            kernel_values = np.array([single(x, m) for m in measurements])
+            self.assertAlmostEqual(densities[i], np.sum(kernel_values))
+            self.assertAlmostEqual(heighted[i], kernel_values.dot(heights))
+
+        self.assertEqual(densities[-1], 0.0)
+        self.assertAlmostEqual(
+            dist.probability_at(0.0, 'truncated'),
+            dist.probability_at(0.0)
+        )
+
+        with self.assertRaises(ValueError):
+            dist.densities_at(x_values, 'unknown')
+
+    def test_truncatedAfterChanges(self):
+        """ Truncated densities should use the current values and
+            uncertainties after they have been replaced
+        """
+
+        dist = distributions.Distribution.from_arrays(
+            np.array([0.0, 1.0, 2.0]),
+            np.array([0.1, 0.1, 0.1])
+        )
+        self.assertAlmostEqual(dist.density_at(5.0, 'truncated'), 0.0)
+
+        dist.values = np.array([5.0, 6.0, 7.0])
+        expected = distributions.Distribution.from_arrays(
+            np.array([5.0, 6.0, 7.0]),
+            np.array([0.1, 0.1, 0.1])
+        )
+        self.assertGreater(dist.density_at(5.0, 'truncated'), 3.0)
+        self.assertAlmostEqual(
+            dist.density_at(5.0, 'truncated'),
+            expected.density_at(5.0)
+        )
+
+        dist.uncertainties = np.array([2.0, 2.0, 2.0])
+        expected = distributions.Distribution.from_arrays(
+            np.array([5.0, 6.0, 7.0]),
+            np.array([2.0, 2.0, 2.0])
+        )
+        self.assertAlmostEqual(
+            dist.density_at(3.0, 'truncated'),
+            expected.density_at(3.0)
+        )
+
+    def test_binnedDensities(self):
+        """ Binned densities on a uniform grid should match the truncated
+            densities to within the reported error bound
+        """
+
+        rng = np.random.RandomState(34)
+        raw = rng.normal(0, 3, 500)
+        uncertainties = rng.uniform(0.3, 1.0, 500)
+        heights = rng.uniform(0.5, 2.0, 500)
+
+        rounded = distributions.Distribution(measurements=[
+            value.ValueUncertainty(v, u) for v, u in zip(raw, uncertainties)
+        ])
+        dist = distributions.Distribution(measurements=[
+            value.ValueUncertainty(v, u) for v, u in zip(raw, uncertainties)
+        ])
+        dist.uncertainties = uncertainties
+
+        for d, max_classes, accuracy in (
+                (rounded, 64, 0.01),
+                (dist, 64, 0.05),
+                (dist, 8, 1.0)
+        ):
+            x_values = distributions.uniform_range(d, 4, 2048)
+            expected = d.heighted_densities_at(x_values, heights, 'truncated')
+            result, error = distributions.binned.densities(
+                d,
+                x_values,
+                heights,
+                max_classes
+            )
+            self.assertLess(np.max(np.abs(result - expected)), error)
+            self.assertLess(error, accuracy * np.max(expected))
+
+        self.assertTrue(np.allclose(
+            rounded.probabilities_at(x_values, 'fft'),
+            rounded.probabilities_at(x_values),
+            atol=1e-3
+        ))
+
+        with self.assertRaises(ValueError):
+            rounded.densities_at([0.0, 1.0, 3.0], 'fft')
+
+    def test_approximateDensities(self):
+        """ Approximate densities should match the exact densities to within
+            the tolerance relative to the sum of the kernel peaks
+        """
+
+        rng = np.random.RandomState(55)
+        measurements = [
+            value.ValueUncertainty(v, u)
+            for v, u in zip(rng.normal(0, 4, 2000), rng.uniform(0.05, 1, 2000))
+        ]
+        measurements += [value.ValueUncertainty(v, 0.123) for v in range(5)]
+        heights = rng.uniform(0.5, 2.0, len(measurements))
+        x_values = np.append(rng.uniform(-15, 15, 300), 1e6)
+
+        dist = distributions.Distribution(measurements=measurements)
+        peaks = np.sum(heights / (np.sqrt(2 * np.pi) * dist.uncertainties))
+        expected = dist.heighted_densities_at(x_values, heights)
+
+        for tolerance in (1e-3, 1e-8):
+            result, error = distributions.gauss_transform.densities(
+                dist,
+                x_values,
+                heights,
+                tolerance
+            )
+            self.assertLessEqual(error, tolerance * peaks)
+            self.assertLess(np.max(np.abs(result - expected)), error)
+
+        result = dist.probabilities_at(x_values, 'approximate', 1e-8)
+        self.assertTrue(np.allclose(
+            result,
+            dist.probabilities_at(x_values),
+            rtol=0,
+            atol=1e-6
+        ))
+
+        with self.assertRaises(ValueError):
+            dist.densities_at(x_values, 'approximate', 2.0)
+
+    def test_preparedKernels(self):
+        """ Prepared kernel state should be computed once and give the same
+            densities as kernels without a prepare function
+        """
+
+        rng = np.random.RandomState(89)
+        measurements = [
+            value.ValueUncertainty(v, u)
+            for v, u in zip(rng.normal(0, 3, 40), rng.uniform(0.2, 2, 40))
+        ]
+        x_values = np.linspace(-10.0, 10.0, 21)
+
+        dist = distributions.Distribution(measurements=measurements)
+        unprepared = distributions.Distribution(
+            measurements=measurements,
+            kernel=distributions.kernels.Kernel(
+                single=distributions.kernels.gaussians.gaussian,
+                many=distributions.kernels.gaussians.gaussian_many
+            )
+        )
+
+        self.assertIsNone(unprepared.kernel_state())
+        self.assertIs(dist.kernel_state(), dist.kernel_state())
+        self.assertTrue(np.allclose(
+            dist.densities_at(x_values),
+            unprepared.densities_at(x_values),
+            rtol=1e-14,
+            atol=0
+        ))
+        self.assertAlmostEqual(dist.density_at(1.5), unprepared.density_at(1.5))
+
+    def test_preparedKernelChanges(self):
+        """ Prepared kernel state should be discarded when the values,
+            uncertainties or kernel of the distribution are replaced
+        """
+
+        dist = distributions.Distribution.from_arrays(
+            np.array([0.0, 1.0, 2.0]),
+            np.array([0.5, 0.5, 0.5])
+        )
+        self.assertAlmostEqual(dist.density_at(1.0), 1.0138, places=4)
+
+        dist.uncertainties = np.array([2.0, 2.0, 2.0])
+        self.assertAlmostEqual(dist.density_at(1.0), 0.5515, places=4)
+
+        dist.values = np.array([1.0, 1.0, 1.0])
+        self.assertAlmostEqual(dist.density_at(1.0), 0.5984, places=4)
+
+        state = dist.kernel_state()
+        dist.kernel = distributions.kernels.GAUSSIAN_KERNEL
+        self.assertIsNot(dist.kernel_state(), state)
+        self.assertAlmostEqual(dist.density_at(1.0), 0.5984, places=4)
+
     def test_singleDensityMedian(self):
         """ The median of a single measurement should be at the value of
             that measurement
@@ -126,6 +365,84 @@ class TestDensity(unittest.TestCase):
         self.assertAlmostEqual(dd.minimum_value().value, min(*values))
         self.assertAlmostEqual(dd.maximum_value().value, max(*values))
 
+    def test_assignMeasurements(self):
+        """ Assigning the measurements of a distribution should replace its
+            values and uncertainties and the state kept for them
+        """
+
+        dist = distributions.Distribution(measurements=[
+            value.ValueUncertainty(0.0, 0.5),
+            value.ValueUncertainty(1.0, 0.5)
+        ])
+        dist.density_at(1.0)
+        dist.density_at(1.0, 'truncated')
+
+        measurements = [
+            value.ValueUncertainty(5.0, 2.0),
+            value.ValueUncertainty(6.0, 2.0),
+            value.ValueUncertainty(7.0, 2.0)
+        ]
+        dist.measurements = measurements
+        expected = distributions.Distribution(measurements=measurements)
+
+        self.assertIs(dist.measurements, measurements)
+        self.assertEqual(dist.values.tolist(), [5.0, 6.0, 7.0])
+        self.assertEqual(dist.measurement_array.raw.tolist(), [5.0, 6.0, 7.0])
+        for method in distributions.distributions_type.METHODS:
+            self.assertAlmostEqual(
+                dist.density_at(3.0, method),
+                expected.density_at(3.0),
+                places=5
+            )
+
+        dist.measurements = value.ValueUncertaintyArray([1.0], [2.0])
+        self.assertEqual(dist.values.tolist(), [1.0])
+        self.assertAlmostEqual(dist.density_at(1.0), 0.19947, places=5)
+
+    def test_fromArrays(self):
+        """ Distributions created from arrays should match distributions of
+            the same measurements without creating the measurements until
+            they are accessed
+        """
+
+        rng = np.random.RandomState(144)
+        raw = np.append(rng.normal(0, 3, 200), [-20.0, -20.0, 20.0])
+        uncertainties = np.append(rng.uniform(0.2, 2, 200), [1.0, 3.0, 2.0])
+        measurements = [
+            value.ValueUncertainty(v, u) for v, u in zip(raw, uncertainties)
+        ]
+
+        expected = distributions.Distribution(measurements=measurements)
+        dist = distributions.create_distribution(raw, uncertainties)
+        self.assertEqual(dist.values.tolist(), expected.values.tolist())
+        self.assertEqual(
+            dist.uncertainties.tolist(),
+            expected.uncertainties.tolist()
+        )
+
+        for name in ('minimum_value', 'maximum_value'):
+            self.assertEqual(
+                getattr(dist, name)().label,
+                getattr(expected, name)().label
+            )
+        self.assertEqual(
+            dist.minimum_boundary(10),
+            expected.minimum_boundary(10)
+        )
+        self.assertEqual(
+            dist.naked_measurement_values(raw=True),
+            expected.naked_measurement_values(raw=True)
+        )
+        self.assertIsNone(dist._measurements)
+
+        self.assertEqual(
+            [m.label for m in dist.measurements],
+            [m.label for m in measurements]
+        )
+
+        with self.assertRaises(ValueError):
+            distributions.Distribution.from_arrays(raw)
+
     def test_getAdaptiveRange(self):
         dist = distributions.Distribution(measurements=[value.ValueUncertainty()])
         result = distributions.distributions_ops.adaptive_range(dist, 10.0)
@@ -0,0 +1,249 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import json
+import random
+import unittest
+
+import numpy as np
+
+from measurement_stats import mean
+from measurement_stats import value
+
+
+def create_measurements(count, seed):
+    rng = random.Random(seed)
+    return [
+        value.ValueUncertainty(rng.gauss(10.0, 2.0), rng.uniform(0.1, 2.0))
+        for i in range(count)
+    ]
+
+
+class TestMean(unittest.TestCase):
+
+    def assertMeasurementEqual(self, expected, result):
+        self.assertAlmostEqual(expected.raw, result.raw)
+        self.assertAlmostEqual(
+            expected.raw_uncertainty,
+            result.raw_uncertainty
+        )
+
+    def test_grouped(self):
+        """
+        Grouped means should match the mean functions applied to each
+        group, including groups with a single measurement
+        """
+
+        measurements = create_measurements(60, 4)
+        keys = ['day-%s' % (i % 7) for i in range(59)] + ['single']
+        array = value.ValueUncertaintyArray.from_list(measurements)
+
+        unique_keys, averages = mean.weighted_grouped(keys, array)
+        result = mean.weighted_mean_and_deviation_grouped(
+            keys,
+            array.raw,
+            array.raw_uncertainty
+        )
+
+        self.assertEqual(unique_keys.tolist(), sorted(set(keys)))
+        self.assertEqual(result[0].tolist(), unique_keys.tolist())
+
+        for i, key in enumerate(unique_keys.tolist()):
+            group = [m for k, m in zip(keys, measurements) if k == key]
+            self.assertMeasurementEqual(mean.weighted(group), averages[i])
+            self.assertMeasurementEqual(
+                mean.weighted_mean_and_deviation(group),
+                result[1][i]
+            )
+
+    def test_rolling(self):
+        """
+        Rolling means should match the mean functions applied to each
+        window of the series
+        """
+
+        measurements = create_measurements(23, 5)
+
+        for window in (1, 4, 23):
+            averages = mean.rolling_weighted(measurements, window)
+            deviations = mean.rolling_weighted_mean_and_deviation(
+                measurements,
+                window
+            )
+            self.assertEqual(len(averages), 24 - window)
+            self.assertEqual(len(deviations), 24 - window)
+
+            for i in range(24 - window):
+                group = measurements[i:i + window]
+                self.assertMeasurementEqual(
+                    mean.weighted(group),
+                    averages[i]
+                )
+                self.assertMeasurementEqual(
+                    mean.weighted_mean_and_deviation(group),
+                    deviations[i]
+                )
+
+        self.assertEqual(len(mean.rolling_weighted(measurements, 24)), 0)
+
+        for window in (0, -1):
+            with self.assertRaises(ValueError):
+                mean.rolling_weighted(measurements, window)
+            with self.assertRaises(ValueError):
+                mean.rolling_weighted_mean_and_deviation(measurements, window)
+
+    def test_rollingOffset(self):
+        """
+        Rolling deviations should remain accurate for values that are large
+        relative to their spread
+        """
+
+        raw_values = [1e9 + (i % 3) for i in range(300)]
+        array = value.ValueUncertaintyArray(raw_values, 1.0)
+
+        result = mean.rolling_weighted_mean_and_deviation(array, 30, raw=True)
+        for i in range(len(result)):
+            self.assertAlmostEqual(result.raw[i], 1e9 + 1.0, places=6)
+            self.assertAlmostEqual(
+                result.raw_uncertainty[i],
+                (20.0 / 29.0) ** 0.5,
+                places=9
+            )
+
+    def test_many(self):
+        """
+        The array functions should match the list functions when rounding
+        and the raw statistics otherwise
+        """
+
+        measurements = create_measurements(1000, 6)
+        array = value.ValueUncertaintyArray.from_list(measurements)
+
+        self.assertMeasurementEqual(
+            mean.weighted(measurements),
+            mean.weighted_many(array, raw=False, chunk_size=64)
+        )
+        self.assertMeasurementEqual(
+            mean.weighted_mean_and_deviation(measurements),
+            mean.weighted_mean_and_deviation_many(
+                array.raw,
+                array.raw_uncertainty,
+                raw=False,
+                chunk_size=64
+            )
+        )
+
+        w = 1.0 / array.raw_uncertainty ** 2
+        result = mean.weighted_many(array.raw, array.raw_uncertainty)
+        self.assertAlmostEqual(
+            result.raw,
+            float(np.sum(w * array.raw) / np.sum(w))
+        )
+        self.assertAlmostEqual(result.raw_uncertainty, np.sum(w) ** -0.5)
+
+    def test_zeroUncertainty(self):
+        """
+        Measurements without uncertainty should be weighted with the floored
+        uncertainty by both the list and the array functions
+        """
+
+        measurements = [
+            value.ValueUncertainty(1.0, 0.0),
+            value.ValueUncertainty(3.0, 1.0),
+            value.ValueUncertainty(2.0, 0.5)
+        ]
+        array = value.ValueUncertaintyArray.from_list(measurements)
+
+        for raw in (True, False):
+            for function, many in (
+                    (mean.weighted, mean.weighted_many),
+                    (
+                        mean.weighted_mean_and_deviation,
+                        mean.weighted_mean_and_deviation_many
+                    )
+            ):
+                expected = function(measurements)
+                result = many(array, raw=raw)
+                self.assertTrue(np.isfinite(result.raw))
+                self.assertTrue(np.isfinite(result.raw_uncertainty))
+                self.assertMeasurementEqual(expected, result)
+                self.assertMeasurementEqual(expected, function(array))
+
+        self.assertAlmostEqual(
+            mean.weighted(measurements).raw_uncertainty,
+            mean.MIN_UNCERTAINTY,
+            places=10
+        )
+
+    def test_accumulatorChunks(self):
+        """
+        Merged chunks should match the mean functions for all of the
+        measurements at once
+        """
+
+        measurements = create_measurements(100, 1)
+
+        shards = []
+        for start in range(0, 100, 30):
+            shard = mean.WeightedAccumulator()
+            shard.add(measurements[start:start + 15])
+            shard.add(*measurements[start + 15:start + 30])
+            shards.append(shard)
+
+        accumulator = mean.WeightedAccumulator()
+        for shard in shards:
+            accumulator.merge(shard)
+
+        self.assertEqual(accumulator.count, 100)
+        self.assertMeasurementEqual(
+            mean.weighted(measurements),
+            accumulator.weighted()
+        )
+        self.assertMeasurementEqual(
+            mean.weighted_mean_and_deviation(measurements),
+            accumulator.weighted_mean_and_deviation()
+        )
+
+    def test_accumulatorEdgeCases(self):
+        """
+        Empty and single measurement accumulators should behave like the
+        mean functions
+        """
+
+        accumulator = mean.WeightedAccumulator()
+        self.assertMeasurementEqual(
+            mean.weighted_mean_and_deviation([]),
+            accumulator.weighted_mean_and_deviation()
+        )
+
+        measurements = create_measurements(1, 2)
+        accumulator.merge(mean.WeightedAccumulator().add(measurements))
+        self.assertMeasurementEqual(
+            mean.weighted_mean_and_deviation(measurements),
+            accumulator.weighted_mean_and_deviation()
+        )
+
+    def test_accumulatorSerialization(self):
+        """
+        Accumulators should survive a round trip through JSON so that they
+        can be merged across machines
+        """
+
+        measurements = create_measurements(20, 3)
+        accumulator = mean.WeightedAccumulator(raw=True).add(measurements)
+
+        source = json.loads(json.dumps(accumulator.to_dict()))
+        restored = mean.WeightedAccumulator().from_dict(source)
+
+        self.assertTrue(restored.raw)
+        self.assertMeasurementEqual(
+            accumulator.weighted_mean_and_deviation(),
+            restored.weighted_mean_and_deviation()
+        )
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestMean)
+    unittest.TextTestRunner(verbosity=2).run(suite)
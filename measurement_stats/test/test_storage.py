@@ -0,0 +1,100 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from measurement_stats import distributions
+from measurement_stats import storage
+from measurement_stats import value
+
+
+class TestStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'measurements.mstats')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_arrayRoundTrip(self):
+        """
+        Arrays should be restored exactly, whether memory mapped or read
+        into memory
+        """
+
+        rng = np.random.RandomState(4)
+        array = value.ValueUncertaintyArray(
+            rng.normal(10.0, 3.0, (20, 3)),
+            rng.uniform(0.01, 1.0, (20, 3))
+        )
+        storage.save(self.path, array)
+
+        for mmap in (True, False):
+            result = storage.load(self.path, mmap=mmap)
+            self.assertIsInstance(result, value.ValueUncertaintyArray)
+            self.assertEqual(result.shape, (20, 3))
+            np.testing.assert_array_equal(result.raw, array.raw)
+            np.testing.assert_array_equal(
+                result.raw_uncertainty,
+                array.raw_uncertainty
+            )
+            del result
+
+    def test_measurementList(self):
+        """
+        Lists of ValueUncertainty instances should be saved as arrays
+        """
+
+        measurements = [
+            value.ValueUncertainty(1.5, 0.1),
+            value.ValueUncertainty(-2.25, 0.3)
+        ]
+        storage.save(self.path, measurements)
+
+        result = storage.load(self.path, mmap=False).to_list()
+        self.assertEqual(
+            [(m.raw, m.raw_uncertainty) for m in result],
+            [(1.5, 0.1), (-2.25, 0.3)]
+        )
+
+    def test_distribution(self):
+        """
+        Distributions should be restored with the same measurements
+        """
+
+        dist = distributions.create_distribution([1.0, 2.5, 4.0], 0.5)
+        storage.save(self.path, dist)
+
+        result = storage.load(self.path)
+        self.assertIsInstance(result, distributions.Distribution)
+        self.assertEqual(result.values.tolist(), dist.values.tolist())
+        self.assertEqual(
+            result.uncertainties.tolist(),
+            dist.uncertainties.tolist()
+        )
+        self.assertEqual(
+            result.measurement_array.raw.tolist(),
+            [1.0, 2.5, 4.0]
+        )
+
+    def test_invalidFile(self):
+        """ Files without the storage header should be rejected """
+
+        with open(self.path, 'wb') as f:
+            f.write(b'{"value": 1.0}')
+
+        with self.assertRaises(ValueError):
+            storage.load(self.path)
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestStorage)
+    unittest.TextTestRunner(verbosity=2).run(suite)
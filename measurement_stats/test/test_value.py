@@ -4,6 +4,7 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import math
+import pickle
 import unittest
 
 from measurement_stats import value
@@ -59,6 +60,46 @@ class TestValue(unittest.TestCase):
 
         print(result)
 
+    def test_roundingCache(self):
+        """
+        Cached rounded values should be refreshed whenever the raw values
+        change
+        """
+
+        v = value.ValueUncertainty(math.pi, 0.00456)
+        self.assertAlmostEqual(v.value, 3.142)
+
+        v.raw_uncertainty = 0.0456
+        self.assertAlmostEqual(v.value, 3.14)
+        self.assertAlmostEqual(v.uncertainty, 0.05)
+
+        v.raw = 2.0 * math.pi
+        self.assertAlmostEqual(v.value, 6.28)
+
+        v.update(value=1.2345, uncertainty=0.2)
+        self.assertAlmostEqual(v.value, 1.2)
+        self.assertAlmostEqual(v.uncertainty, 0.2)
+
+        v.from_dict(dict(raw=10.55, raw_uncertainty=3.0))
+        self.assertAlmostEqual(v.value, 11)
+        self.assertAlmostEqual(v.uncertainty, 3.0)
+
+        v.uncertainty = 0.01
+        self.assertAlmostEqual(v.value, 10.55)
+
+    def test_slots(self):
+        """
+        Instances should have a compact layout that survives pickling
+        """
+
+        v = value.ValueUncertainty(11, 0.4)
+        self.assertFalse(hasattr(v, '__dict__'))
+
+        result = pickle.loads(pickle.dumps(v))
+        self.assertEqual(result.raw, v.raw)
+        self.assertEqual(result.raw_uncertainty, v.raw_uncertainty)
+        self.assertEqual(result.label, v.label)
+
 
 if __name__ == '__main__':
     suite = unittest.TestLoader().loadTestsFromTestCase(TestValue)
@@ -28,6 +28,26 @@ class TestValue2D(unittest.TestCase):
         a = p1.angle_between(p2)
         self.assertAlmostEquals(a.degrees, 90.0, 1)
 
+    def test_length(self):
+        """
+        The length of a point with plain components should be its distance
+        from the default origin, whose components have unit uncertainty
+        """
+
+        p = value2D.Point2D(
+            value.ValueUncertainty(3.0, 0.1),
+            value.ValueUncertainty(4.0, 0.1)
+        )
+
+        length = p.length
+        expected = p.distance_from(value2D.Point2D())
+        self.assertAlmostEqual(length.raw, 5.0)
+        self.assertAlmostEqual(length.raw_uncertainty, 0.7106335201775947)
+        self.assertAlmostEqual(
+            length.raw_uncertainty,
+            expected.raw_uncertainty
+        )
+
     def test_rotate(self):
         tests = [
             (90.0, 0.0, 1.0), (-90.0, 0.0, -1.0),
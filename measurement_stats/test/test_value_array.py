@@ -0,0 +1,219 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import operator
+import unittest
+
+import numpy as np
+
+from measurement_stats import value
+
+
+def create_measurements():
+    measurements = [
+        value.ValueUncertainty.create_random(-100.0, 100.0)
+        for i in range(50)
+    ]
+    measurements += [
+        value.ValueUncertainty(0.0, 0.5),
+        value.ValueUncertainty(2.0, 0.0),
+        value.ValueUncertainty(-3.5, 0.2)
+    ]
+    return measurements
+
+
+class TestValueArray(unittest.TestCase):
+
+    def assertMatches(self, result, expected):
+        self.assertIsInstance(result, value.ValueUncertaintyArray)
+        self.assertEqual(len(result), len(expected))
+        for r, e in zip(result, expected):
+            self.assertAlmostEqual(r.raw, e.raw, places=10)
+            self.assertAlmostEqual(
+                r.raw_uncertainty,
+                e.raw_uncertainty,
+                places=10
+            )
+
+    def test_roundTrip(self):
+        """
+        Converting to and from lists of ValueUncertainty instances should
+        preserve the raw values and uncertainties
+        """
+
+        measurements = create_measurements()
+        array = value.ValueUncertaintyArray.from_list(measurements)
+
+        self.assertEqual(array.shape, (len(measurements),))
+        self.assertMatches(array, measurements)
+        self.assertMatches(
+            value.ValueUncertaintyArray.from_list(array.to_list()),
+            measurements
+        )
+
+    def test_scalarUncertainty(self):
+        """ A single uncertainty should be applied to every value """
+
+        array = value.ValueUncertaintyArray([1.0, 2.0, 3.0], -0.5)
+        self.assertEqual(array.raw_uncertainty.tolist(), [0.5, 0.5, 0.5])
+        self.assertEqual(array[1].raw, 2.0)
+        self.assertEqual(len(array[1:]), 2)
+
+    def test_arithmetic(self):
+        """
+        Array arithmetic should propagate uncertainties the same way as the
+        ValueUncertainty operators, including the zero special cases
+        """
+
+        first = create_measurements()
+        second = list(reversed(create_measurements()))
+        a = value.ValueUncertaintyArray.from_list(first)
+        b = value.ValueUncertaintyArray.from_list(second)
+
+        for op in (operator.add, operator.sub, operator.mul):
+            self.assertMatches(
+                op(a, b),
+                [op(x, y) for x, y in zip(first, second)]
+            )
+            self.assertMatches(op(a, 2.5), [op(x, 2.5) for x in first])
+            self.assertMatches(
+                op(a, second[0]),
+                [op(x, second[0]) for x in first]
+            )
+
+        self.assertMatches(2.5 * a, [2.5 * x for x in first])
+        self.assertMatches(a / 2.5, [x / 2.5 for x in first])
+        self.assertMatches(a ** 2, [x ** 2 for x in first])
+        self.assertMatches(abs(a), [abs(x) for x in first])
+
+        divisors = create_measurements()[:50]
+        self.assertMatches(
+            a[:50] / value.ValueUncertaintyArray.from_list(divisors),
+            [x / y for x, y in zip(first, divisors)]
+        )
+
+    def test_reflectedOperations(self):
+        """
+        Scalar measurements on the left of an operator should defer to the
+        array operand
+        """
+
+        a = value.ValueUncertaintyArray([1.0, 2.0, 4.0], [0.1, 0.2, 0.4])
+        x = value.ValueUncertainty(8.0, 0.8)
+
+        result = x - a
+        self.assertEqual(result.raw.tolist(), [7.0, 6.0, 4.0])
+
+        result = x / a
+        self.assertEqual(result.raw.tolist(), [8.0, 4.0, 2.0])
+        self.assertAlmostEqual(
+            result.raw_uncertainty[0],
+            8.0 * np.sqrt(0.1 ** 2 + 0.1 ** 2)
+        )
+
+    def test_uncertainExponent(self):
+        """
+        The uncertainty of an exponent should be added in quadrature to the
+        uncertainty of the base
+        """
+
+        a = value.ValueUncertaintyArray([2.0, 3.0], [0.1, 0.2])
+        b = value.ValueUncertainty(3.0, 0.2)
+
+        expected = np.sqrt(
+            (a.raw ** 3 * 3.0 * a.raw_uncertainty / a.raw) ** 2
+            + (np.log(a.raw) * a.raw ** 3 * 0.2) ** 2
+        )
+        for result in (a ** b, np.power(a, b)):
+            self.assertEqual(result.raw.tolist(), [8.0, 27.0])
+            self.assertTrue(np.allclose(result.raw_uncertainty, expected))
+
+        exponents = value.ValueUncertaintyArray([3.0, 3.0], [0.2, 0.0])
+        result = a ** exponents
+        self.assertAlmostEqual(result.raw_uncertainty[0], expected[0])
+        self.assertAlmostEqual(result.raw_uncertainty[1], 27.0 * 0.2)
+
+    def test_divideByZero(self):
+        """ Dividing a non-zero value by zero should raise an error """
+
+        a = value.ValueUncertaintyArray([1.0, 0.0], 0.1)
+        b = value.ValueUncertaintyArray([0.0, 0.0], 0.1)
+
+        with self.assertRaises(ZeroDivisionError):
+            a / b
+
+        result = a[1:] / b[1:]
+        self.assertEqual(result.raw.tolist(), [0.0])
+        self.assertAlmostEqual(result.raw_uncertainty[0], np.sqrt(0.02))
+
+    def test_ufuncs(self):
+        """
+        NumPy ufuncs should propagate uncertainties with first-order
+        derivatives
+        """
+
+        a = value.ValueUncertaintyArray([0.5, 1.0, 2.0], [0.01, 0.02, 0.03])
+
+        result = np.sin(a)
+        self.assertIsInstance(result, value.ValueUncertaintyArray)
+        np.testing.assert_allclose(result.raw, np.sin(a.raw))
+        np.testing.assert_allclose(
+            result.raw_uncertainty,
+            np.abs(np.cos(a.raw)) * a.raw_uncertainty
+        )
+
+        result = np.exp(a)
+        np.testing.assert_allclose(
+            result.raw_uncertainty,
+            np.exp(a.raw) * a.raw_uncertainty
+        )
+
+        result = np.sqrt(a)
+        np.testing.assert_allclose(
+            result.raw_uncertainty,
+            0.5 * a.raw_uncertainty / np.sqrt(a.raw)
+        )
+
+        result = np.multiply(a, a[0])
+        expected = [x * a[0] for x in a]
+        self.assertMatches(result, expected)
+
+        result = np.arange(3.0) + a
+        self.assertEqual(result.raw.tolist(), [0.5, 2.0, 4.0])
+
+    def test_reductions(self):
+        """
+        Sums, means and products should reduce to measurements with the
+        propagated uncertainties
+        """
+
+        a = value.ValueUncertaintyArray([1.0, 2.0, 4.0], [0.1, 0.2, 0.4])
+
+        total = np.sum(a)
+        self.assertIsInstance(total, value.ValueUncertainty)
+        self.assertAlmostEqual(total.raw, 7.0)
+        self.assertAlmostEqual(total.raw_uncertainty, np.sqrt(0.21))
+
+        average = np.mean(a)
+        self.assertAlmostEqual(average.raw, 7.0 / 3.0)
+        self.assertAlmostEqual(average.raw_uncertainty, np.sqrt(0.21) / 3.0)
+
+        product = np.prod(a)
+        expected = a[0] * a[1] * a[2]
+        self.assertAlmostEqual(product.raw, expected.raw)
+        self.assertAlmostEqual(
+            product.raw_uncertainty,
+            expected.raw_uncertainty
+        )
+
+        grid = value.ValueUncertaintyArray(np.ones((2, 3)), 0.1)
+        result = np.add.reduce(grid, axis=1)
+        self.assertEqual(result.raw.tolist(), [3.0, 3.0])
+        self.assertEqual(np.concatenate([a, a]).shape, (6,))
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestValueArray)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,134 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import base64
+import math
+import os
+import pickle
+import subprocess
+import sys
+import unittest
+
+from measurement_stats import value
+from measurement_stats import value2D
+
+MY_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+PICKLE_SCRIPT = """
+import base64
+import pickle
+from measurement_stats import value
+x = value.correlated(value.ValueUncertainty(1.0, 0.3))
+print(base64.b64encode(pickle.dumps(x)).decode())
+"""
+
+
+def pickled_in_new_process():
+    """
+    Creates a correlated value in a new interpreter and returns it after
+    pickling it there and unpickling it here
+    """
+
+    environment = dict(os.environ)
+    environment['PYTHONPATH'] = os.pathsep.join(
+        [os.path.dirname(os.path.dirname(MY_DIRECTORY))] +
+        [p for p in [environment.get('PYTHONPATH')] if p]
+    )
+
+    output = subprocess.check_output(
+        [sys.executable, '-c', PICKLE_SCRIPT],
+        env=environment
+    )
+    return pickle.loads(base64.b64decode(output.strip()))
+
+
+class TestValueCorrelated(unittest.TestCase):
+
+    def test_sharedInputs(self):
+        """
+        Inputs shared between operands should be propagated as the same
+        variable
+        """
+
+        x = value.correlated(value.ValueUncertainty(3.0, 0.1))
+
+        result = x * x
+        self.assertAlmostEqual(result.raw, 9.0)
+        self.assertAlmostEqual(result.raw_uncertainty, 0.6)
+
+        result = x - x
+        self.assertAlmostEqual(result.raw_uncertainty, 0.0)
+
+        result = (x + 1.0) / x
+        self.assertAlmostEqual(result.raw_uncertainty, 0.1 / 9.0)
+
+    def test_independentInputs(self):
+        """
+        Independent inputs should match the standard operators
+        """
+
+        l = value.ValueUncertainty(92.95, 0.1)
+        T = value.ValueUncertainty(1.936, 0.004)
+        cl, cT = value.correlated(l, T)
+
+        expected = 4.0 * (math.pi ** 2) * l / (T ** 2)
+        result = 4.0 * (math.pi ** 2) * cl / (cT ** 2)
+
+        self.assertIsInstance(result, value.CorrelatedValue)
+        self.assertAlmostEqual(result.raw, expected.raw)
+        self.assertAlmostEqual(result.raw_uncertainty, expected.raw_uncertainty)
+        self.assertEqual(result.label, expected.label)
+
+    def test_covariance(self):
+        """
+        Covariances and correlations should be computed from the shared
+        inputs of the two values
+        """
+
+        x, y = value.correlated(
+            value.ValueUncertainty(1.0, 0.3),
+            value.ValueUncertainty(2.0, 0.4)
+        )
+
+        self.assertAlmostEqual(value.covariance(x + y, x - y), 0.09 - 0.16)
+        self.assertAlmostEqual(value.correlation(2.0 * x, x), 1.0)
+        self.assertAlmostEqual(value.correlation(x, y), 0.0)
+
+    def test_pointLength(self):
+        """
+        The length of a point with correlated coordinates should account for
+        each coordinate appearing twice in the distance computation
+        """
+
+        point = value2D.Point2D(*value.correlated(
+            value.ValueUncertainty(3.0, 0.1),
+            value.ValueUncertainty(4.0, 0.1)
+        ))
+
+        length = point.length
+        self.assertAlmostEqual(length.raw, 5.0)
+        self.assertAlmostEqual(length.raw_uncertainty, 0.1)
+        self.assertAlmostEqual(point.distance_from(point).raw, 0.0)
+
+    def test_pickledAcrossProcesses(self):
+        """
+        Values created independently in different processes should remain
+        uncorrelated after they are pickled and combined
+        """
+
+        x = pickled_in_new_process()
+        y = pickled_in_new_process()
+
+        self.assertAlmostEqual(value.covariance(x, y), 0.0)
+        self.assertAlmostEqual(value.covariance(x, x), 0.09)
+        self.assertAlmostEqual((x - y).raw_uncertainty, math.sqrt(0.18))
+
+        restored = pickle.loads(pickle.dumps(x))
+        self.assertAlmostEqual((x - restored).raw_uncertainty, 0.0)
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestValueCorrelated)
+    unittest.TextTestRunner(verbosity=2).run(suite)
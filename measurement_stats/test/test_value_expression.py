@@ -0,0 +1,124 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import math
+import unittest
+
+import numpy as np
+
+from measurement_stats import value
+
+
+class TestValueExpression(unittest.TestCase):
+
+    def test_repeatedVariable(self):
+        """
+        A variable that appears more than once in an expression should be
+        propagated as a single variable, so that x * x has twice the relative
+        uncertainty of x
+        """
+
+        x = value.ValueUncertainty(3.0, 0.1)
+        lx = value.lazy(x)
+
+        result = (lx * lx).evaluate()
+        self.assertIsInstance(result, value.ValueUncertainty)
+        self.assertAlmostEqual(result.raw, 9.0)
+        self.assertAlmostEqual(result.raw_uncertainty, 0.6)
+
+        result = (x - lx).evaluate()
+        self.assertAlmostEqual(result.raw, 0.0)
+        self.assertAlmostEqual(result.raw_uncertainty, 0.0)
+
+    def test_independentVariables(self):
+        """
+        Independent variables should match the eager operators
+        """
+
+        l = value.ValueUncertainty(92.95, 0.1)
+        T = value.ValueUncertainty(1.936, 0.004)
+        ll, lT = value.lazy(l, T)
+
+        expected = 4.0 * (math.pi ** 2) * l / (T ** 2)
+        result = (4.0 * (math.pi ** 2) * ll / (lT ** 2)).evaluate()
+
+        self.assertAlmostEqual(result.raw, expected.raw)
+        self.assertAlmostEqual(result.raw_uncertainty, expected.raw_uncertainty)
+
+    def test_ufuncs(self):
+        """
+        NumPy ufuncs should be added to the expression graph and their
+        partial derivatives included in the propagation
+        """
+
+        x = value.ValueUncertainty(0.5, 0.01)
+        y = value.ValueUncertainty(2.0, 0.02)
+        lx, ly = value.lazy(x, y)
+
+        result = (ly * np.sin(lx) + np.exp(lx)).evaluate()
+
+        dx = 2.0 * math.cos(0.5) + math.exp(0.5)
+        dy = math.sin(0.5)
+        self.assertAlmostEqual(result.raw, 2.0 * math.sin(0.5) + math.exp(0.5))
+        self.assertAlmostEqual(
+            result.raw_uncertainty,
+            math.sqrt((dx * 0.01) ** 2 + (dy * 0.02) ** 2)
+        )
+
+    def test_arrays(self):
+        """
+        Expressions over arrays should be evaluated element-wise in a single
+        pass, including scalar measurements shared by every element
+        """
+
+        a = value.ValueUncertaintyArray([1.0, 2.0, 3.0], 0.1)
+        x = value.ValueUncertainty(3.0, 0.1)
+        la = value.lazy(a)
+
+        result = (la * la + 2.0 * la * x).evaluate()
+
+        self.assertIsInstance(result, value.ValueUncertaintyArray)
+        self.assertEqual(result.raw.tolist(), [7.0, 16.0, 27.0])
+        np.testing.assert_allclose(
+            result.raw_uncertainty,
+            np.sqrt(
+                ((2.0 * a.raw + 6.0) * 0.1) ** 2 +
+                (2.0 * a.raw * 0.1) ** 2
+            )
+        )
+
+    def test_mixedOperands(self):
+        """
+        Arrays combined with expressions in either order should build the
+        expression graph instead of computing an eager result
+        """
+
+        a = value.ValueUncertaintyArray([1.0, 2.0, 3.0], 0.1)
+        lx = value.lazy(value.ValueUncertainty(3.0, 0.2))
+
+        for expression in (
+                a * lx,
+                lx * a,
+                np.multiply(a, lx),
+                np.multiply(lx, a),
+                a * (lx + 1.0) - a,
+                (lx + 1.0) * a - a
+        ):
+            self.assertIsInstance(expression, value.Expression)
+            result = expression.evaluate()
+            self.assertEqual(result.raw.tolist(), [3.0, 6.0, 9.0])
+
+        # The shared variable cancels exactly when the graph is kept
+        result = (a * lx - lx * a).evaluate()
+        self.assertEqual(result.raw_uncertainty.tolist(), [0.0, 0.0, 0.0])
+
+        self.assertIsInstance(a ** lx, value.Expression)
+        self.assertIsInstance(a - lx, value.Expression)
+        self.assertIsInstance(lx / a, value.Expression)
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestValueExpression)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,115 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import math
+import unittest
+
+import numpy as np
+
+from measurement_stats import value
+from measurement_stats import distributions
+
+
+def gravity(l, T):
+    return 4.0 * (math.pi ** 2) * l / (T ** 2)
+
+
+class TestValueMonteCarlo(unittest.TestCase):
+
+    def test_matchesAnalytic(self):
+        """
+        For small uncertainties the Monte Carlo result should agree with
+        analytic error propagation
+        """
+
+        l = value.ValueUncertainty(92.95, 0.1)
+        T = value.ValueUncertainty(1.936, 0.004)
+
+        expected = gravity(l, T)
+        result = value.monte_carlo(
+            gravity, l, T,
+            samples=200000,
+            chunk_size=30000,
+            seed=1
+        )
+
+        self.assertIsInstance(result, value.ValueUncertainty)
+        self.assertAlmostEqual(result.raw, expected.raw, delta=0.1)
+        self.assertAlmostEqual(
+            result.raw_uncertainty,
+            expected.raw_uncertainty,
+            delta=0.1
+        )
+
+    def test_reproducible(self):
+        """ The same seed should produce identical results """
+
+        x = value.ValueUncertainty(2.0, 0.5)
+        first = value.monte_carlo(np.exp, x, samples=5000, seed=11)
+        second = value.monte_carlo(np.exp, x, samples=5000, seed=11)
+
+        self.assertEqual(first.raw, second.raw)
+        self.assertEqual(first.raw_uncertainty, second.raw_uncertainty)
+
+    def test_arrays(self):
+        """
+        Array measurements should produce an array of results
+        """
+
+        a = value.ValueUncertaintyArray([1.0, 2.0], [0.1, 0.2])
+        result = value.monte_carlo(
+            lambda x: 2.0 * x, a,
+            samples=50000,
+            seed=3
+        )
+
+        self.assertIsInstance(result, value.ValueUncertaintyArray)
+        np.testing.assert_allclose(result.raw, [2.0, 4.0], atol=0.01)
+        np.testing.assert_allclose(
+            result.raw_uncertainty,
+            [0.2, 0.4],
+            atol=0.01
+        )
+
+    def test_distribution(self):
+        """
+        The samples can be summarized as a distribution instead
+        """
+
+        x = value.ValueUncertainty(0.0, 1.0)
+        result = value.monte_carlo(
+            lambda v: v, x,
+            samples=2000,
+            seed=5,
+            as_distribution=True
+        )
+
+        self.assertIsInstance(result, distributions.Distribution)
+        self.assertEqual(len(result.measurements), 2000)
+
+    def test_invalidArguments(self):
+        """
+        Non-positive sample counts and chunk sizes and array results as a
+        distribution should be rejected
+        """
+
+        x = value.ValueUncertainty(1.0, 0.1)
+        a = value.ValueUncertaintyArray([1.0, 2.0], [0.1, 0.2])
+
+        with self.assertRaises(ValueError):
+            value.monte_carlo(lambda v: v, x, samples=0)
+        with self.assertRaises(ValueError):
+            value.monte_carlo(lambda v: v, x, chunk_size=0)
+        with self.assertRaises(ValueError):
+            value.monte_carlo(
+                lambda v: v, a,
+                samples=100,
+                as_distribution=True
+            )
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestValueMonteCarlo)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,149 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import math
+import random
+import unittest
+
+import numpy as np
+
+from measurement_stats import value
+
+
+def create_samples(seed=42):
+    """
+    Creates a collection of values spanning many orders of magnitude that
+    includes arbitrary values, integers and single significant digit values
+    like those produced when rounding uncertainties
+    """
+
+    rng = random.Random(seed)
+    samples = [0.0, 0.29, 0.1 + 0.2, 123456.0, 1e20, 7000.0, 1e-300, 1e300]
+
+    for order in range(-20, 21):
+        scale = 10.0 ** order
+        for i in range(40):
+            samples.append(rng.uniform(-9.99, 9.99) * scale)
+            samples.append(float(rng.randint(1, 9)) * scale)
+            samples.append(
+                value.round_significant(rng.uniform(0.1, 10.0) * scale, 1)
+            )
+
+    for order in range(-5, 15):
+        samples += [10.0 ** order, -(10.0 ** order), 2.0 ** order]
+
+    return samples
+
+
+class TestValueRounding(unittest.TestCase):
+
+    def test_leastSignificantOrder(self):
+        """
+        The vectorized orders should be identical to the scalar search
+        """
+
+        samples = create_samples()
+        result = value.least_significant_order_many(samples)
+
+        for x, order in zip(samples, result.tolist()):
+            self.assertEqual(order, value.least_significant_order(x), x)
+
+    def test_roundSignificant(self):
+        """
+        The vectorized significant digit rounding should be identical to the
+        scalar version for every number of digits
+        """
+
+        samples = create_samples()
+
+        for digits in (1, 3, 6):
+            result = value.round_significant_many(samples, digits)
+            for x, rounded in zip(samples, result.tolist()):
+                self.assertEqual(
+                    rounded,
+                    value.round_significant(x, digits),
+                    x
+                )
+
+    def test_roundToOrder(self):
+        """
+        The vectorized order rounding should be identical to the scalar
+        version
+        """
+
+        samples = [x for x in create_samples() if abs(x) < 1e250]
+        rng = random.Random(3)
+        orders = [rng.randint(-12, 12) for x in samples]
+        result = value.round_to_order_many(samples, orders)
+
+        for x, order, rounded in zip(samples, orders, result.tolist()):
+            self.assertEqual(rounded, value.round_to_order(x, order), x)
+
+    def test_orderOfMagnitude(self):
+        """
+        The vectorized order of magnitude should be identical to the scalar
+        version
+        """
+
+        samples = [x for x in create_samples() if x != 0]
+        result = value.order_of_magnitude_many(samples)
+
+        for x, order in zip(samples, result.tolist()):
+            self.assertEqual(order, value.order_of_magnitude(x), x)
+
+    def test_roundMeasurements(self):
+        """
+        Rounded measurement arrays should match the value and uncertainty
+        properties of the corresponding ValueUncertainty instances
+        """
+
+        samples = create_samples()
+        rng = random.Random(7)
+        measurements = [
+            value.ValueUncertainty(x, abs(x) * rng.uniform(0.001, 2.0))
+            for x in samples if abs(x) < 1e250
+        ]
+        measurements.append(value.ValueUncertainty(-0.3, 0.5))
+        measurements.append(value.ValueUncertainty(math.pi, 0.0))
+
+        array = value.ValueUncertaintyArray.from_list(measurements)
+        values = array.value.tolist()
+        uncertainties = array.uncertainty.tolist()
+
+        for i, m in enumerate(measurements):
+            self.assertEqual(values[i], m.value, m.raw)
+            self.assertEqual(uncertainties[i], m.uncertainty, m.raw)
+
+    def test_labels(self):
+        """
+        Batch labels should match the labels of the corresponding
+        ValueUncertainty instances character for character
+        """
+
+        rng = random.Random(11)
+        raw = [x for x in create_samples() if abs(x) < 1e250]
+        uncertainties = [abs(x) * rng.uniform(0.001, 2.0) for x in raw]
+        raw += [-0.3, math.pi, -0.0, 1234.5]
+        uncertainties += [0.5, 0.0, 0.1, 0.0]
+
+        array = value.ValueUncertaintyArray(raw, uncertainties)
+        results = zip(array.labels, array.html_labels, array.raw_labels)
+
+        for x, u, labels in zip(raw, uncertainties, results):
+            m = value.ValueUncertainty(x, u)
+            self.assertEqual(labels, (m.label, m.html_label, m.raw_label))
+
+        self.assertEqual(value.labels_many([], []), [])
+
+    def test_nonFinite(self):
+        """ Non-finite values cannot be rounded """
+
+        with self.assertRaises(ValueError):
+            value.least_significant_order_many([1.0, np.nan])
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestValueRounding)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,409 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import json
+import math
+import os
+import pathlib
+import random
+import shutil
+import tempfile
+import unittest
+import warnings
+from concurrent import futures
+
+import numpy as np
+
+from measurement_stats import mean
+from measurement_stats import value
+from measurement_stats import values
+
+
+class TestValues(unittest.TestCase):
+
+    def test_streamSerialized(self):
+        """
+        Streamed batches should contain the raw values of the serialized
+        measurements in fixed-size chunks
+        """
+
+        rng = random.Random(5)
+        measurements = [
+            value.ValueUncertainty(rng.uniform(-10, 10), rng.uniform(0.1, 2))
+            for i in range(25)
+        ]
+        lines = '\n'.join(json.dumps(m.serialize()) for m in measurements)
+
+        batches = list(values.stream_serialized(io.StringIO(lines), 10))
+        self.assertEqual([len(b) for b in batches], [10, 10, 5])
+
+        streamed = [m for b in batches for m in b.to_list()]
+        for expected, result in zip(measurements, streamed):
+            self.assertEqual(expected.raw, result.raw)
+            self.assertEqual(expected.raw_uncertainty, result.raw_uncertainty)
+
+        batches = list(values.stream_serialized([
+            {'value': 1.5, 'uncertainty': 0.2},
+            '',
+            '{"raw": 3, "raw_uncertainty": 1}'
+        ]))
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(batches[0].raw.tolist(), [1.5, 3.0])
+        self.assertEqual(batches[0].raw_uncertainty.tolist(), [0.2, 1.0])
+
+    def test_streamSerializedPath(self):
+        """
+        Serialized measurements should be read from files specified by
+        either string or path-like paths
+        """
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        path = os.path.join(directory, 'measurements.jsonl')
+        with open(path, 'w') as f:
+            f.write('{"raw": 1.5, "raw_uncertainty": 0.2}\n')
+            f.write('{"value": 3, "uncertainty": 1}\n')
+
+        for source in [path, pathlib.Path(path)]:
+            batches = list(values.stream_serialized(source))
+            self.assertEqual(len(batches), 1)
+            self.assertEqual(batches[0].raw.tolist(), [1.5, 3.0])
+            self.assertEqual(
+                batches[0].raw_uncertainty.tolist(),
+                [0.2, 1.0]
+            )
+
+    def test_unzipArrays(self):
+        """
+        Unzipped arrays should match the unzipped lists and be views of the
+        raw arrays of a ValueUncertaintyArray
+        """
+
+        measurements = [
+            value.ValueUncertainty(1.234, 0.05),
+            value.ValueUncertainty(-8.76, 0.3)
+        ]
+
+        for raw in (True, False):
+            expected = values.unzip(measurements, raw=raw)
+            result = values.unzip_arrays(measurements, raw=raw)
+            self.assertEqual(result[0].tolist(), expected[0])
+            self.assertEqual(result[1].tolist(), expected[1])
+
+        array = value.ValueUncertaintyArray.from_list(measurements)
+        raw_values, raw_uncertainties = values.unzip_arrays(array, raw=True)
+        self.assertIs(raw_values, array.raw)
+        self.assertIs(raw_uncertainties, array.raw_uncertainty)
+
+    def test_joinArrays(self):
+        """
+        Joined arrays should share the memory of float64 inputs
+        """
+
+        raw_values = np.array([1.0, 2.0, 3.0])
+        raw_uncertainties = np.array([0.1, 0.2, 0.3])
+
+        array = values.join_arrays(raw_values, raw_uncertainties)
+        self.assertTrue(np.shares_memory(array.raw, raw_values))
+        self.assertTrue(
+            np.shares_memory(array.raw_uncertainty, raw_uncertainties)
+        )
+
+        array = values.join_arrays(raw_values, 0.5)
+        self.assertEqual(array.raw_uncertainty.tolist(), [0.5, 0.5, 0.5])
+        self.assertIs(values.join_arrays(array), array)
+
+        expected = values.join([1.0, 2.0, 3.0], 0.5)
+        for e, r in zip(expected, array):
+            self.assertEqual(e.label, r.label)
+
+    def test_analyticSmoothSingle(self):
+        """
+        A window containing a single measurement should have the median and
+        MAD of a normal distribution
+        """
+
+        measurements = [
+            value.ValueUncertainty(2.0, 0.5),
+            value.ValueUncertainty(-3.0, 2.0)
+        ]
+        result = values.windowed_smooth(measurements, 0, method='analytic')
+
+        for m, r in zip(measurements, result):
+            self.assertAlmostEqual(r.raw, m.value)
+            self.assertAlmostEqual(
+                r.raw_uncertainty,
+                0.6744897501960817 * m.uncertainty
+            )
+
+    def test_analyticSmoothZeroUncertainty(self):
+        """
+        Measurements without uncertainty should be smoothed with the same
+        smallest kernel width as the distributions instead of overflowing
+        """
+
+        measurements = [
+            value.ValueUncertainty(x, 0.0)
+            for x in (1.0, 2.0, 4.0, 4.0)
+        ]
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            result = values.windowed_smooth(measurements, 1, method='analytic')
+
+        self.assertTrue(all(
+            math.isfinite(r.raw) and math.isfinite(r.raw_uncertainty)
+            for r in result
+        ))
+        self.assertAlmostEqual(result[0].raw, 1.5)
+        self.assertAlmostEqual(result[1].raw, 2.0)
+        self.assertAlmostEqual(result[3].raw, 4.0)
+        self.assertAlmostEqual(result[3].raw_uncertainty, 0.6745e-6, 9)
+        self.assertEqual(result[1].label, '2 +/- 1.0')
+
+    def test_analyticSmooth(self):
+        """
+        The analytic smoothing should agree with the population smoothing
+        to within the sampling noise of the populations
+        """
+
+        rng = random.Random(13)
+        measurements = [
+            value.ValueUncertainty(rng.gauss(10, 2), rng.uniform(0.2, 1.0))
+            for i in range(12)
+        ]
+
+        random.seed(13)
+        expected = values.windowed_smooth(measurements, 2, 4096)
+        result = values.windowed_smooth(measurements, 2, method='analytic')
+        self.assertEqual(len(result), len(measurements))
+
+        for e, r in zip(expected, result):
+            self.assertAlmostEqual(e.raw, r.raw, delta=0.05)
+            self.assertAlmostEqual(
+                e.raw_uncertainty,
+                r.raw_uncertainty,
+                delta=0.05
+            )
+
+        array = value.ValueUncertaintyArray.from_list(measurements)
+        smoothed = values.windowed_smooth(array, 2, method='analytic')
+        self.assertIsInstance(smoothed, value.ValueUncertaintyArray)
+        self.assertEqual(
+            smoothed.raw.tolist(),
+            [r.raw for r in result]
+        )
+
+    def test_parallelSmooth(self):
+        """
+        Parallel smoothing should be reproducible for a seed regardless of
+        the executor, and analytic chunks should join into the serial result
+        """
+
+        rng = random.Random(17)
+        measurements = [
+            value.ValueUncertainty(rng.gauss(10, 2), rng.uniform(0.2, 1.0))
+            for i in range(41)
+        ]
+
+        def raw(result):
+            return [(m.raw, m.raw_uncertainty) for m in result]
+
+        for function, size in (
+                (values.windowed_smooth_parallel, 2),
+                (values.box_smooth_parallel, 3)
+        ):
+            serial = function(measurements, size, 128, chunk_size=10, seed=3)
+            with futures.ThreadPoolExecutor(3) as executor:
+                pooled = function(
+                    measurements,
+                    size,
+                    128,
+                    executor=executor,
+                    chunk_size=10,
+                    seed=3
+                )
+            self.assertEqual(raw(serial), raw(pooled))
+
+        self.assertEqual(
+            len(values.box_smooth_parallel(measurements, 3, 128, seed=3)),
+            len(values.box_smooth(measurements, 3, 128))
+        )
+
+        expected = values.windowed_smooth(measurements, 3, method='analytic')
+        result = values.windowed_smooth_parallel(
+            measurements,
+            3,
+            method='analytic',
+            chunk_size=7
+        )
+        self.assertEqual(raw(expected), raw(result))
+
+        array = value.ValueUncertaintyArray.from_list(measurements)
+        with futures.ThreadPoolExecutor(3) as executor:
+            pooled = values.windowed_smooth_parallel(
+                array,
+                3,
+                method='analytic',
+                executor=executor,
+                chunk_size=7
+            )
+        self.assertIsInstance(pooled, value.ValueUncertaintyArray)
+        self.assertEqual(pooled.raw.tolist(), [m[0] for m in raw(expected)])
+
+    def test_windowMoments(self):
+        """
+        The incrementally updated window moments should match the moments
+        of the Gaussian mixture of each window
+        """
+
+        rng = random.Random(23)
+        measurements = [
+            value.ValueUncertainty(rng.gauss(1e4, 2), rng.uniform(0.2, 1.0))
+            for i in range(30)
+        ]
+
+        moments = values._window_moments(measurements, 4)
+        centers, widths, first, last, count, mean, variance = moments
+
+        for i in range(len(measurements)):
+            members = slice(first[i], last[i] + 1)
+            self.assertEqual(count[i], len(centers[members]))
+            self.assertAlmostEqual(mean[i], np.mean(centers[members]))
+            self.assertAlmostEqual(
+                variance[i],
+                np.var(centers[members]) + np.mean(widths[members] ** 2),
+                places=6
+            )
+
+    def test_parallelSmoothOrder(self):
+        """
+        Seeded population smoothing should not depend upon the executor or
+        the order in which the chunks are run
+        """
+
+        class ReversedExecutor(object):
+            def map(self, function, tasks):
+                tasks = list(tasks)
+                results = [function(task) for task in reversed(tasks)]
+                return list(reversed(results))
+
+        rng = random.Random(29)
+        measurements = [
+            value.ValueUncertainty(rng.gauss(10, 2), rng.uniform(0.2, 1.0))
+            for i in range(23)
+        ]
+
+        def raw(result):
+            return [(m.raw, m.raw_uncertainty) for m in result]
+
+        for function in (
+                values.windowed_smooth_parallel,
+                values.box_smooth_parallel
+        ):
+            expected = function(measurements, 2, 64, chunk_size=6, seed=11)
+            reordered = function(
+                measurements,
+                2,
+                64,
+                executor=ReversedExecutor(),
+                chunk_size=6,
+                seed=11
+            )
+            self.assertEqual(raw(expected), raw(reordered))
+            self.assertNotEqual(
+                raw(expected),
+                raw(function(measurements, 2, 64, chunk_size=6, seed=12))
+            )
+
+    def test_argExtrema(self):
+        """
+        The vectorized extrema should break ties in the same way as the
+        maximum and minimum functions
+        """
+
+        rng = random.Random(19)
+        for i in range(50):
+            measurements = [
+                value.ValueUncertainty(
+                    rng.choice([1.0, 2.0, 3.0]),
+                    rng.choice([0.1, 0.2])
+                )
+                for j in range(rng.randint(1, 10))
+            ]
+            array = value.ValueUncertaintyArray.from_list(measurements)
+
+            index = values.argmax(measurements)
+            self.assertIs(measurements[index], values.maximum(measurements))
+            self.assertEqual(
+                values.maximum(array).label,
+                measurements[index].label
+            )
+
+            index = values.argmin(measurements)
+            self.assertIs(measurements[index], values.minimum(measurements))
+            self.assertEqual(values.argmin(array), index)
+
+    def test_topK(self):
+        """
+        The top k indices should be the same as repeatedly removing the
+        maximum or minimum measurement
+        """
+
+        rng = random.Random(23)
+        measurements = [
+            value.ValueUncertainty(rng.randint(1, 4), rng.choice([0.1, 0.2]))
+            for i in range(30)
+        ]
+
+        for largest, extremum in (
+                (True, values.maximum),
+                (False, values.minimum)
+        ):
+            remaining = list(range(len(measurements)))
+            expected = []
+            for i in range(8):
+                best = extremum([measurements[j] for j in remaining])
+                index = next(j for j in remaining if measurements[j] is best)
+                expected.append(index)
+                remaining.remove(index)
+
+            result = values.top_k(measurements, 8, largest=largest)
+            self.assertEqual(result.tolist(), expected)
+
+        self.assertEqual(len(values.top_k(measurements, 100)), 30)
+
+    def test_meanOfArrays(self):
+        """
+        The mean functions should give the same results for arrays as for
+        lists of the same measurements
+        """
+
+        rng = random.Random(9)
+        measurements = [
+            value.ValueUncertainty(rng.uniform(5, 15), rng.uniform(0.1, 2))
+            for i in range(50)
+        ]
+        array = value.ValueUncertaintyArray.from_list(measurements)
+
+        for function in (
+                mean.unweighted,
+                mean.weighted,
+                mean.weighted_mean_and_deviation
+        ):
+            expected = function(measurements)
+            result = function(array)
+            self.assertAlmostEqual(expected.raw, result.raw)
+            self.assertAlmostEqual(
+                expected.raw_uncertainty,
+                result.raw_uncertainty
+            )
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestValues)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -4,4 +4,14 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 from measurement_stats.value.value_type import ValueUncertainty
+from measurement_stats.value.value_array import ValueUncertaintyArray
+from measurement_stats.value.value_correlated import CorrelatedValue
+from measurement_stats.value.value_correlated import correlated
+from measurement_stats.value.value_correlated import covariance
+from measurement_stats.value.value_correlated import correlation
+from measurement_stats.value.value_expression import Expression
+from measurement_stats.value.value_expression import lazy
 from measurement_stats.value.value_ops import * # protected by __all__
+from measurement_stats.value.value_rounding import * # protected by __all__
+from measurement_stats.value.value_labels import * # protected by __all__
+from measurement_stats.value.value_monte_carlo import monte_carlo
@@ -0,0 +1,583 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import numpy as np
+
+from measurement_stats.value import value_labels
+from measurement_stats.value import value_rounding
+from measurement_stats.value import value_ufuncs
+from measurement_stats.value.value_type import ValueUncertainty
+
+
+def _unpack(source):
+    """
+    Splits an operand into its raw values and raw uncertainties. Plain
+    numeric operands, which carry no uncertainty, are returned with an
+    uncertainty of None.
+
+    :param source:
+    :return:
+    """
+
+    if isinstance(source, ValueUncertaintyArray):
+        return source.raw, source.raw_uncertainty
+
+    if hasattr(source, 'raw_uncertainty'):
+        return np.float64(source.raw), np.float64(source.raw_uncertainty)
+
+    if hasattr(source, 'raw'):
+        source = source.raw
+
+    return np.asarray(source, dtype=np.float64), None
+
+
+def _defers(other):
+    """
+    Whether or not an operation with the other operand should be deferred
+    to it, which is the case for lazy measurement expressions and any other
+    type that implements the NumPy ufunc protocol other than plain NumPy
+    arrays and ValueUncertaintyArray instances.
+    """
+
+    return (
+        getattr(type(other), '__array_ufunc__', None) is not None and
+        not isinstance(other, (np.ndarray, ValueUncertaintyArray))
+    )
+
+
+def add(a, a_unc, b, b_unc):
+    """
+    Adds the raw values of two operands and propagates their uncertainties
+    using the same rules as the ValueUncertainty addition operator. Either
+    uncertainty may be None for an operand without uncertainty, but not both.
+
+    :return: tuple containing the raw values and raw uncertainties
+    """
+
+    if a_unc is None:
+        return a + b, np.array(b_unc, dtype=np.float64)
+    if b_unc is None:
+        return a + b, np.array(a_unc, dtype=np.float64)
+    return a + b, np.sqrt(a_unc ** 2 + b_unc ** 2)
+
+
+def subtract(a, a_unc, b, b_unc):
+    """
+    Subtracts the raw values of the second operand from the first and
+    propagates their uncertainties using the same rules as the
+    ValueUncertainty subtraction operator.
+
+    :return: tuple containing the raw values and raw uncertainties
+    """
+
+    if a_unc is None:
+        return a - b, np.array(b_unc, dtype=np.float64)
+    if b_unc is None:
+        return a - b, np.array(a_unc, dtype=np.float64)
+    return a - b, np.sqrt(a_unc ** 2 + b_unc ** 2)
+
+
+def multiply(a, a_unc, b, b_unc):
+    """
+    Multiplies the raw values of two operands and propagates their
+    uncertainties using the same rules as the ValueUncertainty multiplication
+    operator, including the special case where either value is zero.
+
+    :return: tuple containing the raw values and raw uncertainties
+    """
+
+    if a_unc is None:
+        a, a_unc, b, b_unc = b, b_unc, a, a_unc
+    if b_unc is None:
+        return b * a, np.abs(b * a_unc)
+
+    val = a * b
+    with np.errstate(divide='ignore', invalid='ignore'):
+        unc = np.abs(val) * np.sqrt((a_unc / a) ** 2 + (b_unc / b) ** 2)
+
+    zeros = (a == 0) | (b == 0)
+    if np.any(zeros):
+        val = np.where(zeros, 0.0, val)
+        unc = np.where(zeros, np.sqrt(a_unc ** 2 + b_unc ** 2), unc)
+
+    return val, unc
+
+
+def divide(a, a_unc, b, b_unc):
+    """
+    Divides the raw values of the first operand by the second and propagates
+    their uncertainties using the same rules as the ValueUncertainty division
+    operator. A zero divisor raises a ZeroDivisionError unless the numerator
+    is also effectively zero, in which case the result is zero with the
+    combined uncertainties of both operands.
+
+    :return: tuple containing the raw values and raw uncertainties
+    """
+
+    if b_unc is None:
+        if np.any(b == 0):
+            raise ZeroDivisionError('float division by zero')
+        return a / b, np.abs(a_unc / b)
+
+    if a_unc is None:
+        a_unc = np.zeros_like(b_unc)
+
+    zeros = (a == 0) | (b == 0)
+    if np.any(zeros & ~(np.abs(a) < 1e-6)):
+        raise ZeroDivisionError('float division by zero')
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        val = a / b
+        unc = np.abs(val) * np.sqrt((a_unc / a) ** 2 + (b_unc / b) ** 2)
+
+    if np.any(zeros):
+        val = np.where(zeros, 0.0, val)
+        unc = np.where(zeros, np.sqrt(a_unc ** 2 + b_unc ** 2), unc)
+
+    return val, unc
+
+
+def power(a, a_unc, exponent, exponent_unc=None):
+    """
+    Raises the raw values to the specified exponent and propagates the
+    uncertainties using the same rules as the ValueUncertainty power operator,
+    where values that are effectively zero are left unchanged. If the
+    exponent has an uncertainty, its contribution of |ln(a) a^b| times the
+    exponent uncertainty is added in quadrature.
+
+    :return: tuple containing the raw values and raw uncertainties
+    """
+
+    exponent = np.asarray(exponent, dtype=np.float64)
+    zeros = np.abs(a) < 1e-5
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        val = a ** exponent
+        unc = np.abs(val * exponent * a_unc / a)
+        if exponent_unc is not None:
+            unc = np.sqrt(
+                unc ** 2
+                + (np.log(a) * val * exponent_unc) ** 2
+            )
+
+    if np.any(zeros):
+        val = np.where(zeros, a, val)
+        unc = np.where(zeros, a_unc, unc)
+
+    return val, unc
+
+
+# Ufuncs that are propagated with the same rules as the arithmetic operators
+_ARITHMETIC_UFUNCS = {
+    np.add: add,
+    np.subtract: subtract,
+    np.multiply: multiply,
+    np.true_divide: divide
+}
+
+_REDUCTIONS = {
+    np.add: value_ufuncs.sum_many,
+    np.multiply: value_ufuncs.prod_many
+}
+
+_FUNCTIONS = {}
+
+
+def _implements(numpy_function):
+    """
+    Registers the decorated function as the implementation of the specified
+    NumPy function for ValueUncertaintyArray arguments.
+    """
+
+    def register(function):
+        _FUNCTIONS[numpy_function] = function
+        return function
+
+    return register
+
+
+class ValueUncertaintyArray(object):
+    """
+    A columnar data type representation of a collection of measurement values
+    and their corresponding uncertainties. The raw values and raw
+    uncertainties are stored in two float64 NumPy arrays of the same shape
+    instead of as individual ValueUncertainty instances.
+
+    The common mathematical operators are overridden to propagate
+    uncertainties with the same rules as the ValueUncertainty type, but they
+    are applied to all of the measurements in the collection at once.
+    Operands can be other ValueUncertaintyArray instances, ValueUncertainty
+    instances or plain numeric values and arrays, which are treated as exact.
+
+    The NumPy ufunc and array function protocols are also implemented so
+    that common ufuncs, such as np.sin or np.sqrt, and reductions, such as
+    np.sum or np.mean, propagate uncertainties using first-order derivatives
+    computed by compiled NumPy loops over the raw arrays.
+    """
+
+    def __init__(self, values=None, uncertainties=1.0):
+        raw = np.asarray([] if values is None else values, dtype=np.float64)
+        raw_uncertainty = np.asarray(uncertainties, dtype=np.float64)
+
+        if raw_uncertainty.shape != raw.shape:
+            raw_uncertainty = np.broadcast_to(raw_uncertainty, raw.shape).copy()
+
+        if np.any(raw_uncertainty < 0):
+            raw_uncertainty = np.abs(raw_uncertainty)
+
+        self.raw = raw
+        self.raw_uncertainty = raw_uncertainty
+
+    @classmethod
+    def from_list(cls, measurements):
+        """
+        Creates a ValueUncertaintyArray from an iterable of ValueUncertainty
+        instances using their raw values and raw uncertainties.
+
+        :param measurements:
+        :return:
+        :rtype: ValueUncertaintyArray
+        """
+
+        if isinstance(measurements, ValueUncertaintyArray):
+            return measurements
+
+        measurements = list(measurements)
+        count = len(measurements)
+        return cls(
+            np.fromiter(
+                (m.raw for m in measurements),
+                dtype=np.float64,
+                count=count
+            ),
+            np.fromiter(
+                (m.raw_uncertainty for m in measurements),
+                dtype=np.float64,
+                count=count
+            )
+        )
+
+    def to_list(self):
+        """
+        Creates a list of ValueUncertainty instances from the raw values and
+        raw uncertainties of this array.
+
+        :return:
+        :rtype: list
+        """
+
+        return [
+            ValueUncertainty(v, u)
+            for v, u in zip(
+                self.raw.ravel().tolist(),
+                self.raw_uncertainty.ravel().tolist()
+            )
+        ]
+
+    @property
+    def value(self):
+        """
+        :return:
+            Returns an array of the numerical values, each of which has been
+            rounded according to its corresponding uncertainty
+        """
+
+        return value_rounding.round_measurements_many(
+            self.raw,
+            self.raw_uncertainty
+        )[0]
+
+    @property
+    def uncertainty(self):
+        """
+        :return:
+            Returns an array of the uncertainty values, each of which has been
+            rounded to a single significant digit
+        """
+
+        return value_rounding.round_significant_many(self.raw_uncertainty, 1)
+
+    @property
+    def labels(self):
+        """
+        :return:
+            A list of the plain text labels of the measurements in flattened
+            order, identical to their ValueUncertainty.label values
+        """
+        return value_labels.labels_many(self.raw, self.raw_uncertainty)
+
+    @property
+    def html_labels(self):
+        """
+        :return:
+            A list of the HTML labels of the measurements in flattened order
+        """
+        return value_labels.html_labels_many(self.raw, self.raw_uncertainty)
+
+    @property
+    def raw_labels(self):
+        """
+        :return:
+            A list of the raw labels of the measurements in flattened order
+        """
+        return value_labels.raw_labels_many(self.raw, self.raw_uncertainty)
+
+    @property
+    def shape(self):
+        return self.raw.shape
+
+    @property
+    def size(self):
+        return self.raw.size
+
+    def clone(self):
+        """
+        :return:
+            A copy of this array with its own raw value and raw uncertainty
+            buffers
+        :rtype: ValueUncertaintyArray
+        """
+        return self.__class__(self.raw.copy(), self.raw_uncertainty.copy())
+
+    def _create(self, values, uncertainties):
+        out = self.__class__.__new__(self.__class__)
+        out.raw = np.asarray(values, dtype=np.float64)
+        out.raw_uncertainty = np.asarray(uncertainties, dtype=np.float64)
+        if out.raw_uncertainty.shape != out.raw.shape:
+            out.raw_uncertainty = np.broadcast_to(
+                out.raw_uncertainty,
+                out.raw.shape
+            ).copy()
+        return out
+
+    def _wrap(self, values, uncertainties):
+        if np.ndim(values) == 0:
+            return ValueUncertainty(float(values), float(uncertainties))
+        return self._create(values, uncertainties)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if kwargs.get('out') is not None:
+            return NotImplemented
+
+        if method == 'reduce':
+            reduction = _REDUCTIONS.get(ufunc)
+            unsupported = set(kwargs) - {'axis', 'keepdims', 'out'}
+            if reduction is None or unsupported:
+                return NotImplemented
+            return self._wrap(*reduction(
+                self.raw,
+                self.raw_uncertainty,
+                axis=kwargs.get('axis', 0),
+                keepdims=kwargs.get('keepdims', False)
+            ))
+
+        if method != '__call__' or kwargs:
+            return NotImplemented
+
+        if any(_defers(x) for x in inputs):
+            return NotImplemented
+
+        operands = [_unpack(x) for x in inputs]
+
+        if ufunc in _ARITHMETIC_UFUNCS:
+            (a, a_unc), (b, b_unc) = operands
+            return self._wrap(*_ARITHMETIC_UFUNCS[ufunc](a, a_unc, b, b_unc))
+
+        if ufunc is np.power:
+            (a, a_unc), (b, b_unc) = operands
+            if a_unc is None:
+                return NotImplemented
+            return self._wrap(*power(a, a_unc, b, b_unc))
+
+        if ufunc is np.absolute or ufunc in value_ufuncs.UNARY_DERIVATIVES:
+            x, x_unc = operands[0]
+            return self._wrap(*value_ufuncs.unary(ufunc, x, x_unc))
+
+        if ufunc in value_ufuncs.BINARY_DERIVATIVES:
+            (a, a_unc), (b, b_unc) = operands
+            return self._wrap(*value_ufuncs.binary(ufunc, a, a_unc, b, b_unc))
+
+        return NotImplemented
+
+    def __array_function__(self, func, types, args, kwargs):
+        function = _FUNCTIONS.get(func)
+        if function is None:
+            return NotImplemented
+        supported = (ValueUncertaintyArray, np.ndarray)
+        if not all(issubclass(t, supported) for t in types):
+            return NotImplemented
+        return function(*args, **kwargs)
+
+    def __len__(self):
+        return len(self.raw)
+
+    def __iter__(self):
+        for v, u in zip(self.raw.tolist(), self.raw_uncertainty.tolist()):
+            yield ValueUncertainty(v, u)
+
+    def __getitem__(self, item):
+        raw = self.raw[item]
+        raw_uncertainty = self.raw_uncertainty[item]
+
+        if np.ndim(raw) == 0:
+            return ValueUncertainty(float(raw), float(raw_uncertainty))
+
+        return self._create(raw, raw_uncertainty)
+
+    def __setitem__(self, key, item):
+        raw, raw_uncertainty = _unpack(item)
+        self.raw[key] = raw
+        self.raw_uncertainty[key] = (
+            0.0 if raw_uncertainty is None else np.abs(raw_uncertainty)
+        )
+
+    def __pow__(self, exponent, modulo=None):
+        if _defers(exponent):
+            return NotImplemented
+
+        exponent, exponent_unc = _unpack(exponent)
+        return self._create(*power(
+            self.raw, self.raw_uncertainty,
+            exponent, exponent_unc
+        ))
+
+    def __add__(self, other):
+        if _defers(other):
+            return NotImplemented
+
+        other, other_unc = _unpack(other)
+        return self._create(*add(
+            self.raw, self.raw_uncertainty,
+            other, other_unc
+        ))
+
+    def __radd__(self, other):
+        return self.__add__(other)
+
+    def __sub__(self, other):
+        if _defers(other):
+            return NotImplemented
+
+        other, other_unc = _unpack(other)
+        return self._create(*subtract(
+            self.raw, self.raw_uncertainty,
+            other, other_unc
+        ))
+
+    def __rsub__(self, other):
+        if _defers(other):
+            return NotImplemented
+
+        other, other_unc = _unpack(other)
+        return self._create(*subtract(
+            other, other_unc,
+            self.raw, self.raw_uncertainty
+        ))
+
+    def __mul__(self, other):
+        if _defers(other):
+            return NotImplemented
+
+        other, other_unc = _unpack(other)
+        return self._create(*multiply(
+            self.raw, self.raw_uncertainty,
+            other, other_unc
+        ))
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def __truediv__(self, other):
+        if _defers(other):
+            return NotImplemented
+
+        other, other_unc = _unpack(other)
+        return self._create(*divide(
+            self.raw, self.raw_uncertainty,
+            other, other_unc
+        ))
+
+    def __rtruediv__(self, other):
+        if _defers(other):
+            return NotImplemented
+
+        other, other_unc = _unpack(other)
+        return self._create(*divide(
+            other, other_unc,
+            self.raw, self.raw_uncertainty
+        ))
+
+    def __div__(self, other):
+        return self.__truediv__(other)
+
+    def __rdiv__(self, other):
+        return self.__rtruediv__(other)
+
+    def __abs__(self):
+        return self._create(np.abs(self.raw), self.raw_uncertainty.copy())
+
+    def __neg__(self):
+        return self._create(-self.raw, self.raw_uncertainty.copy())
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
+        return '<%s size=%s>' % (self.__class__.__name__, self.size)
+
+
+def _as_array(source):
+    if isinstance(source, ValueUncertaintyArray):
+        return source
+    raw, raw_uncertainty = _unpack(source)
+    return ValueUncertaintyArray(
+        raw,
+        0.0 if raw_uncertainty is None else raw_uncertainty
+    )
+
+
+@_implements(np.sum)
+def _sum(a, axis=None, keepdims=False):
+    return a._wrap(*value_ufuncs.sum_many(
+        a.raw, a.raw_uncertainty,
+        axis=axis,
+        keepdims=keepdims
+    ))
+
+
+@_implements(np.mean)
+def _mean(a, axis=None, keepdims=False):
+    return a._wrap(*value_ufuncs.mean_many(
+        a.raw, a.raw_uncertainty,
+        axis=axis,
+        keepdims=keepdims
+    ))
+
+
+@_implements(np.prod)
+def _prod(a, axis=None, keepdims=False):
+    return a._wrap(*value_ufuncs.prod_many(
+        a.raw, a.raw_uncertainty,
+        axis=axis,
+        keepdims=keepdims
+    ))
+
+
+@_implements(np.concatenate)
+def _concatenate(arrays, axis=0):
+    arrays = [_as_array(a) for a in arrays]
+    return arrays[0]._create(
+        np.concatenate([a.raw for a in arrays], axis=axis),
+        np.concatenate([a.raw_uncertainty for a in arrays], axis=axis)
+    )
+
+
+@_implements(np.stack)
+def _stack(arrays, axis=0):
+    arrays = [_as_array(a) for a in arrays]
+    return arrays[0]._create(
+        np.stack([a.raw for a in arrays], axis=axis),
+        np.stack([a.raw_uncertainty for a in arrays], axis=axis)
+    )
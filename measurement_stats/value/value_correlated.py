@@ -0,0 +1,252 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import math
+import uuid
+
+from measurement_stats.value import value_ops
+from measurement_stats.value import value_type
+from measurement_stats.value.value_type import ValueUncertainty
+
+
+def _variable_key():
+    """
+    Returns a new key for an independent input variable. Keys are random
+    128-bit integers so that the values created by different processes can
+    be pickled and combined without sharing any keys by accident.
+    """
+
+    return uuid.uuid4().int
+
+
+def correlated(*measurements):
+    """
+    Converts measurements into CorrelatedValue instances, each of which is a
+    new independent input variable with the raw value and raw uncertainty of
+    the corresponding measurement.
+
+    :param measurements:
+    :return:
+        A CorrelatedValue for a single measurement, or a tuple of them
+    """
+
+    out = tuple(
+        CorrelatedValue(m.raw, m.raw_uncertainty)
+        for m in measurements
+    )
+    return out[0] if len(out) == 1 else out
+
+
+def covariance(a, b):
+    """
+    Returns the covariance between two correlated values, which is the sum
+    over their shared input variables of the products of their scaled
+    sensitivities to those variables.
+
+    :param a:
+    :param b:
+    :return:
+    """
+
+    ta = getattr(a, 'terms', {})
+    tb = getattr(b, 'terms', {})
+    if len(tb) < len(ta):
+        ta, tb = tb, ta
+    return sum(s * tb[k] for k, s in ta.items() if k in tb)
+
+
+def correlation(a, b):
+    """
+    Returns the correlation coefficient between two correlated values on the
+    range [-1, 1], or 0.0 if either of them has no uncertainty.
+
+    :param a:
+    :param b:
+    :return:
+    """
+
+    denominator = a.raw_uncertainty * b.raw_uncertainty
+    if not denominator:
+        return 0.0
+    return covariance(a, b) / denominator
+
+
+def _combine(raw, da, terms_a, db, terms_b):
+    """
+    Creates the terms of a derived value from the partial derivatives of
+    the operation with respect to each operand and the operand terms. The
+    cost is linear in the number of terms of the two operands.
+    """
+
+    terms = {k: da * s for k, s in terms_a.items()} if da else {}
+    if db:
+        for k, s in terms_b.items():
+            terms[k] = terms.get(k, 0.0) + db * s
+    return CorrelatedValue.derived(raw, terms)
+
+
+class CorrelatedValue(ValueUncertainty):
+    """
+    A ValueUncertainty that tracks its dependence on the independent input
+    variables from which it was computed. Each instance stores a sparse
+    mapping from input variables to the scaled sensitivity of the value to
+    that input, i.e. the partial derivative multiplied by the uncertainty of
+    the input, from which the uncertainty is the square-root of the sum of
+    the squared sensitivities.
+
+    Operations between correlated values combine their mappings using the
+    exact partial derivatives of the operation, so that inputs shared by
+    both operands are propagated correctly. The cost of each operation is
+    linear in the number of inputs the operands depend upon, and no
+    covariance matrix is ever created.
+
+    Plain ValueUncertainty operands are treated as new independent inputs
+    every time they are used. They should be converted with correlated()
+    when they appear more than once in a computation.
+    """
+
+    __slots__ = ('_terms',)
+
+    def __init__(self, value=0.0, uncertainty=1.0, **kwargs):
+        super(CorrelatedValue, self).__init__(value, uncertainty, **kwargs)
+
+    @classmethod
+    def derived(cls, raw, terms):
+        """
+        Creates a correlated value from a raw value and a mapping of input
+        variables to scaled sensitivities.
+
+        :param raw:
+        :param terms:
+        :return:
+        :rtype: CorrelatedValue
+        """
+
+        out = cls.__new__(cls)
+        out._raw = raw
+        out._terms = terms
+        out._raw_uncertainty = math.sqrt(sum(s * s for s in terms.values()))
+        out._rounded = None
+        return out
+
+    @property
+    def terms(self):
+        """
+        :return:
+            The mapping of input variable keys to the scaled sensitivities of
+            this value to those inputs
+        """
+        return self._terms
+
+    @property
+    def raw_uncertainty(self):
+        return self._raw_uncertainty
+
+    @raw_uncertainty.setter
+    def raw_uncertainty(self, value):
+        # Assigning an uncertainty makes this value a new independent input
+        value = abs(float(value))
+        self._terms = {_variable_key(): value} if value else {}
+        self._raw_uncertainty = value
+        self._rounded = None
+
+    def clone(self):
+        """
+        :return:
+            A copy of this value that depends on the same input variables
+        :rtype: CorrelatedValue
+        """
+        return self.derived(self._raw, dict(self._terms))
+
+    def __getstate__(self):
+        return self._raw, self._terms
+
+    def __setstate__(self, state):
+        raw, terms = state
+        self._raw = raw
+        self._terms = terms
+        self._raw_uncertainty = math.sqrt(sum(s * s for s in terms.values()))
+        self._rounded = None
+
+    @staticmethod
+    def _operand(other):
+        if isinstance(other, CorrelatedValue):
+            return other._raw, other._terms
+        if hasattr(other, 'raw_uncertainty'):
+            unc = abs(float(other.raw_uncertainty))
+            return other.raw, {_variable_key(): unc} if unc else {}
+        return float(other), {}
+
+    def __pow__(self, power, modulo=None):
+        p, tp = self._operand(power)
+        if value_ops.equivalent(self._raw, 0.0, 1e-5):
+            return self.clone()
+
+        val = self._raw ** p
+        return _combine(
+            val,
+            p * self._raw ** (p - 1.0), self._terms,
+            val * math.log(self._raw) if tp else 0.0, tp
+        )
+
+    def __rpow__(self, other):
+        b, tb = self._operand(other)
+        val = b ** self._raw
+        return _combine(
+            val,
+            val * math.log(b) if self._terms else 0.0, self._terms,
+            self._raw * b ** (self._raw - 1.0) if tb else 0.0, tb
+        )
+
+    def __add__(self, other):
+        if value_type._is_columnar(other):
+            return NotImplemented
+        b, tb = self._operand(other)
+        return _combine(self._raw + b, 1.0, self._terms, 1.0, tb)
+
+    def __radd__(self, other):
+        return self.__add__(other)
+
+    def __sub__(self, other):
+        if value_type._is_columnar(other):
+            return NotImplemented
+        b, tb = self._operand(other)
+        return _combine(self._raw - b, 1.0, self._terms, -1.0, tb)
+
+    def __rsub__(self, other):
+        if value_type._is_columnar(other):
+            return NotImplemented
+        b, tb = self._operand(other)
+        return _combine(b - self._raw, -1.0, self._terms, 1.0, tb)
+
+    def __mul__(self, other):
+        if value_type._is_columnar(other):
+            return NotImplemented
+        b, tb = self._operand(other)
+        return _combine(self._raw * b, b, self._terms, self._raw, tb)
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def __truediv__(self, other):
+        if value_type._is_columnar(other):
+            return NotImplemented
+        b, tb = self._operand(other)
+        val = self._raw / b
+        return _combine(val, 1.0 / b, self._terms, -val / b, tb)
+
+    def __rtruediv__(self, other):
+        if value_type._is_columnar(other):
+            return NotImplemented
+        b, tb = self._operand(other)
+        val = b / self._raw
+        return _combine(val, -val / self._raw, self._terms, 1.0 / self._raw, tb)
+
+    def __neg__(self):
+        return _combine(-self._raw, -1.0, self._terms, 0.0, {})
+
+    def __abs__(self):
+        sign = -1.0 if self._raw < 0 else 1.0
+        return _combine(abs(self._raw), sign, self._terms, 0.0, {})
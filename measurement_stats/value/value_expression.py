@@ -0,0 +1,278 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import numpy as np
+
+from measurement_stats.value import value_ufuncs
+from measurement_stats.value.value_array import ValueUncertaintyArray
+from measurement_stats.value.value_type import ValueUncertainty
+
+# Partial derivatives of the arithmetic operations with respect to each of
+# their operands, as functions of the operand values and the result value
+_ARITHMETIC_PARTIALS = {
+    np.add: lambda a, b, y: (1.0, 1.0),
+    np.subtract: lambda a, b, y: (1.0, -1.0),
+    np.multiply: lambda a, b, y: (b, a),
+    np.true_divide: lambda a, b, y: (1.0 / b, -y / b),
+    np.power: lambda a, b, y: (b * a ** (b - 1.0), y * np.log(a)),
+    np.absolute: lambda x, y: (np.sign(x),)
+}
+
+
+def lazy(*measurements):
+    """
+    Wraps measurements as variables of a lazily evaluated expression graph.
+    Operators and supported NumPy ufuncs applied to the returned variables
+    build the graph instead of computing intermediate results, which is then
+    computed in a single pass by calling evaluate on the final expression.
+
+    :param measurements:
+        One or more ValueUncertainty or ValueUncertaintyArray instances.
+    :return:
+        A Variable for a single measurement, or a tuple of Variables
+    """
+
+    variables = tuple(Variable(m) for m in measurements)
+    return variables[0] if len(variables) == 1 else variables
+
+
+def _as_expression(source):
+    if isinstance(source, Expression):
+        return source
+    if hasattr(source, 'raw_uncertainty'):
+        return Variable(source)
+    return Constant(source)
+
+
+def _topological_order(root):
+    """
+    Returns the nodes of the expression graph ordered so that every node
+    appears after all of its operands. Nodes that are shared by several
+    parts of the expression appear only once.
+
+    :param root:
+    :return:
+    """
+
+    order = []
+    visited = set()
+    stack = [(root, False)]
+
+    while stack:
+        node, expanded = stack.pop()
+        if expanded:
+            order.append(node)
+            continue
+
+        if id(node) in visited:
+            continue
+
+        visited.add(id(node))
+        stack.append((node, True))
+        stack.extend(
+            (operand, False) for operand in node.operands
+            if id(operand) not in visited
+        )
+
+    return order
+
+
+def _partials(operation, inputs, result):
+    if operation in _ARITHMETIC_PARTIALS:
+        return _ARITHMETIC_PARTIALS[operation](*(inputs + [result]))
+    if operation in value_ufuncs.UNARY_DERIVATIVES:
+        return value_ufuncs.UNARY_DERIVATIVES[operation](inputs[0], result),
+    return value_ufuncs.BINARY_DERIVATIVES[operation](*(inputs + [result]))
+
+
+def evaluate(expression):
+    """
+    Evaluates the expression graph in a single vectorized pass over the raw
+    values of its variables. The uncertainty of the result is propagated
+    from the exact partial derivatives of the whole expression with respect
+    to each distinct input measurement, which are accumulated in reverse
+    through the graph. A measurement that appears more than once in the
+    expression is therefore treated as a single variable.
+
+    :param expression:
+    :return:
+        A ValueUncertainty if the result is a scalar, otherwise a
+        ValueUncertaintyArray
+    """
+
+    order = _topological_order(expression)
+    values = {}
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for node in order:
+            if node.operation is None:
+                values[id(node)] = node.raw
+            else:
+                values[id(node)] = node.operation(
+                    *[values[id(x)] for x in node.operands]
+                )
+
+        result = values[id(expression)]
+        adjoints = {id(expression): np.ones(np.shape(result))}
+
+        for node in reversed(order):
+            if node.operation is None:
+                continue
+
+            adjoint = adjoints.pop(id(node))
+            partials = _partials(
+                node.operation,
+                [values[id(x)] for x in node.operands],
+                values[id(node)]
+            )
+
+            for operand, partial in zip(node.operands, partials):
+                if isinstance(operand, Constant):
+                    continue
+                key = id(operand)
+                contribution = adjoint * partial
+                if key in adjoints:
+                    contribution = adjoints[key] + contribution
+                adjoints[key] = contribution
+
+    # Variables that wrap the same measurement are combined before their
+    # contributions to the uncertainty are added in quadrature
+    gradients = {}
+    sources = {}
+    for node in order:
+        if isinstance(node, Variable):
+            key = id(node.source)
+            sources[key] = node
+            gradients[key] = gradients.get(key, 0.0) + adjoints[id(node)]
+
+    variance = np.zeros(np.shape(result))
+    for key, gradient in gradients.items():
+        variance = variance + (gradient * sources[key].raw_uncertainty) ** 2
+
+    if np.ndim(result) == 0:
+        return ValueUncertainty(float(result), float(np.sqrt(variance)))
+    return ValueUncertaintyArray(result, np.sqrt(variance))
+
+
+class Expression(object):
+    """
+    A node within a lazily evaluated graph of operations on measurements.
+    Arithmetic operators and the NumPy ufuncs with known derivatives create
+    new nodes without computing anything. The graph is computed when the
+    evaluate method is called.
+    """
+
+    __slots__ = ('operation', 'operands')
+
+    def __init__(self, operation, *operands):
+        self.operation = operation
+        self.operands = tuple(_as_expression(x) for x in operands)
+
+    def evaluate(self):
+        """
+        :return:
+            The ValueUncertainty or ValueUncertaintyArray result of the
+            expression
+        """
+        return evaluate(self)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        supported = (
+            ufunc in _ARITHMETIC_PARTIALS or
+            ufunc in value_ufuncs.UNARY_DERIVATIVES or
+            ufunc in value_ufuncs.BINARY_DERIVATIVES
+        )
+        if method != '__call__' or kwargs or not supported:
+            return NotImplemented
+        return Expression(ufunc, *inputs)
+
+    def __add__(self, other):
+        return Expression(np.add, self, other)
+
+    def __radd__(self, other):
+        return Expression(np.add, other, self)
+
+    def __sub__(self, other):
+        return Expression(np.subtract, self, other)
+
+    def __rsub__(self, other):
+        return Expression(np.subtract, other, self)
+
+    def __mul__(self, other):
+        return Expression(np.multiply, self, other)
+
+    def __rmul__(self, other):
+        return Expression(np.multiply, other, self)
+
+    def __truediv__(self, other):
+        return Expression(np.true_divide, self, other)
+
+    def __rtruediv__(self, other):
+        return Expression(np.true_divide, other, self)
+
+    def __div__(self, other):
+        return self.__truediv__(other)
+
+    def __rdiv__(self, other):
+        return self.__rtruediv__(other)
+
+    def __pow__(self, power, modulo=None):
+        return Expression(np.power, self, power)
+
+    def __rpow__(self, other):
+        return Expression(np.power, other, self)
+
+    def __neg__(self):
+        return Expression(np.negative, self)
+
+    def __abs__(self):
+        return Expression(np.absolute, self)
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
+        return '<%s %s>' % (
+            self.__class__.__name__,
+            getattr(self.operation, '__name__', self.operation)
+        )
+
+
+class Variable(Expression):
+    """
+    A leaf node of an expression graph that wraps a ValueUncertainty or
+    ValueUncertaintyArray measurement
+    """
+
+    __slots__ = ('source',)
+
+    def __init__(self, source):
+        super(Variable, self).__init__(None)
+        self.source = source
+
+    @property
+    def raw(self):
+        return np.asarray(self.source.raw, dtype=np.float64)
+
+    @property
+    def raw_uncertainty(self):
+        return np.asarray(self.source.raw_uncertainty, dtype=np.float64)
+
+
+class Constant(Expression):
+    """
+    A leaf node of an expression graph that wraps an exact numeric value or
+    array
+    """
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        super(Constant, self).__init__(None)
+        self.value = value
+
+    @property
+    def raw(self):
+        return np.asarray(self.value, dtype=np.float64)
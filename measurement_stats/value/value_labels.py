@@ -0,0 +1,120 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import numpy as np
+
+from measurement_stats.value import value_rounding
+
+__all__ = [
+    'labels_many',
+    'html_labels_many',
+    'raw_labels_many'
+]
+
+
+def _suffixes(uncertainties, template):
+    """
+    Formats each of the rounded uncertainties with the template. Rounded
+    uncertainties have a single significant digit and therefore very few
+    distinct values, so only the unique values are formatted. Zero is
+    formatted as '0' because the scalar rounding returns an integer zero.
+
+    :param uncertainties:
+    :param template:
+    :return: list of formatted uncertainties in flattened order
+    """
+
+    unique, inverse = np.unique(uncertainties, return_inverse=True)
+    strings = [template % u if u else '0' for u in unique.tolist()]
+    return [strings[i] for i in inverse.ravel().tolist()]
+
+
+def _join(template, values, suffixes):
+    """
+    Formats all of the labels with a single string formatting operation,
+    where the template contains one value field and one uncertainty field,
+    instead of formatting each label separately.
+
+    :param template:
+    :param values:
+    :param suffixes:
+    :return: list of labels
+    """
+
+    count = len(suffixes)
+    if not count:
+        return []
+
+    fields = [None] * (2 * count)
+    fields[0::2] = values.ravel().tolist()
+    fields[1::2] = suffixes
+    return ((template + '\n') * count % tuple(fields)).split('\n')[:-1]
+
+
+def _rounded_labels(raw, raw_uncertainty, template):
+    raw, raw_uncertainty = np.broadcast_arrays(
+        np.asarray(raw, dtype=np.float64),
+        np.asarray(raw_uncertainty, dtype=np.float64)
+    )
+    values, uncertainties = value_rounding.round_measurements_many(
+        raw,
+        raw_uncertainty
+    )
+    return _join(template, values, _suffixes(uncertainties, '%s'))
+
+
+def labels_many(raw, raw_uncertainty):
+    """
+    Array version of the ValueUncertainty.label property, which creates the
+    plain text labels of the measurements with the specified raw values and
+    raw uncertainties.
+
+    :param raw:
+    :param raw_uncertainty:
+    :return: list of labels in flattened order
+    """
+
+    return _rounded_labels(raw, raw_uncertainty, '%.15g +/- %s')
+
+
+def html_labels_many(raw, raw_uncertainty):
+    """
+    Array version of the ValueUncertainty.html_label property, which creates
+    the HTML labels of the measurements with the specified raw values and
+    raw uncertainties.
+
+    :param raw:
+    :param raw_uncertainty:
+    :return: list of labels in flattened order
+    """
+
+    return _rounded_labels(raw, raw_uncertainty, '%.15g &#177; %s')
+
+
+def raw_labels_many(raw, raw_uncertainty):
+    """
+    Array version of the ValueUncertainty.raw_label property, which creates
+    the labels of the measurements with the specified raw values rounded to
+    six significant digits.
+
+    :param raw:
+    :param raw_uncertainty:
+    :return: list of labels in flattened order
+    """
+
+    raw, raw_uncertainty = np.broadcast_arrays(
+        np.asarray(raw, dtype=np.float64),
+        np.asarray(raw_uncertainty, dtype=np.float64)
+    )
+    values = value_rounding.round_significant_many(raw, 6)
+    uncertainties = value_rounding.round_significant_many(
+        np.abs(raw_uncertainty),
+        1
+    )
+    return _join(
+        '%.15g +/- %s',
+        values,
+        _suffixes(uncertainties, '%.15g')
+    )
@@ -0,0 +1,135 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import numpy as np
+
+from measurement_stats import errors
+from measurement_stats.value.value_array import ValueUncertaintyArray
+from measurement_stats.value.value_type import ValueUncertainty
+
+
+def _merge(count, mean, m2, chunk):
+    """
+    Merges the moments of a chunk of samples, along the first axis, into the
+    running count, mean and sum of squared deviations using the pairwise
+    update of Chan et al.
+    """
+
+    n = chunk.shape[0]
+    chunk_mean = chunk.mean(axis=0)
+    chunk_m2 = ((chunk - chunk_mean) ** 2).sum(axis=0)
+
+    if count == 0:
+        return n, chunk_mean, chunk_m2
+
+    total = count + n
+    delta = chunk_mean - mean
+    mean = mean + delta * (n / total)
+    m2 = m2 + chunk_m2 + delta * delta * (count * n / total)
+    return total, mean, m2
+
+
+def monte_carlo(
+        function,
+        *measurements,
+        samples=100000,
+        chunk_size=65536,
+        seed=None,
+        as_distribution=False
+):
+    """
+    Propagates the uncertainties of the measurements through the function by
+    Monte Carlo sampling. Each measurement is treated as an independent
+    normal distribution with its raw value as the mean and its raw
+    uncertainty as the standard deviation.
+
+    The function is called with one NumPy array of samples per measurement
+    and must return an array of the results for those samples. It is called
+    once for each chunk of at most chunk_size samples so that memory use is
+    capped regardless of the total number of samples.
+
+    :param function:
+        A vectorized function of the measurements, e.g.
+        lambda l, T: 4 * np.pi ** 2 * l / T ** 2
+    :param measurements:
+        The ValueUncertainty or ValueUncertaintyArray arguments of the
+        function. The samples of a ValueUncertaintyArray have the shape
+        (chunk, *array.shape).
+    :param samples:
+        The total number of samples to draw for each measurement.
+    :param chunk_size:
+        The maximum number of samples to evaluate in each function call.
+    :param seed:
+        (optional) Seed for the random number generator, which makes the
+        result reproducible.
+    :param as_distribution:
+        If True, the result is returned as a Distribution of the function
+        samples instead of being summarized by their mean and standard
+        deviation. Only functions with scalar results are supported and a
+        ValueError is raised for array results.
+    :return:
+        A ValueUncertainty, or a ValueUncertaintyArray for array results,
+        with the sample mean and sample standard deviation of the results.
+        A Distribution if as_distribution is True.
+    """
+
+    samples = int(samples)
+    chunk_size = int(chunk_size)
+    if samples < 1 or chunk_size < 1:
+        raise ValueError(errors.message(
+            """
+            At least one sample must be drawn in chunks of at least one
+            sample, not {} samples in chunks of {}
+            """,
+            samples,
+            chunk_size
+        ))
+
+    rng = np.random.default_rng(seed)
+    parameters = [
+        (
+            np.asarray(m.raw, dtype=np.float64),
+            np.asarray(m.raw_uncertainty, dtype=np.float64)
+        )
+        for m in measurements
+    ]
+
+    count = 0
+    mean = None
+    m2 = None
+    kept = []
+
+    remaining = samples
+    while remaining > 0:
+        n = min(remaining, chunk_size)
+        remaining -= n
+
+        draws = [
+            rng.normal(loc, scale, size=(n,) + loc.shape)
+            for loc, scale in parameters
+        ]
+        result = np.asarray(function(*draws), dtype=np.float64)
+        result = np.broadcast_to(result, (n,) + result.shape[1:])
+
+        if as_distribution:
+            if result.ndim > 1:
+                raise ValueError(errors.message(
+                    """
+                    Only functions with scalar results can be returned as a
+                    distribution, not results with shape {}
+                    """,
+                    result.shape[1:]
+                ))
+            kept.append(result)
+        count, mean, m2 = _merge(count, mean, m2, result)
+
+    if as_distribution:
+        from measurement_stats import distributions
+        return distributions.create_distribution(np.concatenate(kept))
+
+    deviation = np.sqrt(m2 / max(1, count - 1))
+    if np.ndim(mean) == 0:
+        return ValueUncertainty(float(mean), float(deviation))
+    return ValueUncertaintyArray(mean, deviation)
@@ -0,0 +1,225 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import math
+import sys
+
+import numpy as np
+
+from measurement_stats import errors
+
+__all__ = [
+    'order_of_magnitude_many',
+    'round_significant_many',
+    'least_significant_order_many',
+    'round_to_order_many',
+    'round_measurements_many'
+]
+
+_EPSILON = 100.0 * sys.float_info.epsilon
+
+# Powers of ten are looked up from a table populated by math.pow instead of
+# being computed with np.power, whose vectorized implementation does not
+# always round to the same result as the scalar math.pow used by value_ops.
+_MIN_ORDER = -350
+_POWERS_OF_TEN = np.array(
+    [math.pow(10, order) for order in range(_MIN_ORDER, 309)] + [np.inf]
+)
+
+
+def _power_of_ten(orders):
+    """
+    Returns 10 raised to each of the specified integer orders with the same
+    rounding as math.pow.
+
+    :param orders:
+    :return:
+    """
+
+    index = np.asarray(orders, dtype=np.int64) - _MIN_ORDER
+    return _POWERS_OF_TEN[np.clip(index, 0, len(_POWERS_OF_TEN) - 1)]
+
+
+def _as_finite_array(values):
+    """
+    Converts the values into a float64 array, raising a ValueError if any of
+    them are not finite, which the scalar rounding functions cannot handle
+    either.
+
+    :param values:
+    :return:
+    """
+
+    values = np.asarray(values, dtype=np.float64)
+    if not np.all(np.isfinite(values)):
+        raise ValueError(errors.message(
+            """
+            Unable to round non-finite values. All values must be finite
+            numbers.
+            """
+        ))
+    return values
+
+
+def order_of_magnitude_many(values):
+    """
+    Array version of the value_ops.order_of_magnitude function, which returns
+    the order of magnitude of the most significant digit of each of the
+    specified non-zero numbers.
+
+    :param values:
+    :return: An integer array of orders with the same shape as values
+    """
+
+    x = np.abs(_as_finite_array(values))
+    if np.any(x == 0):
+        raise ValueError('The order of magnitude of zero is undefined')
+
+    offset = np.where(x >= 1.0, 0.0, -1.0)
+    return np.trunc(np.log10(x) + offset).astype(np.int64)
+
+
+def round_significant_many(values, digits):
+    """
+    Array version of the value_ops.round_significant function, which rounds
+    each value to the specified number of significant digits. Zero values
+    are returned as 0.0.
+
+    :param values:
+    :param digits:
+    :return: A float64 array of rounded values
+    """
+
+    values = _as_finite_array(values)
+    zeros = values == 0
+    x = np.where(zeros, 1.0, values)
+
+    d = np.ceil(np.log10(np.abs(x)))
+    magnitude = _power_of_ten(digits - d)
+
+    # Adding zero removes negative zeros created by rounding small negative
+    # values, which the scalar version returns as a positive zero
+    shifted = np.rint(x * magnitude) + 0.0
+    return np.where(zeros, 0.0, shifted / magnitude)
+
+
+def _integer_orders(values):
+    """
+    Finds the least significant orders for non-zero integral values, which
+    is the number of trailing zeros before the first non-zero digit. The
+    search is carried out with the same floating point tests used by the
+    scalar least_significant_order function to guarantee identical results,
+    but only for values that have not yet been resolved.
+
+    :param values:
+    :return:
+    """
+
+    out = np.zeros(values.shape, dtype=np.int64)
+    active = np.arange(values.size)
+
+    om = 0
+    while active.size:
+        om += 1
+        test = values[active] * _power_of_ten(-om)
+        done = np.trunc(test) != test
+        out[active[done]] = om - 1
+        active = active[~done]
+
+    return out
+
+
+def _fractional_orders(values):
+    """
+    Finds the least significant orders for non-integral values. The starting
+    order is computed in closed form from the base 10 logarithm of each
+    value, from which the equivalence test of the scalar
+    least_significant_order function is applied at successive orders until
+    every value has been resolved.
+
+    :param values:
+    :return:
+    """
+
+    out = np.zeros(values.shape, dtype=np.int64)
+    x = np.abs(values)
+
+    # Values that are smaller than the equivalence tolerance after their
+    # first shift are resolved to -1 immediately, as in the scalar version
+    tiny = np.abs(values * 10.0) < _EPSILON
+    out[tiny] = -1
+
+    # All shifts below the starting order leave the value less than one and
+    # therefore cannot satisfy the equivalence test. The starting order is
+    # lowered by one more to absorb rounding errors in the logarithm.
+    start = np.maximum(1, -np.floor(np.log10(np.where(tiny, 1.0, x))) - 1)
+    start = start.astype(np.int64)
+
+    active = np.flatnonzero(~tiny)
+    shift = 0
+    while active.size:
+        orders = start[active] + shift
+        test = values[active] * _power_of_ten(orders)
+        done = np.abs(test - np.trunc(test)) < _EPSILON
+        out[active[done]] = -orders[done]
+        active = active[~done]
+        shift += 1
+
+    return out
+
+
+def least_significant_order_many(values):
+    """
+    Array version of the value_ops.least_significant_order function, which
+    returns the order of magnitude of the least significant digit of each
+    value.
+
+    :param values:
+    :return: An integer array of orders with the same shape as values
+    """
+
+    values = _as_finite_array(values)
+    flat = values.ravel()
+    out = np.zeros(flat.shape, dtype=np.int64)
+
+    integral = flat == np.trunc(flat)
+    nonzero = integral & (flat != 0)
+    out[nonzero] = _integer_orders(flat[nonzero])
+    out[~integral] = _fractional_orders(flat[~integral])
+
+    return out.reshape(values.shape)
+
+
+def round_to_order_many(values, orders):
+    """
+    Array version of the value_ops.round_to_order function, which rounds each
+    value to the corresponding order of magnitude.
+
+    :param values:
+    :param orders:
+    :return: A float64 array of rounded values
+    """
+
+    values = np.asarray(values, dtype=np.float64)
+    scale = _power_of_ten(orders)
+    return scale * (np.rint(values / scale) + 0.0)
+
+
+def round_measurements_many(raw, raw_uncertainty):
+    """
+    Rounds arrays of raw measurement values and uncertainties in the same
+    fashion as the value and uncertainty properties of the ValueUncertainty
+    class. Uncertainties are rounded to a single significant digit and the
+    values are then rounded to the least significant order of their rounded
+    uncertainties.
+
+    :param raw:
+    :param raw_uncertainty:
+    :return: tuple containing the rounded values and rounded uncertainties
+    """
+
+    uncertainties = round_significant_many(np.abs(raw_uncertainty), 1)
+    orders = least_significant_order_many(uncertainties)
+    return round_to_order_many(raw, orders), uncertainties
@@ -6,9 +6,25 @@ from __future__ import unicode_literals
 import random
 import math
 
+import numpy as np
+
 from measurement_stats.value import  value_ops
 
 
+def _is_columnar(other):
+    """
+    Whether or not the other operand is a columnar collection of measurements
+    or a lazy measurement expression, in which case binary operations are
+    deferred to that operand. Such types implement the NumPy ufunc protocol,
+    which plain NumPy arrays are excluded from here.
+    """
+
+    return (
+        getattr(type(other), '__array_ufunc__', None) is not None and
+        not isinstance(other, np.ndarray)
+    )
+
+
 class ValueUncertainty(object):
     """
     A data type representation of a measurement value and its corresponding
@@ -23,8 +39,13 @@ class ValueUncertainty(object):
     The raw values should be used for intermediate calculations to minimize
     excessive rounding errors during computation, but not used when presenting
     final values.
+
+    The rounded value and uncertainty are computed when first accessed and
+    cached until the raw value or raw uncertainty is changed.
     """
 
+    __slots__ = ('_raw', '_raw_uncertainty', '_rounded')
+
     def __init__(self, value=0.0, uncertainty=1.0, **kwargs):
         self.raw = kwargs.get('raw', float(value))
         self.raw_uncertainty = abs(kwargs.get(
@@ -32,6 +53,54 @@ class ValueUncertainty(object):
             float(uncertainty)
         ))
 
+    @property
+    def raw(self):
+        """
+        :return:
+            Returns the numerical value as it was assigned, without rounding
+        """
+        return self._raw
+
+    @raw.setter
+    def raw(self, value):
+        self._raw = value
+        self._rounded = None
+
+    @property
+    def raw_uncertainty(self):
+        """
+        :return:
+            Returns the uncertainty value as it was assigned, without rounding
+        """
+        return self._raw_uncertainty
+
+    @raw_uncertainty.setter
+    def raw_uncertainty(self, value):
+        self._raw_uncertainty = value
+        self._rounded = None
+
+    def _round(self):
+        """
+        Rounds the raw value and raw uncertainty, caching the result until
+        either of them is assigned a new value.
+
+        :return: tuple containing the rounded value and rounded uncertainty
+        """
+
+        rounded = self._rounded
+        if rounded is None:
+            uncertainty = value_ops.round_significant(
+                abs(self._raw_uncertainty),
+                1
+            )
+            order = value_ops.least_significant_order(uncertainty)
+            rounded = (
+                value_ops.round_to_order(self._raw, order),
+                uncertainty
+            )
+            self._rounded = rounded
+        return rounded
+
     @property
     def value(self):
         """
@@ -39,10 +108,7 @@ class ValueUncertainty(object):
             Returns the numerical value, which has been rounded according to
             the corresponding uncertainty
         """
-
-        uncertainty = self.uncertainty
-        order = value_ops.least_significant_order(uncertainty)
-        return value_ops.round_to_order(self.raw, order)
+        return self._round()[0]
 
     @value.setter
     def value(self, value):
@@ -55,7 +121,7 @@ class ValueUncertainty(object):
             Returns the uncertainty value, which has been rounded to a single
             significant digit for properly citing of the measurement
         """
-        return value_ops.round_significant(abs(self.raw_uncertainty), 1)
+        return self._round()[1]
 
     @uncertainty.setter
     def uncertainty(self, value):
@@ -95,6 +161,12 @@ class ValueUncertainty(object):
             raw_uncertainty=self.raw_uncertainty
         )
 
+    def __getstate__(self):
+        return self._raw, self._raw_uncertainty
+
+    def __setstate__(self, state):
+        self.raw, self.raw_uncertainty = state
+
     def clone(self):
         """clone doc..."""
         return ValueUncertainty(
@@ -195,6 +267,9 @@ class ValueUncertainty(object):
         return self.__class__(val, unc)
 
     def __add__(self, other):
+        if _is_columnar(other):
+            return NotImplemented
+
         try:
             val = self.raw + other.raw
             unc = math.sqrt(
@@ -211,6 +286,9 @@ class ValueUncertainty(object):
         return self.__add__(other)
 
     def __sub__(self, other):
+        if _is_columnar(other):
+            return NotImplemented
+
         try:
             val = self.raw - other.raw
             unc = math.sqrt(
@@ -224,6 +302,9 @@ class ValueUncertainty(object):
         return self.__class__(val, unc)
 
     def __rsub__(self, other):
+        if _is_columnar(other):
+            return NotImplemented
+
         try:
             val = other.raw - self.raw
             unc = math.sqrt(
@@ -237,6 +318,9 @@ class ValueUncertainty(object):
         return self.__class__(val, unc)
 
     def __mul__(self, other):
+        if _is_columnar(other):
+            return NotImplemented
+
         try:
             val = self.raw * other.raw
             unc = abs(val) * math.sqrt(
@@ -258,6 +342,9 @@ class ValueUncertainty(object):
         return self.__mul__(other)
 
     def __truediv__(self, other):
+        if _is_columnar(other):
+            return NotImplemented
+
         try:
             val = self.raw / other.raw
             unc = abs(val) * math.sqrt(
@@ -0,0 +1,157 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import math
+
+import numpy as np
+
+# First-order derivatives of the supported single argument ufuncs. Each entry
+# is a function of the raw input values, x, and the raw results, y, which
+# returns the derivative dy/dx used to propagate the uncertainties as
+# |dy/dx| * uncertainty.
+UNARY_DERIVATIVES = {
+    np.negative: lambda x, y: -np.ones_like(x),
+    np.positive: lambda x, y: np.ones_like(x),
+    np.sqrt: lambda x, y: 0.5 / y,
+    np.cbrt: lambda x, y: 1.0 / (3.0 * y * y),
+    np.square: lambda x, y: 2.0 * x,
+    np.reciprocal: lambda x, y: -1.0 / (x * x),
+    np.exp: lambda x, y: y,
+    np.exp2: lambda x, y: y * math.log(2.0),
+    np.expm1: lambda x, y: np.exp(x),
+    np.log: lambda x, y: 1.0 / x,
+    np.log2: lambda x, y: 1.0 / (x * math.log(2.0)),
+    np.log10: lambda x, y: 1.0 / (x * math.log(10.0)),
+    np.log1p: lambda x, y: 1.0 / (1.0 + x),
+    np.sin: lambda x, y: np.cos(x),
+    np.cos: lambda x, y: -np.sin(x),
+    np.tan: lambda x, y: 1.0 + y * y,
+    np.arcsin: lambda x, y: 1.0 / np.sqrt(1.0 - x * x),
+    np.arccos: lambda x, y: -1.0 / np.sqrt(1.0 - x * x),
+    np.arctan: lambda x, y: 1.0 / (1.0 + x * x),
+    np.sinh: lambda x, y: np.cosh(x),
+    np.cosh: lambda x, y: np.sinh(x),
+    np.tanh: lambda x, y: 1.0 - y * y,
+    np.arcsinh: lambda x, y: 1.0 / np.sqrt(x * x + 1.0),
+    np.arccosh: lambda x, y: 1.0 / np.sqrt(x * x - 1.0),
+    np.arctanh: lambda x, y: 1.0 / (1.0 - x * x),
+    np.deg2rad: lambda x, y: np.full_like(x, math.pi / 180.0),
+    np.rad2deg: lambda x, y: np.full_like(x, 180.0 / math.pi)
+}
+
+# First-order partial derivatives of the supported two argument ufuncs that
+# are not handled by the arithmetic propagation rules. Each entry is a
+# function of the raw inputs, a and b, and the raw results, y, which returns
+# the tuple of partial derivatives (dy/da, dy/db).
+BINARY_DERIVATIVES = {
+    np.arctan2: lambda a, b, y: (
+        b / (a * a + b * b),
+        -a / (a * a + b * b)
+    ),
+    np.hypot: lambda a, b, y: (a / y, b / y)
+}
+
+
+def unary(ufunc, x, x_unc):
+    """
+    Applies a single argument ufunc to the raw values and propagates the
+    uncertainties using the first-order derivative of the ufunc.
+
+    :param ufunc:
+    :param x:
+    :param x_unc:
+    :return: tuple containing the raw values and raw uncertainties
+    """
+
+    if ufunc is np.absolute:
+        return np.abs(x), np.array(x_unc, dtype=np.float64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        y = ufunc(x)
+        unc = np.abs(UNARY_DERIVATIVES[ufunc](x, y) * x_unc)
+    return y, unc
+
+
+def binary(ufunc, a, a_unc, b, b_unc):
+    """
+    Applies a two argument ufunc to the raw values and propagates the
+    uncertainties of independent operands using the first-order partial
+    derivatives of the ufunc. Either uncertainty may be None for an operand
+    without uncertainty.
+
+    :return: tuple containing the raw values and raw uncertainties
+    """
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        y = ufunc(a, b)
+        da, db = BINARY_DERIVATIVES[ufunc](a, b, y)
+
+    a_term = 0.0 if a_unc is None else (da * a_unc) ** 2
+    b_term = 0.0 if b_unc is None else (db * b_unc) ** 2
+    return y, np.sqrt(a_term + b_term)
+
+
+def sum_many(x, x_unc, axis=None, keepdims=False):
+    """
+    Sums the raw values along the specified axis, where the uncertainty of
+    the sum is the square-root of the sum of the squared uncertainties.
+
+    :return: tuple containing the raw values and raw uncertainties
+    """
+
+    return (
+        np.sum(x, axis=axis, keepdims=keepdims),
+        np.sqrt(np.sum(x_unc * x_unc, axis=axis, keepdims=keepdims))
+    )
+
+
+def mean_many(x, x_unc, axis=None, keepdims=False):
+    """
+    Averages the raw values along the specified axis, propagating the
+    uncertainties of the sum divided by the number of averaged values.
+
+    :return: tuple containing the raw values and raw uncertainties
+    """
+
+    total, total_unc = sum_many(x, x_unc, axis=axis, keepdims=keepdims)
+    count = x.size / max(1, np.size(total))
+    return total / count, total_unc / count
+
+
+def prod_many(x, x_unc, axis=None, keepdims=False):
+    """
+    Multiplies the raw values along the specified axis. The partial
+    derivative with respect to each value is the product of all of the other
+    values, which is computed from exclusive prefix and suffix products so
+    that values of zero are handled exactly.
+
+    :return: tuple containing the raw values and raw uncertainties
+    """
+
+    shape = x.shape
+    if axis is None:
+        x = x.ravel()
+        x_unc = x_unc.ravel()
+
+    reduce_axis = -1 if axis is None else axis
+    x = np.moveaxis(x, reduce_axis, -1)
+    x_unc = np.moveaxis(x_unc, reduce_axis, -1)
+
+    ones = np.ones(x.shape[:-1] + (1,))
+    prefix = np.cumprod(np.concatenate([ones, x[..., :-1]], axis=-1), axis=-1)
+    suffix = np.cumprod(
+        np.concatenate([ones, x[..., :0:-1]], axis=-1),
+        axis=-1
+    )[..., ::-1]
+
+    y = np.prod(x, axis=-1)
+    unc = np.sqrt(np.sum((prefix * suffix * x_unc) ** 2, axis=-1))
+
+    if keepdims and axis is None:
+        return y.reshape((1,) * len(shape)), unc.reshape((1,) * len(shape))
+    elif keepdims:
+        return np.expand_dims(y, axis), np.expand_dims(unc, axis)
+
+    return y, unc
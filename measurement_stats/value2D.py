@@ -24,12 +24,26 @@ class Point2D(object):
 
     @property
     def length(self):
-        """ The length of the vector
+        """ The length of the vector, which is its distance from the default
+            origin. If the components are CorrelatedValue instances, the
+            origin is exact and the uncertainty accounts for the reuse of
+            the components in the computation.
 
         :return:
         :rtype: value.ValueUncertainty
         """
-        return self.distance_from(self.__class__())
+
+        correlated = (
+            isinstance(self.x, value.CorrelatedValue) or
+            isinstance(self.y, value.CorrelatedValue)
+        )
+        if not correlated:
+            return self.distance_from(self.__class__())
+
+        return self.distance_from(self.__class__(
+            value.ValueUncertainty(0.0, 0.0),
+            value.ValueUncertainty(0.0, 0.0)
+        ))
 
     @property
     def nonzero(self):
@@ -93,6 +107,10 @@ class Point2D(object):
 
     def distance_from(self, point):
         """
+        Returns the distance between this point and the specified point. If
+        the coordinates are CorrelatedValue instances, the uncertainty of the
+        distance accounts for each coordinate appearing twice in the
+        computation and for any inputs shared between the two points.
 
         :param point:
         :return:
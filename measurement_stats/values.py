@@ -3,10 +3,18 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
-import math
 import functools
+import json
+import math
+import os
+import random
+
+import numpy as np
+from scipy import special
 
 from measurement_stats import ValueUncertainty
+from measurement_stats import ValueUncertaintyArray
+from measurement_stats import consistency
 from measurement_stats import distributions as mdists
 
 
@@ -53,6 +61,56 @@ def join(values, uncertainties):
     return out
 
 
+def unzip_arrays(values, raw=False):
+    """
+    Array version of the unzip function, which returns the values and
+    uncertainties of the measurements as float64 arrays. The raw arrays of
+    a ValueUncertaintyArray are returned without being copied.
+
+    :param values:
+        A ValueUncertaintyArray or an iterable of ValueUncertainty instances
+
+    :param raw: (optional) If True, the value and uncertainty arrays will be
+        raw instead the standard truncated formats specified by error
+        propagation rules
+    :return: tuple containing an array of values and an array of uncertainties
+    """
+
+    if len(values) and isinstance(values[0], (list, tuple)):
+        values = values[0]
+
+    array = ValueUncertaintyArray.from_list(values)
+    if raw:
+        return array.raw, array.raw_uncertainty
+    return array.value, array.uncertainty
+
+
+def join_arrays(values, uncertainties=None):
+    """
+    Array version of the join function, which creates a ValueUncertaintyArray
+    from the values and uncertainties. Float64 arrays are used without being
+    copied. If the values are already a ValueUncertaintyArray and no
+    uncertainties are specified, it is returned unchanged.
+
+    :param values:
+    :param uncertainties:
+        Either a single uncertainty applied to every value or an array of
+        uncertainties with the same shape as the values.
+    :return:
+    :rtype: ValueUncertaintyArray
+    """
+
+    if isinstance(values, ValueUncertaintyArray):
+        if uncertainties is None:
+            return values
+        values = values.raw
+
+    return ValueUncertaintyArray(
+        values,
+        1.0 if uncertainties is None else uncertainties
+    )
+
+
 def from_serialized(serialized):
     """
 
@@ -68,31 +126,323 @@ def from_serialized(serialized):
     ]
 
 
+def _serialized_entries(source):
+    """
+    Iterates over the serialized measurement dictionaries within the source,
+    which can be a path to a JSON-lines file, an open file or an iterable of
+    dictionaries or JSON strings. Blank lines are skipped.
+
+    :param source:
+    :return:
+    """
+
+    if isinstance(source, (str, os.PathLike)):
+        with open(os.fspath(source), 'r') as f:
+            for entry in _serialized_entries(f):
+                yield entry
+        return
+
+    for entry in source:
+        if isinstance(entry, bytes):
+            entry = entry.decode('utf-8')
+        if isinstance(entry, str):
+            entry = entry.strip()
+            if not entry:
+                continue
+            entry = json.loads(entry)
+        yield entry
+
+
+def stream_serialized(source, chunk_size=65536):
+    """
+    Reads serialized measurements in fixed-size chunks without creating
+    ValueUncertainty instances. Each entry is a dictionary with either raw
+    and raw_uncertainty keys or value and uncertainty keys, like those
+    created by ValueUncertainty.serialize. Only one chunk is held in memory
+    at a time, so the memory used does not grow with the size of the input.
+
+    :param source:
+        A path, as a string or path-like object, to a JSON-lines file with
+        one serialized measurement per line, an open file of such lines, or
+        an iterable of serialized measurement dictionaries or JSON strings.
+    :param chunk_size:
+        The maximum number of measurements in each yielded batch.
+    :return:
+        A generator of ValueUncertaintyArray batches
+    """
+
+    chunk_size = max(1, int(chunk_size))
+    raw = np.empty(chunk_size, dtype=np.float64)
+    raw_uncertainty = np.empty(chunk_size, dtype=np.float64)
+    count = 0
+
+    for x in _serialized_entries(source):
+        raw[count] = x['raw'] if 'raw' in x else x['value']
+        raw_uncertainty[count] = (
+            x['raw_uncertainty'] if 'raw_uncertainty' in x
+            else x['uncertainty']
+        )
+        count += 1
+
+        if count == chunk_size:
+            yield ValueUncertaintyArray(raw.copy(), raw_uncertainty.copy())
+            count = 0
+
+    if count:
+        yield ValueUncertaintyArray(
+            raw[:count].copy(),
+            raw_uncertainty[:count].copy()
+        )
+
+
 def deviations(expected, values):
     """
+    Returns the sigma deviations of the values from the expected value. See
+    consistency.deviations for the vectorized version of this function.
 
     :param expected:
     :param values:
+    :return: A list of the absolute sigma deviations
+    """
+
+    return consistency.deviations(expected, values).tolist()
+
+
+def _solve(function, guess, low, high, iterations=100):
+    """
+    Finds the roots of a vectorized increasing function, one on each of the
+    intervals [low, high], with Newton's method. Steps that leave the
+    interval known to contain a root, or that converge too slowly, are
+    replaced by bisection of that interval, which guarantees convergence. A
+    root has converged once it is known to within a small fraction of the
+    width of its initial interval, and only roots that have not yet
+    converged are evaluated at each iteration.
+
+    :param function:
+        A function of the positions and the indices of the roots being
+        evaluated, which returns the function values and their derivatives
+    :param guess:
+    :param low:
+    :param high:
+    :param iterations:
     :return:
     """
 
-    out = []
+    x = np.clip(guess, low, high)
+    tolerance = 1e-13 * (high - low)
+    low = low.copy()
+    high = high.copy()
+    previous = high - low
+    active = np.arange(x.size)
+
+    for i in range(iterations):
+        if not active.size:
+            break
+
+        xa = x[active]
+        f, df = function(xa, active)
+
+        below = f < 0
+        la = np.where(below, xa, low[active])
+        ha = np.where(below, high[active], xa)
+        low[active] = la
+        high[active] = ha
+
+        # Newton steps are also rejected when they do not at least halve the
+        # previous step, which prevents them from cycling within the interval
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            newton = f / df
+        step = xa - newton
+        accepted = (
+            (step > la) &
+            (step < ha) &
+            (np.abs(newton) <= 0.5 * previous[active])
+        )
+        ta = tolerance[active]
+        converged = (np.abs(newton) <= ta) | (ha - la <= ta) | (f == 0)
+        step = np.where(accepted | converged, step, 0.5 * (la + ha))
+        step = np.where(f == 0, xa, step)
 
-    if hasattr(expected, 'raw_uncertainty'):
-        for v in values:
-            err = math.sqrt(
-                v.raw_uncertainty ** 2 +
-                expected.raw_uncertainty ** 2
-            )
-            out.append(abs(v.raw - expected.raw) / err)
-    else:
-        for v in values:
-            out.append(abs(v.value - expected) / v.uncertainty)
+        previous[active] = np.abs(step - xa)
+        x[active] = step
+        active = active[~converged]
 
-    return out
+    return x
+
+
+def _window_statistics(centers, widths, count, mean, variance):
+    """
+    Computes the median and the median absolute deviation of each of the
+    equally weighted Gaussian mixtures defined by the rows of the centers
+    and widths arrays. Rows are padded with infinite centers, which do not
+    contribute to the mixtures. The mean and variance of each mixture are
+    used as starting estimates for the solutions.
+
+    :return: tuple containing arrays of the medians and deviations
+    """
+
+    scales = 1.0 / widths
+    norm = 1.0 / (count * np.sqrt(2.0 * np.pi))
+    padding = np.isinf(centers)
+
+    def distribution(x, rows):
+        z = (x[:, None] - centers[rows]) * scales[rows]
+        cdf = np.sum(special.ndtr(z), axis=1) / count[rows]
+        pdf = np.sum(np.exp(-0.5 * z * z) * scales[rows], axis=1) * norm[rows]
+        return cdf, pdf
+
+    def median_error(x, rows):
+        cdf, pdf = distribution(x, rows)
+        return cdf - 0.5, pdf
+
+    low = np.min(centers - 10.0 * widths, axis=1)
+    high = np.max(np.where(padding, -np.inf, centers + 10.0 * widths), axis=1)
+    median = _solve(median_error, mean, low, high)
+
+    def deviation_error(d, rows):
+        upper, upper_pdf = distribution(median[rows] + d, rows)
+        lower, lower_pdf = distribution(median[rows] - d, rows)
+        return upper - lower - 0.5, upper_pdf + lower_pdf
+
+    # The MAD of a single normal distribution is 0.6745 sigma
+    deviation = _solve(
+        deviation_error,
+        0.6745 * np.sqrt(variance),
+        np.zeros_like(median),
+        np.maximum(high - median, median - low)
+    )
+    return median, deviation
+
+
+def _window_moments(measurements, size):
+    """
+    Computes the bounds of the window of each measurement and the mean and
+    variance of the Gaussian mixture of each window. The moments are
+    updated incrementally as the window slides using running sums, which
+    takes O(N) time regardless of the window size.
+
+    :param measurements:
+    :param size:
+    :return:
+        A tuple containing the centers and widths of the measurements and
+        arrays of the first and last indices, the number of members, the
+        mean and the variance of each window
+    """
+
+    centers, widths = unzip_arrays(measurements)
+    widths = np.maximum(widths, 1e-6)
+    n = len(centers)
+
+    first = np.maximum(0, np.arange(n) - size)
+    last = np.minimum(n - 1, np.arange(n) + size)
+    count = (last - first + 1).astype(np.float64)
+
+    # Running sums are taken relative to the overall mean to limit the loss
+    # of precision over long series
+    shift = np.mean(centers) if n else 0.0
+    shifted = centers - shift
+    sums = np.concatenate([[0.0], np.cumsum(shifted)])
+    squares = np.concatenate([[0.0], np.cumsum(shifted ** 2 + widths ** 2)])
+    mean = (sums[last + 1] - sums[first]) / count
+    variance = np.maximum(
+        (squares[last + 1] - squares[first]) / count - mean ** 2,
+        0.0
+    )
+
+    return centers, widths, first, last, count, mean + shift, variance
+
+
+def _solve_windows(task):
+    """
+    Solves for the medians and deviations of a range of windows, whose
+    first and last indices refer to the specified centers and widths. All
+    of the windows within each chunk are solved together. This is a module
+    level function so that it can be sent to process pools.
+
+    :param task:
+        A tuple containing the centers and widths, the first and last
+        indices, the member counts, means and variances of the windows, the
+        window size and the number of windows solved together
+    :return: tuple containing arrays of the medians and deviations
+    """
+
+    (
+        centers, widths, first, last,
+        count, mean, variance, size, chunk_size
+    ) = task
+    n = len(centers)
+    rows_count = len(first)
+
+    padded_centers = np.concatenate([centers, [np.inf]])
+    padded_widths = np.concatenate([widths, [1.0]])
+
+    medians = np.empty(rows_count)
+    deviations = np.empty(rows_count)
+    offsets = np.arange(2 * size + 1)
+
+    for start in range(0, rows_count, chunk_size):
+        rows = slice(start, min(rows_count, start + chunk_size))
+        members = first[rows, None] + offsets
+        members[members > last[rows, None]] = n
+
+        medians[rows], deviations[rows] = _window_statistics(
+            padded_centers[members],
+            padded_widths[members],
+            count[rows],
+            mean[rows],
+            variance[rows]
+        )
+
+    return medians, deviations
+
+
+def _analytic_windowed_smooth(measurements, size, chunk_size=65536):
+    """
+    Smooths the measurements by solving for the median and median absolute
+    deviation of the Gaussian mixture of each window directly from the
+    cumulative distribution function of the mixture. The mean and variance
+    of each window are updated incrementally as the window slides using
+    running sums, and are used as the starting estimates from which all
+    windows within a chunk are solved together.
+
+    :param measurements:
+    :param size:
+    :param chunk_size:
+    :return: tuple containing arrays of the medians and deviations
+    """
+
+    return _solve_windows(_window_moments(measurements, size) + (
+        size,
+        chunk_size
+    ))
 
 
-def windowed_smooth(measurements, size=1, population_size=512):
+def _smoothed(measurements, medians, deviations):
+    """
+    Creates the analytically smoothed measurements, which are a
+    ValueUncertaintyArray if the source measurements are one.
+
+    :param measurements:
+    :param medians:
+    :param deviations:
+    :return:
+    """
+
+    if isinstance(measurements, ValueUncertaintyArray):
+        return ValueUncertaintyArray(medians, deviations)
+    return [
+        ValueUncertainty(m, d)
+        for m, d in zip(medians.tolist(), deviations.tolist())
+    ]
+
+
+def windowed_smooth(
+        measurements,
+        size=1,
+        population_size=512,
+        method='population',
+        rng=None
+):
     """
     Returns a new list of measurements with the same length as the source
     measurements, where each value in the result is calculated as the median
@@ -109,9 +459,23 @@ def windowed_smooth(measurements, size=1, population_size=512):
     :param size:
         The extend of the smoothing window.
     :param population_size:
+    :param method:
+        Either 'population', which computes the median and MAD of a random
+        population sampled from the measurements in each window, or
+        'analytic', which computes them exactly from the cumulative
+        distribution function of the window measurements. The analytic
+        method is deterministic and much faster for long series. It returns
+        a ValueUncertaintyArray if the measurements are one.
+    :param rng:
+        (optional) A random.Random instance used to create the populations,
+        which makes the result reproducible.
     :return:
     """
 
+    if method == 'analytic':
+        medians, deviations = _analytic_windowed_smooth(measurements, size)
+        return _smoothed(measurements, medians, deviations)
+
     window = []
     window_populations = []
 
@@ -122,7 +486,8 @@ def windowed_smooth(measurements, size=1, population_size=512):
         window_populations.append(
             mdists.population(
                 mdists.Distribution([m]),
-                count=population_size
+                count=population_size,
+                rng=rng
             )
         )
 
@@ -147,7 +512,7 @@ def windowed_smooth(measurements, size=1, population_size=512):
 
         m = measurements[append_index]
         d = mdists.Distribution([m])
-        pop = mdists.population(d, population_size)
+        pop = mdists.population(d, population_size, rng=rng)
         window.append(m)
         window_populations.append(pop)
 
@@ -158,12 +523,15 @@ def windowed_smooth(measurements, size=1, population_size=512):
     return out
 
 
-def box_smooth(measurements, size=2, population_size=512):
+def box_smooth(measurements, size=2, population_size=512, rng=None):
     """
 
     :param measurements:
     :param size:
     :param population_size:
+    :param rng:
+        (optional) A random.Random instance used to create the populations,
+        which makes the result reproducible.
     :return:
     """
 
@@ -171,7 +539,7 @@ def box_smooth(measurements, size=2, population_size=512):
 
     for i in range(0, len(measurements), size):
         d = mdists.Distribution(measurements[i:(i + size)])
-        pop = mdists.population(d, count=population_size)
+        pop = mdists.population(d, count=population_size, rng=rng)
         median = mdists.percentile(pop)
         mad = mdists.weighted_median_average_deviation(pop)
         while len(out) < (i + size):
@@ -180,6 +548,307 @@ def box_smooth(measurements, size=2, population_size=512):
     return out
 
 
+def _smooth_chunk(task):
+    """
+    Smooths a single chunk of a series for the parallel smoothing
+    functions. This is a module level function so that it can be sent to
+    process pools.
+
+    :param task:
+        A tuple containing the smoothing function, the measurements of the
+        chunk including its overlap, the keyword arguments of the smoothing
+        function, the seed of the chunk random number generator and the
+        slice bounds of the chunk results within the smoothed measurements
+    :return:
+    """
+
+    smoother, measurements, kwargs, seed, start, stop = task
+    smoothed = smoother(measurements, rng=random.Random(seed), **kwargs)
+    return smoothed[start:stop]
+
+
+def _smooth_parallel(smoother, measurements, bounds, kwargs, executor, seed):
+    """
+    Distributes the chunks of a series defined by the bounds among the
+    workers of the executor and joins their results in order.
+
+    :param smoother:
+    :param measurements:
+    :param bounds:
+        A list of tuples containing the start and stop indices of the
+        measurements within each chunk, including the overlap, and the
+        start and stop indices of the results within the series
+    :param kwargs:
+    :param executor:
+    :param seed:
+    :return:
+    """
+
+    seeds = np.random.SeedSequence(seed).spawn(len(bounds))
+    tasks = [
+        (
+            smoother,
+            measurements[low:high],
+            kwargs,
+            int(chunk_seed.generate_state(1)[0]),
+            start - low,
+            stop - low
+        )
+        for (low, high, start, stop), chunk_seed in zip(bounds, seeds)
+    ]
+
+    mapper = map if executor is None else executor.map
+    results = list(mapper(_smooth_chunk, tasks))
+
+    if results and isinstance(results[0], ValueUncertaintyArray):
+        return np.concatenate(results)
+    return [m for chunk in results for m in chunk]
+
+
+def _analytic_smooth_parallel(measurements, size, bounds, executor):
+    """
+    Distributes the windows of the analytic smoothing among the workers of
+    the executor. The window moments are computed once for the whole series
+    so that the windows of each chunk are solved from the same starting
+    estimates as they are when the whole series is smoothed at once.
+
+    :param measurements:
+    :param size:
+    :param bounds:
+    :param executor:
+    :return:
+    """
+
+    centers, widths, first, last, count, mean, variance = _window_moments(
+        measurements,
+        size
+    )
+
+    tasks = [
+        (
+            centers[low:high],
+            widths[low:high],
+            first[start:stop] - low,
+            last[start:stop] - low,
+            count[start:stop],
+            mean[start:stop],
+            variance[start:stop],
+            size,
+            stop - start
+        )
+        for low, high, start, stop in bounds
+    ]
+
+    mapper = map if executor is None else executor.map
+    results = list(mapper(_solve_windows, tasks))
+
+    return _smoothed(
+        measurements,
+        np.concatenate([np.empty(0)] + [r[0] for r in results]),
+        np.concatenate([np.empty(0)] + [r[1] for r in results])
+    )
+
+
+def windowed_smooth_parallel(
+        measurements,
+        size=1,
+        population_size=512,
+        method='population',
+        executor=None,
+        chunk_size=1024,
+        seed=None
+):
+    """
+    Chunked version of the windowed_smooth function, where the chunks are
+    smoothed independently by the workers of an executor. Each chunk
+    includes the size measurements on either side of it that are needed to
+    fill the windows at its edges, so that every window contains the same
+    measurements as it does when the whole series is smoothed at once.
+
+    For the analytic method the starting estimates of the windows are
+    computed once for the whole series and shared with the chunks, so the
+    result is the same as that of windowed_smooth. For the population
+    method each chunk creates its populations with its own random number
+    generator, which is seeded from the seed argument and the index of the
+    chunk. The result then differs from that of windowed_smooth, but does
+    not depend upon the executor or the order in which the chunks are run.
+    It is only reproducible between runs if a seed is specified.
+
+    :param measurements:
+    :param size:
+        The extend of the smoothing window.
+    :param population_size:
+    :param method:
+        The windowed_smooth method, either 'population' or 'analytic'.
+    :param executor:
+        (optional) A concurrent.futures Executor, such as a
+        ProcessPoolExecutor, on which to smooth the chunks. If not specified
+        the chunks are smoothed serially in this process.
+    :param chunk_size:
+        The number of smoothed measurements produced by each chunk.
+    :param seed:
+        (optional) Seed from which the random number generators of the
+        chunks are seeded, which makes the result reproducible.
+    :return:
+    """
+
+    n = len(measurements)
+    chunk_size = max(1, int(chunk_size))
+    bounds = [
+        (
+            max(0, start - size),
+            min(n, start + chunk_size + size),
+            start,
+            min(n, start + chunk_size)
+        )
+        for start in range(0, n, chunk_size)
+    ]
+
+    if method == 'analytic':
+        return _analytic_smooth_parallel(measurements, size, bounds, executor)
+
+    return _smooth_parallel(
+        windowed_smooth,
+        measurements,
+        bounds,
+        dict(size=size, population_size=population_size, method=method),
+        executor,
+        seed
+    )
+
+
+def box_smooth_parallel(
+        measurements,
+        size=2,
+        population_size=512,
+        executor=None,
+        chunk_size=1024,
+        seed=None
+):
+    """
+    Chunked version of the box_smooth function, where the chunks are
+    smoothed independently by the workers of an executor. Chunks are
+    aligned to whole boxes, so that every box contains the same
+    measurements as it does when the whole series is smoothed at once. Each
+    chunk creates its populations with its own random number generator,
+    which is seeded from the seed argument and the index of the chunk. The
+    result therefore differs from that of box_smooth, but does not depend
+    upon the executor or the order in which the chunks are run. It is only
+    reproducible between runs if a seed is specified.
+
+    :param measurements:
+    :param size:
+    :param population_size:
+    :param executor:
+        (optional) A concurrent.futures Executor, such as a
+        ProcessPoolExecutor, on which to smooth the chunks. If not specified
+        the chunks are smoothed serially in this process.
+    :param chunk_size:
+        The number of measurements in each chunk, which is rounded up to a
+        whole number of boxes.
+    :param seed:
+        (optional) Seed from which the random number generators of the
+        chunks are seeded, which makes the result reproducible.
+    :return:
+    """
+
+    n = len(measurements)
+    chunk_size = size * max(1, int(math.ceil(chunk_size / size)))
+
+    # The last box of the series is padded to its full size by box_smooth
+    bounds = [
+        (start, min(n, start + chunk_size), start, start + chunk_size)
+        for start in range(0, n, chunk_size)
+    ]
+
+    return _smooth_parallel(
+        box_smooth,
+        measurements,
+        bounds,
+        dict(size=size, population_size=population_size),
+        executor,
+        seed
+    )
+
+
+def argmax(measurements):
+    """
+    Vectorized version of the maximum function, which returns the index of
+    the measurement with the largest value. Ties are broken in the same way
+    as by the maximum function: the measurement with the smallest
+    uncertainty is chosen and then the last of those.
+
+    :param measurements:
+        A ValueUncertaintyArray or a list of ValueUncertainty instances
+    :return: The index of the maximum measurement
+    :rtype: int
+    """
+
+    vals, uncs = unzip_arrays(measurements)
+    candidates = np.flatnonzero(vals == np.max(vals))
+    candidates = candidates[uncs[candidates] == np.min(uncs[candidates])]
+    return int(candidates[-1])
+
+
+def argmin(measurements):
+    """
+    Vectorized version of the minimum function, which returns the index of
+    the measurement with the smallest value. Ties are broken in the same way
+    as by the minimum function: the measurement with the smallest
+    uncertainty is chosen and then the first of those.
+
+    :param measurements:
+        A ValueUncertaintyArray or a list of ValueUncertainty instances
+    :return: The index of the minimum measurement
+    :rtype: int
+    """
+
+    vals, uncs = unzip_arrays(measurements)
+    candidates = np.flatnonzero(vals == np.min(vals))
+    candidates = candidates[uncs[candidates] == np.min(uncs[candidates])]
+    return int(candidates[0])
+
+
+def top_k(measurements, k, largest=True):
+    """
+    Returns the indices of the k largest, or smallest, measurements ordered
+    from the best to the worst. Measurements are ordered lexicographically
+    by value and then by uncertainty, with the same tie-breaking as the
+    maximum and minimum functions, so that the first index is the same as
+    that returned by argmax or argmin.
+
+    :param measurements:
+        A ValueUncertaintyArray or a list of ValueUncertainty instances
+    :param k:
+        The number of indices to return
+    :param largest:
+        If False the smallest measurements are returned instead of the
+        largest ones
+    :return: An integer array of at most k indices
+    """
+
+    vals, uncs = unzip_arrays(measurements)
+    k = min(int(k), vals.size)
+    if k < 1:
+        return np.zeros(0, dtype=np.int64)
+
+    keys = -vals if largest else vals
+    index = np.arange(vals.size)
+
+    # Only the measurements whose values are at least as good as the kth
+    # best value, including all of those tied with it, need to be sorted
+    if k < vals.size:
+        threshold = np.partition(keys, k - 1)[k - 1]
+        index = np.flatnonzero(keys <= threshold)
+
+    order = np.lexsort((
+        -index if largest else index,
+        uncs[index],
+        keys[index]
+    ))
+    return index[order[:k]]
+
+
 def maximum(measurements):
     """
 
@@ -187,6 +856,9 @@ def maximum(measurements):
     :return:
     """
 
+    if isinstance(measurements, ValueUncertaintyArray):
+        return measurements[argmax(measurements)]
+
     def max_compare(a, b):
         if a is None:
             return b
@@ -210,6 +882,9 @@ def minimum(measurements):
     :return:
     """
 
+    if isinstance(measurements, ValueUncertaintyArray):
+        return measurements[argmin(measurements)]
+
     def min_compare(a, b):
         if a is None:
             return b